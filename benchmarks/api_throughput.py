@@ -0,0 +1,205 @@
+"""Throughput of the headless HTTP API under concurrent clients.
+
+Starts the API (``python -m soil_health.api``) and the mock OpenAI server
+(with ``--latency`` per call) as subprocesses, once per ``--workers``
+setting, and sends each scenario from ``--clients`` keep-alive connections:
+
+- ``score``: one sample per request
+- ``score x500``: a 500-sample batch per request (split over the pool)
+- ``fertilizer``: one sample per request
+- ``extract``: a generated lab report PDF per request
+- ``recommend``: a different sample per request (an LLM call each)
+- ``recommend (cached)``: the same sample every time
+
+Reports requests/s and p50 / p95 latency per scenario. ``--workers 0``
+keeps the CPU work on the request threads, for comparison with the pool.
+The LLM rate limits are raised (``--rpm`` / ``--tpm``) so ``recommend``
+measures call concurrency rather than the API defaults of 500 requests and
+200k tokens per minute.
+
+    python -m benchmarks.api_throughput --workers 0 4 --clients 16
+    python -m benchmarks.api_throughput --requests 100 --latency 0.8 --json api.json
+"""
+
+import argparse
+import http.client
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.samples import synthetic_samples
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NO_CACHE_DB = os.path.join(ROOT, ".api-benchmark-missing.sqlite3")  # no pre-warmed entries
+
+PDF_LINES = [
+    "Customer Name Dr Ahmed - AK",
+    "Test Report No. SP-0412-25",
+    "Sample Description * Topsoil 0-30 cm",
+    "Received on 12/03/2025",
+    "Analysed on 14/03/2025",
+    "Site Al Ain Farm 3",
+    "pH (paste extract) 8.2",
+    "ECe 5400 uS/cm",
+    "Organic Matter 0.62 %",
+    "Sodium Adsorption Ratio (SAR) 9.1",
+    "Exchangeable Sodium Percentage (ESP) 12.4",
+    "Cation Exchange Capacity 6.3 meq/100g",
+    "Soluble Calcium 420 mg/L",
+    "Soluble Sodium 980 mg/L",
+    "Exchangeable Potassium 110 mg/kg",
+    "Available Nitrogen 14.2 mg/kg",
+    "Available Phosphorus 11.8 mg/kg",
+    "Available Potassium 132 mg/kg",
+    "Available Iron 3.1 mg/kg",
+    "Available Zinc 0.8 mg/kg",
+    "Available Boron 0.4 mg/kg",
+]
+
+
+def report_pdf() -> bytes:
+    """A one-page lab report with the header fields and values the extractor reads."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buf = io.BytesIO()
+    pdf = canvas.Canvas(buf, pagesize=A4)
+    y = 800
+    for line in PDF_LINES:
+        pdf.drawString(60, y, line)
+        y -= 18
+    pdf.save()
+    return buf.getvalue()
+
+
+def start(args: list[str]) -> tuple[subprocess.Popen, str]:
+    """Run a server module; returns the process and the URL it prints."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", *args], cwd=ROOT, stdout=subprocess.PIPE, text=True,
+        env={**os.environ, "OPENAI_API_KEY": "benchmark", "PYTHONUNBUFFERED": "1"},
+    )
+    line = proc.stdout.readline()
+    if " on " not in line:
+        proc.kill()
+        raise RuntimeError(f"{args[0]} did not start: {line!r}")
+    return proc, line.rsplit(" on ", 1)[1].strip()
+
+
+def run_scenario(base_url: str, path: str, bodies: list[bytes], clients: int, content_type: str) -> dict:
+    """Send every body once, from ``clients`` threads; latencies in ms."""
+    host, port = urlsplit(base_url).hostname, urlsplit(base_url).port
+    latencies, errors, lock = [], [], threading.Lock()
+    position = iter(range(len(bodies)))
+
+    def client():
+        conn = http.client.HTTPConnection(host, port, timeout=300)
+        while True:
+            with lock:
+                i = next(position, None)
+            if i is None:
+                break
+            t0 = time.perf_counter()
+            try:
+                conn.request("POST", path, bodies[i], {"Content-Type": content_type})
+                response = conn.getresponse()
+                data = response.read()
+                error = f"{response.status}: {data[:200]!r}" if response.status != 200 else None
+            except OSError as e:
+                conn.close()  # reconnects on the next request
+                error = f"{type(e).__name__}: {e}"
+            elapsed = (time.perf_counter() - t0) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if error:
+                    errors.append(error)
+        conn.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    return {
+        "requests": len(bodies),
+        "req_per_s": round(len(bodies) / wall, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(statistics.quantiles(latencies, n=20)[-1], 1) if len(latencies) > 1 else None,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+    }
+
+
+def scenarios(requests: int, seed: int) -> dict:
+    """name -> (path, request bodies, content type)."""
+    samples = synthetic_samples(requests, seed=seed)
+    batch = json.dumps({"samples": synthetic_samples(500, seed=seed + 1)}).encode()
+    pdf = report_pdf()
+    as_json = [json.dumps(s).encode() for s in samples]
+    return {
+        "score": ("/score", as_json, "application/json"),
+        "score x500": ("/score", [batch] * max(1, requests // 10), "application/json"),
+        "fertilizer": ("/fertilizer", as_json, "application/json"),
+        "extract": ("/extract", [pdf] * requests, "application/pdf"),
+        "recommend": ("/recommend", as_json, "application/json"),
+        "recommend (cached)": ("/recommend", [as_json[0]] * requests, "application/json"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, os.cpu_count() or 1])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock LLM latency (s)")
+    parser.add_argument("--rpm", type=float, default=60_000, help="LLM request limit of the API (per minute)")
+    parser.add_argument("--tpm", type=float, default=100_000_000, help="LLM token limit of the API (per minute)")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    mock, mock_url = start(["soil_health.mock_openai", "--port", "0", "--latency", str(args.latency)])
+    report = {"python": sys.version.split()[0], "cpus": os.cpu_count(), "clients": args.clients,
+              "llm_latency_s": args.latency, "runs": {}}
+    try:
+        for workers in args.workers:
+            api, url = start([
+                "soil_health.api", "--port", "0", "--workers", str(workers), "--base-url", mock_url,
+                "--concurrency", str(args.clients), "--rpm", str(args.rpm), "--tpm", str(args.tpm),
+                "--cache-db", NO_CACHE_DB,
+            ])
+            try:
+                print(f"\nworkers={workers}  clients={args.clients}  LLM latency={args.latency}s")
+                print(f"{'scenario':<20} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+                rows = {}
+                # a fresh seed per server: the recommend samples miss the cache
+                for name, (path, bodies, content_type) in scenarios(args.requests, seed=workers * 7 + 1).items():
+                    row = run_scenario(url, path, bodies, args.clients, content_type)
+                    rows[name] = row
+                    print(
+                        f"{name:<20} {row['requests']:8d} {row['req_per_s']:8.1f} {row['p50_ms']:8.1f} "
+                        f"{row['p95_ms'] or 0:8.1f} {row['errors']:7d}"
+                    )
+                    if row["first_error"]:
+                        print(f"  first error: {row['first_error']}")
+                report["runs"][f"workers={workers}"] = rows
+            finally:
+                api.terminate()
+                api.wait()
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
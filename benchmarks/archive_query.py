@@ -0,0 +1,101 @@
+"""Query latency of the sample archive with hundreds of thousands of rows.
+
+Fills a fresh archive with synthetic samples (received dates spread over
+2023-2025, analyzed two days later), then times typical searches and
+prints the SQLite query plan of each, so a missing index shows up as a
+``SCAN samples``.
+
+    python -m benchmarks.archive_query --rows 200000
+    python -m benchmarks.archive_query --rows 50000 --db /tmp/archive.sqlite3 --json archive.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.samples import SITES, synthetic_samples
+from soil_health.archive import SampleArchive
+
+QUERIES = {
+    "latest samples (no filter)": dict(),
+    "site X in 2025 with ECe > 8": dict(
+        site=SITES[0], received_from="2025-01-01", received_to="2025-12-31", values={"ECe": (">", 8)}
+    ),
+    "customer, all samples": dict(customer="Farm 7"),
+    "report number": dict(report_no="SYN-012345"),
+    "received in one month": dict(received_from="2024-06-01", received_to="2024-06-30"),
+    "analyzed in one week": dict(analyzed_from="2025-03-01", analyzed_to="2025-03-07"),
+    "score below 40": dict(max_score=40),
+    "site X, score 50-60, pH > 8": dict(site=SITES[1], min_score=50, max_score=60, values={"pH (paste extract)": (">", 8)}),
+}
+
+
+def dated(samples: list[dict]) -> list[dict]:
+    start = date(2023, 1, 1)
+    for i, payload in enumerate(samples):
+        received = start + timedelta(days=(i * 7919) % 1095)
+        payload["sample_info"]["received"] = received.strftime("%d/%m/%Y")  # as on the lab PDFs
+        payload["sample_info"]["analyzed"] = (received + timedelta(days=2)).strftime("%d/%m/%Y")
+    return samples
+
+
+def fill(archive: SampleArchive, rows: int, chunk: int = 20000) -> float:
+    t0 = time.perf_counter()
+    for offset in range(0, rows, chunk):
+        batch = dated(synthetic_samples(min(chunk, rows - offset), seed=offset))
+        for i, payload in enumerate(batch):
+            payload["sample_info"]["report_no"] = f"SYN-{offset + i + 1:06d}"
+        archive.save_many(batch)
+    return time.perf_counter() - t0
+
+
+def query_plan(archive: SampleArchive, kwargs: dict) -> str:
+    # same SQL as find(): run it through EXPLAIN QUERY PLAN
+    statements = []
+    archive._conn.set_trace_callback(statements.append)
+    archive.find(**kwargs)
+    archive._conn.set_trace_callback(None)
+    sql = statements[-1]
+    return "; ".join(row[-1] for row in archive._conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--db", default=None, help="Archive file (default: a temporary file)")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "archive.sqlite3")
+    archive = SampleArchive(path)
+    if len(archive) < args.rows:
+        seconds = fill(archive, args.rows)
+        archive.analyze()
+        print(f"filled {args.rows} rows in {seconds:.1f} s ({args.rows / seconds:.0f} rows/s)")
+    print(f"{len(archive)} rows, {os.path.getsize(path) / 2**20:.1f} MiB\n")
+
+    report = {"rows": len(archive), "queries": {}}
+    print(f"{'query':<32} {'rows':>6} {'median ms':>10} {'max ms':>8}  plan")
+    for name, kwargs in QUERIES.items():
+        timings = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            found = archive.find(**kwargs)
+            timings.append(time.perf_counter() - t0)
+        plan = query_plan(archive, kwargs)
+        median, worst = statistics.median(timings) * 1000, max(timings) * 1000
+        report["queries"][name] = {"rows": len(found), "median_ms": round(median, 2), "max_ms": round(worst, 2), "plan": plan}
+        print(f"{name:<32} {len(found):6d} {median:10.2f} {worst:8.2f}  {plan}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
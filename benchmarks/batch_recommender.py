@@ -0,0 +1,162 @@
+"""BatchRecommender against the local mock OpenAI server, failing on any mismatch.
+
+Starts ``soil_health.mock_openai`` in-process (no API key needed) and checks
+the behaviour the batch path promises:
+
+- ``dedup``: repeated contexts are sent once and every copy gets the result
+- ``retry``: every n-th request is rate limited; all contexts still succeed
+  and each retry is one extra request
+- ``retry-after``: a retried call waits at least the server's hint, even with
+  a near-zero backoff
+- ``concurrency``: no more than ``max_concurrency`` requests are in flight
+- ``requests/min`` / ``tokens/min``: past the one-minute burst, calls are
+  paced at the configured rate
+
+Prints one row per check and exits with status 1 if any fails. Takes about
+10 s (the rate-limit checks wait out their buckets on purpose).
+
+    python -m benchmarks.batch_recommender
+    python -m benchmarks.batch_recommender --checks dedup retry
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from soil_health.batch import BatchRecommender, estimate_tokens
+from soil_health.mock_openai import start_mock_server
+
+
+def contexts(n: int, prefix: str = "sample") -> list[str]:
+    # same length for every context, so each costs the same estimated tokens
+    return [f"{prefix} {i:05d}\npH (paste extract)|8.1|high" for i in range(n)]
+
+
+def run(base_url: str, items: list[str], **kwargs) -> tuple[list[dict], float]:
+    kwargs.setdefault("max_retries", 5)
+    recommender = BatchRecommender(api_key="sk-check", base_url=base_url, **kwargs)
+    started = time.perf_counter()
+    results = asyncio.run(recommender.generate(items))
+    return results, time.perf_counter() - started
+
+
+def failed(results: list[dict]) -> list[str]:
+    return [r["error"] for r in results if r["error"] or not isinstance(r["result"], dict)]
+
+
+def check_dedup() -> tuple[str, list[str]]:
+    server, url = start_mock_server()
+    unique = contexts(4)
+    items = unique * 3
+    results, _ = run(url, items)
+    problems = failed(results)
+    if server.request_count != len(unique):
+        problems.append(f"{server.request_count} requests for {len(unique)} distinct contexts")
+    if sum(r["deduplicated"] for r in results) != len(items) - len(unique):
+        problems.append("deduplicated flags do not match the repeated contexts")
+    if any(r["result"] != results[i % len(unique)]["result"] for i, r in enumerate(results)):
+        problems.append("a repeated context got a different result")
+    server.shutdown()
+    return f"{len(items)} contexts -> {server.request_count} requests", problems
+
+
+def check_retry() -> tuple[str, list[str]]:
+    server, url = start_mock_server(rate_limit_every=3, retry_after=0.01)
+    items = contexts(12)
+    results, _ = run(url, items, base_delay=0.001, max_delay=0.01)
+    problems = failed(results)
+    retries = sum(r["attempts"] - 1 for r in results)
+    if retries == 0:
+        problems.append("no call was retried although every 3rd request got a 429")
+    if server.request_count != len(items) + retries:
+        problems.append(f"{server.request_count} requests, expected {len(items)} + {retries} retries")
+    server.shutdown()
+    return f"{len(items)} contexts, {retries} retries, {server.request_count} requests", problems
+
+
+def check_retry_after() -> tuple[str, list[str]]:
+    hint = 0.5
+    server, url = start_mock_server(rate_limit_every=2, retry_after=hint)
+    results, _ = run(url, contexts(2), max_concurrency=1, base_delay=0.001, max_delay=0.001)
+    problems = failed(results)
+    retried = [r for r in results if r["attempts"] > 1]
+    if not retried:
+        problems.append("no call was rate limited")
+    elif min(r["latency_s"] for r in retried) < hint:
+        problems.append(f"retried after {min(r['latency_s'] for r in retried):.3f} s, Retry-After was {hint} s")
+    server.shutdown()
+    waited = max((r["latency_s"] for r in retried), default=0)
+    return f"Retry-After {hint} s, retried call took {waited:.2f} s", problems
+
+
+def check_concurrency() -> tuple[str, list[str]]:
+    limit = 4
+    server, url = start_mock_server(latency=0.05)
+    results, _ = run(url, contexts(24), max_concurrency=limit)
+    problems = failed(results)
+    if server.peak_in_flight > limit:
+        problems.append(f"{server.peak_in_flight} requests in flight, max_concurrency={limit}")
+    if server.peak_in_flight < 2:
+        problems.append("requests were never concurrent")
+    server.shutdown()
+    return f"max_concurrency={limit}, peak in flight {server.peak_in_flight}", problems
+
+
+def paced(limit_kwargs: dict, burst: int, extra: int, per_call_s: float) -> tuple[float, list[str]]:
+    # the other limit is lifted, so only the one under test can pace the calls
+    server, url = start_mock_server()
+    results, elapsed = run(url, contexts(burst + extra), max_concurrency=32, **limit_kwargs)
+    problems = failed(results)
+    # the bucket starts full: ``burst`` calls go at once, each extra one waits per_call_s
+    expected = extra * per_call_s
+    if elapsed < expected * 0.9:
+        problems.append(f"{burst + extra} calls took {elapsed:.2f} s, the limit allows no less than {expected:.1f} s")
+    server.shutdown()
+    return elapsed, problems
+
+
+def check_request_limit() -> tuple[str, list[str]]:
+    rpm, extra = 120, 6
+    elapsed, problems = paced({"requests_per_minute": rpm, "tokens_per_minute": 1e12}, rpm, extra, 60 / rpm)
+    return f"{rpm + extra} calls at {rpm}/min in {elapsed:.2f} s", problems
+
+
+def check_token_limit() -> tuple[str, list[str]]:
+    per_call = estimate_tokens(contexts(1)[0])
+    calls, extra = 120, 6
+    tpm = per_call * calls
+    elapsed, problems = paced({"tokens_per_minute": tpm, "requests_per_minute": 1e9}, calls, extra, 60 / calls)
+    return f"{calls + extra} calls of ~{per_call} tokens at {tpm}/min in {elapsed:.2f} s", problems
+
+
+CHECKS = {
+    "dedup": check_dedup,
+    "retry": check_retry,
+    "retry-after": check_retry_after,
+    "concurrency": check_concurrency,
+    "requests/min": check_request_limit,
+    "tokens/min": check_token_limit,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checks", nargs="+", choices=list(CHECKS), default=list(CHECKS))
+    args = parser.parse_args()
+
+    failures = 0
+    for name in args.checks:
+        detail, problems = CHECKS[name]()
+        print(f"{'FAIL' if problems else 'ok':<5} {name:<14} {detail}")
+        for problem in problems:
+            print(f"      {problem}")
+        failures += bool(problems)
+
+    if failures:
+        print(f"{failures} of {len(args.checks)} checks failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
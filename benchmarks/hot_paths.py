@@ -0,0 +1,167 @@
+"""Per-sample hot paths against a stored baseline, failing on regressions.
+
+Times each case over the same synthetic samples (``--samples``, seeded) and
+reports the best of ``--repeat`` runs per sample:
+
+- ``extract_from_pdf``: generated lab report PDFs (``--pdfs`` of them)
+- ``extract_first_number``: every raw value of the samples
+- ``SoilSample``: parsing a report into the sample record
+- ``compute_score_card``: the indicator scores and weighted sum
+- ``fertilizer_requirements`` / ``fertilizer_products``: the element and product loops
+- ``analytical_table + html``: the report page's status table
+- ``render_reco_table``: the recommendations table
+- ``score card report`` / ``sample report``: the downloadable HTML reports (uncached)
+
+``--save`` writes the results as the baseline; ``--check`` compares with it
+and exits with status 1 when a case is more than ``--threshold`` percent
+slower. Baselines are per machine and default to ``.benchmarks/`` (not in
+git); record one before a change and check after it on the same machine.
+
+    python -m benchmarks.hot_paths --save
+    python -m benchmarks.hot_paths --check --threshold 15
+    python -m benchmarks.hot_paths --cases compute_score_card render_reco_table --check
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+from benchmarks.samples import synthetic_pdf, synthetic_samples
+from soil_health.ai import render_reco_table
+from soil_health.extraction import extract_from_pdf
+from soil_health.fertilizer import fertilizer_products, fertilizer_requirements
+from soil_health.report import render_sample_report, render_score_card_report
+from soil_health.rules import rule_based_recommendations
+from soil_health.sample import SoilSample
+from soil_health.scoring import compute_score_card, extract_first_number
+from soil_health.tables import analytical_table, status_table_html
+
+DEFAULT_BASELINE = os.path.join(".benchmarks", "hot_paths.json")
+
+
+def build_cases(samples: list[dict], pdf_count: int) -> dict:
+    """case -> (function over the whole input, number of items it processes)."""
+    records = [SoilSample(s["raw_data"], s["sample_info"]) for s in samples]
+    values = [v for s in samples for v in s["raw_data"].values()]
+    pdfs = [synthetic_pdf(s) for s in samples[:pdf_count]]
+    scores = [compute_score_card(r) for r in records]
+    fert_rows = [fertilizer_requirements(r) for r in records]
+    recommendations = [rule_based_recommendations(r, score[1]) for r, score in zip(records, scores)]
+    tables = [analytical_table(r) for r in records]
+    score_payloads = [
+        {
+            "overall_score": score[1],
+            "score_rows": score[0],
+            "reco_html": render_reco_table(reco),
+            "fert_rows": rows,
+            "product_rows": fertilizer_products(rows),
+        }
+        for score, rows, reco in zip(scores, fert_rows, recommendations)
+    ]
+    sample_payloads = [
+        {"sample_info": r.info, "rows": table[0].to_dict("records")} for r, table in zip(records, tables)
+    ]
+
+    def each(function, items):
+        return lambda: [function(item) for item in items]
+
+    return {
+        "extract_from_pdf": (each(lambda pdf: extract_from_pdf(io.BytesIO(pdf)), pdfs), len(pdfs)),
+        "extract_first_number": (each(extract_first_number, values), len(values)),
+        "SoilSample": (each(lambda s: SoilSample(s["raw_data"], s["sample_info"]), samples), len(samples)),
+        "compute_score_card": (each(compute_score_card, records), len(records)),
+        "fertilizer_requirements": (each(fertilizer_requirements, records), len(records)),
+        "fertilizer_products": (each(fertilizer_products, fert_rows), len(fert_rows)),
+        "analytical_table + html": (
+            each(lambda r: status_table_html(*analytical_table(r)), records), len(records)
+        ),
+        "render_reco_table": (each(render_reco_table, recommendations), len(recommendations)),
+        "score card report": (each(render_score_card_report, score_payloads), len(score_payloads)),
+        "sample report": (each(render_sample_report, sample_payloads), len(sample_payloads)),
+    }
+
+
+def best_us(function, items: int, repeat: int) -> float:
+    """Best wall time of ``repeat`` runs, per item, in microseconds (after one warm-up run)."""
+    function()
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - t0)
+    return best / items * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--pdfs", type=int, default=40, help="Generated PDFs for extract_from_pdf")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cases", nargs="+", default=None, help="Only these cases")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a case regressed past --threshold")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed slowdown in percent")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    cases = build_cases(synthetic_samples(args.samples, seed=args.seed), args.pdfs)
+    unknown = set(args.cases or ()) - set(cases)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}; choose from {', '.join(cases)}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    elif args.check:
+        parser.error(f"no baseline at {args.baseline}; record one with --save first")
+    if baseline and baseline.get("machine") != platform.node():
+        print(f"note: baseline recorded on {baseline.get('machine')!r}, this is {platform.node()!r}")
+
+    results, regressions = {}, []
+    print(f"{'case':<26} {'us / item':>11} {'baseline':>11} {'change':>9}")
+    for name, (function, items) in cases.items():
+        if args.cases and name not in args.cases:
+            continue
+        us = results[name] = round(best_us(function, items, args.repeat), 3)
+        before = baseline.get("cases", {}).get(name)
+        change = (us - before) / before * 100 if before else None
+        flag = ""
+        if change is not None and change > args.threshold:
+            regressions.append(name)
+            flag = "  REGRESSED"
+        print(
+            f"{name:<26} {us:11.2f} {before if before is not None else '':>11} "
+            f"{f'{change:+.1f}%' if change is not None else '':>9}{flag}"
+        )
+
+    report = {
+        "machine": platform.node(),
+        "python": sys.version.split()[0],
+        "samples": args.samples,
+        "pdfs": args.pdfs,
+        "cases": results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        saved = {**baseline, **report, "cases": {**baseline.get("cases", {}), **results}}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(saved, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({**report, "regressions": regressions}, f, indent=2)
+
+    if args.check and regressions:
+        print(f"{len(regressions)} case(s) more than {args.threshold:g}% slower than the baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""What a page waits for with the background job queue, against the work itself.
+
+Runs a bulk export of ``--samples`` synthetic samples inline (what the
+export page's script run used to block on), then the same export as a job
+with two workers: the time to submit it, the median / max time of a status
+poll while it runs, the time until it is done, and how long a running job
+takes to stop after ``cancel``.
+
+    python -m benchmarks.job_queue --samples 2000
+    python -m benchmarks.job_queue --samples 500 --format pdf --json jobs.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.samples import synthetic_samples
+from soil_health.export import export_zip
+from soil_health.jobs import ACTIVE, JobQueue, ensure_workers
+
+
+def wait_for(queue: JobQueue, job_id: int, polls: list[float]) -> dict:
+    while True:
+        t0 = time.perf_counter()
+        job = queue.get(job_id)
+        polls.append(time.perf_counter() - t0)
+        if job["status"] not in ACTIVE:
+            return job
+        time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--format", default="html", choices=["html", "pdf", "docx"])
+    parser.add_argument("--workers", type=int, default=1, help="Render processes inside the export")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="jobs_benchmark_")
+    samples = synthetic_samples(args.samples)
+    data = "".join(json.dumps(s, ensure_ascii=False) + "\n" for s in samples).encode("utf-8")
+    params = {"format": args.format, "workers": args.workers}
+
+    t0 = time.perf_counter()
+    export_zip(samples, os.path.join(directory, "inline.zip"), fmt=args.format, workers=args.workers)
+    inline = time.perf_counter() - t0
+
+    queue = JobQueue(os.path.join(directory, "jobs.sqlite3"))
+    ensure_workers(queue.path, 2)
+
+    t0 = time.perf_counter()
+    job_id = queue.submit("export", params, {"samples.jsonl": data})
+    submit = time.perf_counter() - t0
+    polls = []
+    job = wait_for(queue, job_id, polls)
+    done = time.perf_counter() - t0
+
+    # cancel a second export once it is under way
+    cancel_id = queue.submit("export", params, {"samples.jsonl": data})
+    while (queue.get(cancel_id)["progress"] or 0) < 0.2 and queue.get(cancel_id)["status"] in ACTIVE:
+        time.sleep(0.05)
+    t0 = time.perf_counter()
+    queue.cancel(cancel_id)
+    cancelled = wait_for(queue, cancel_id, [])
+    stop = time.perf_counter() - t0
+
+    report = {
+        "python": sys.version.split()[0],
+        "samples": args.samples,
+        "format": args.format,
+        "inline_export_s": round(inline, 2),
+        "submit_ms": round(submit * 1000, 2),
+        "poll_ms_median": round(statistics.median(polls) * 1000, 3),
+        "poll_ms_max": round(max(polls) * 1000, 3),
+        "job_done_s": round(done, 2),
+        "job_status": job["status"],
+        "cancel_to_stopped_s": round(stop, 2),
+        "cancelled_status": cancelled["status"],
+    }
+    print(f"inline export (blocks the script run)  {report['inline_export_s']:8.2f} s")
+    print(f"submit job                             {report['submit_ms']:8.2f} ms")
+    print(f"status poll, median / max              {report['poll_ms_median']:8.3f} / {report['poll_ms_max']:.3f} ms")
+    print(f"job submitted -> {job['status']:<22}{report['job_done_s']:8.2f} s")
+    print(f"cancel -> {cancelled['status']:<29}{report['cancel_to_stopped_s']:8.2f} s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""Rerun latency and server memory under concurrent Streamlit sessions.
+
+Starts ``streamlit run main.py`` (and the mock OpenAI server, with
+``--latency`` per call) as subprocesses and drives ``--sessions`` browser
+sessions over the app's websocket at once, the way the frontend does: each
+session opens the main page, types a synthetic sample's values one field
+per rerun, generates the report (switching to ``pages/report_page.py``),
+opens the score card (``pages/soil_score_card.py``, one LLM call per
+session as every sample differs) and changes the crop group once.
+
+For every step it reports p50 / p95 / p99 of the time from sending the
+rerun to its ``script_finished`` message, and the server's resident memory
+idle, after one warm-up session, at the peak of the run and once the
+sessions have disconnected. Each ``--sessions`` value gets a fresh server.
+The per-stage timings of the server's traces (``SOIL_HEALTH_TRACE_FILE``)
+are summarised per page. All processes share this machine's CPUs, so the
+client side takes some of the capacity being measured.
+
+    python -m benchmarks.load_sessions --sessions 1 5 10 20
+    python -m benchmarks.load_sessions --sessions 25 --think 1.0 --latency 1.5 --json load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from websockets.asyncio.client import connect
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from benchmarks.api_throughput import ROOT, start
+from benchmarks.samples import synthetic_samples
+from soil_health.sample import PARAMS
+
+STEPS = ["main: open", "main: edit field", "main -> report", "report -> score card", "score card: crop group"]
+FINISHED = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+KEYS = {p["label"]: p["key"] for p in PARAMS}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_mb(pid: int) -> float | None:
+    """Resident set size from /proc (Linux); None elsewhere."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def start_streamlit(directory: str, mock_url: str) -> tuple[subprocess.Popen, int]:
+    """The app on a free port, with LLM calls going to the mock server."""
+    port = free_port()
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "benchmark",
+        "OPENAI_BASE_URL": mock_url,
+        "SOIL_HEALTH_TRACE_FILE": os.path.join(directory, "trace.jsonl"),
+        "SOIL_HEALTH_CACHE_DB": os.path.join(directory, "no-prewarmed-cache.sqlite3"),
+        "SOIL_HEALTH_ARCHIVE_DB": os.path.join(directory, "archive.sqlite3"),
+        "SOIL_HEALTH_PARQUET_DIR": os.path.join(directory, "parquet"),
+    }
+    log = open(os.path.join(directory, "streamlit.log"), "w")
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", "main.py", "--server.headless", "true",
+            "--server.port", str(port), "--server.fileWatcherType", "none",
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return proc, port
+        except OSError:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"streamlit did not start, see {log.name}")
+
+
+class Session:
+    """One browser tab: sends reruns with the widget values it has set so far."""
+
+    def __init__(self, ws, timeout: float):
+        self.ws = ws
+        self.timeout = timeout
+        self.page_hash = ""
+        self.widgets = {}  # widget key (or label when unkeyed) -> widget id
+        self.states = {}  # widget id -> WidgetState sent with every rerun
+        self.errors = []
+
+    def set(self, name: str, **value):
+        widget_id = self.widgets[name]
+        self.states[widget_id] = WidgetState(id=widget_id, **value)
+
+    async def click(self, label: str) -> float:
+        return await self.rerun(WidgetState(id=self.widgets[label], trigger_value=True))
+
+    async def rerun(self, trigger: WidgetState | None = None) -> float:
+        """Seconds until the run (and any page it switches to) has finished."""
+        back = BackMsg()
+        back.rerun_script.page_script_hash = self.page_hash
+        back.rerun_script.widget_states.widgets.extend(self.states.values())
+        if trigger is not None:
+            back.rerun_script.widget_states.widgets.append(trigger)
+        t0 = time.perf_counter()
+        await self.ws.send(back.SerializeToString())
+        await asyncio.wait_for(self.receive_run(), self.timeout)
+        return time.perf_counter() - t0
+
+    async def receive_run(self):
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                if msg.new_session.page_script_hash != self.page_hash:
+                    self.page_hash = msg.new_session.page_script_hash
+                    self.states.clear()
+                self.widgets.clear()
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self.element(msg.delta.new_element)
+            elif kind == "script_finished" and msg.script_finished in FINISHED:
+                return
+
+    def element(self, element):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors.append(f"{element.exception.type}: {element.exception.message}")
+            return
+        widget_id = getattr(getattr(element, kind), "id", "")
+        if widget_id.startswith("$$ID-"):
+            key = widget_id.rsplit("-", 1)[1]
+            self.widgets[key if key != "None" else getattr(element, kind).label] = widget_id
+
+
+async def session_flow(url: str, sample: dict, think: float, timeout: float, record, rng: random.Random):
+    """main page -> report page -> score card, with ``think`` seconds (±50%) between actions."""
+    async with connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        session = Session(ws, timeout)
+
+        async def step(name: str, action):
+            await asyncio.sleep(think * rng.uniform(0.5, 1.5))
+            record(name, await action)
+
+        await step("main: open", session.rerun())
+        main_hash = session.page_hash
+        for label, value in sample["raw_data"].items():
+            if label in KEYS and f"val_{KEYS[label]}" in session.widgets:
+                session.set(f"val_{KEYS[label]}", string_value=value)
+                await step("main: edit field", session.rerun())
+        session.set("val_texture", string_value=sample["raw_data"]["Soil Texture Class"])
+        await step("main: edit field", session.rerun())
+
+        await step("main -> report", session.click("Generate Official Soil Health Report"))
+        if session.page_hash == main_hash:
+            raise RuntimeError("the main page did not switch to the report page")
+        report_hash = session.page_hash
+        await step("report -> score card", session.click("Generate Soil Health Score Card"))
+        if session.page_hash == report_hash:
+            raise RuntimeError("the report page did not switch to the score card")
+        session.set("Select crop group / اختر المجموعة المحصولية", string_value="Field crops")
+        await step("score card: crop group", session.rerun())
+        if session.errors:
+            raise RuntimeError(session.errors[0])
+
+
+async def run_sessions(url: str, samples: list[dict], think: float, timeout: float, server_pid: int) -> dict:
+    latencies = {name: [] for name in STEPS}
+    errors = []
+    peak = [rss_mb(server_pid) or 0.0]
+
+    async def sample_rss():
+        while True:
+            peak[0] = max(peak[0], rss_mb(server_pid) or 0.0)
+            await asyncio.sleep(0.25)
+
+    async def one(i: int, sample: dict):
+        try:
+            await session_flow(url, sample, think, timeout, lambda n, s: latencies[n].append(s), random.Random(i))
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+
+    sampler = asyncio.create_task(sample_rss())
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i, s) for i, s in enumerate(samples)))
+    wall = time.perf_counter() - started
+    sampler.cancel()
+    return {"latencies": latencies, "errors": errors, "peak_rss_mb": peak[0], "wall_s": wall}
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"reruns": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+    cuts = statistics.quantiles(values, n=100, method="inclusive") if len(values) > 1 else [values[0]] * 99
+    return {
+        "reruns": len(values),
+        "p50_ms": round(statistics.median(values) * 1000, 1),
+        "p95_ms": round(cuts[94] * 1000, 1),
+        "p99_ms": round(cuts[98] * 1000, 1),
+    }
+
+
+def trace_summary(path: str) -> dict:
+    """page -> {"reruns", "p50_ms", "stages": {stage: median ms per rerun}} from the server's traces."""
+    by_page = {}
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            trace = json.loads(line)
+            by_page.setdefault(trace["page"], []).append(trace)
+    summary = {}
+    for page, traces in sorted(by_page.items()):
+        stages = {}
+        for trace in traces:
+            for name, stage in trace["stages"].items():
+                stages.setdefault(name, []).append(stage["ms"])
+        summary[page] = {
+            "reruns": len(traces),
+            "p50_ms": round(statistics.median(t["total_ms"] for t in traces), 1),
+            "stages": {name: round(statistics.median(ms), 2) for name, ms in stages.items()},
+        }
+    return summary
+
+
+def run_level(sessions: int, args, mock_url: str, seed: int) -> dict:
+    directory = tempfile.mkdtemp(prefix="load_sessions_")
+    server, port = start_streamlit(directory, mock_url)
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    try:
+        idle = rss_mb(server.pid)
+        warm_up = asyncio.run(run_sessions(url, synthetic_samples(1, seed=seed), 0.0, args.timeout, server.pid))
+        if warm_up["errors"]:
+            raise RuntimeError(f"warm-up session failed: {warm_up['errors'][0]}")
+        warm = rss_mb(server.pid)
+        open(os.path.join(directory, "trace.jsonl"), "w").close()
+
+        run = asyncio.run(
+            run_sessions(url, synthetic_samples(sessions, seed=seed + 1), args.think, args.timeout, server.pid)
+        )
+        time.sleep(2.0)  # let the server drop the disconnected sessions' script threads
+        after = rss_mb(server.pid)
+        all_reruns = [s for values in run["latencies"].values() for s in values]
+        return {
+            "sessions": sessions,
+            "wall_s": round(run["wall_s"], 2),
+            "steps": {name: percentiles(values) for name, values in run["latencies"].items()},
+            "all": percentiles(all_reruns),
+            "errors": len(run["errors"]),
+            "first_error": run["errors"][0] if run["errors"] else None,
+            "rss_mb": {
+                "idle": idle and round(idle, 1),
+                "warm": warm and round(warm, 1),
+                "peak": round(run["peak_rss_mb"], 1),
+                "after": after and round(after, 1),
+                "growth_per_session": round((run["peak_rss_mb"] - warm) / sessions, 2) if warm else None,
+            },
+            "server_traces": trace_summary(os.path.join(directory, "trace.jsonl")),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def print_level(level: dict, args):
+    print(f"\nsessions={level['sessions']}  think={args.think}s  LLM latency={args.latency}s  wall={level['wall_s']}s")
+    print(f"{'step':<24} {'reruns':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in [*level["steps"].items(), ("all reruns", level["all"])]:
+        if row["reruns"]:
+            print(f"{name:<24} {row['reruns']:7d} {row['p50_ms']:9.1f} {row['p95_ms']:9.1f} {row['p99_ms']:9.1f}")
+    rss = level["rss_mb"]
+    print(
+        f"server RSS MB: idle {rss['idle']}, warm {rss['warm']}, peak {rss['peak']}, after {rss['after']} "
+        f"({rss['growth_per_session']} per session at peak)"
+    )
+    for page, trace in level["server_traces"].items():
+        stages = ", ".join(f"{name} {ms:g}" for name, ms in trace["stages"].items())
+        print(f"  {page:<11} p50 {trace['p50_ms']:7.1f} ms script time; stage p50 ms: {stages}")
+    if level["errors"]:
+        print(f"  {level['errors']} session(s) failed, first: {level['first_error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--think", type=float, default=0.3, help="Mean seconds between a session's actions")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock LLM latency (s)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds before a rerun counts as failed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    mock, mock_url = start(["soil_health.mock_openai", "--port", "0", "--latency", str(args.latency)])
+    report = {"python": sys.version.split()[0], "cpus": os.cpu_count(), "think_s": args.think,
+              "llm_latency_s": args.latency, "levels": []}
+    try:
+        for i, sessions in enumerate(args.sessions):
+            level = run_level(sessions, args, mock_url, seed=args.seed + 1000 * i)
+            print_level(level, args)
+            report["levels"].append(level)
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Analytics queries on the Parquet archive, against the same on the SQLite archive.
+
+Fills a fresh Parquet archive with synthetic samples (received dates over
+2023-2025, as in ``archive_query``), then times trend-style questions:
+a few columns over many rows, grouped by site and month. For each it
+prints how many of the dataset's files the partition filter leaves to
+read. With ``--sqlite`` the same samples also go into a SQLite archive and
+each question is answered the row-by-row way (``find`` without a limit,
+then Python) for comparison.
+
+    python -m benchmarks.parquet_scan --rows 100000
+    python -m benchmarks.parquet_scan --rows 50000 --sqlite --json parquet.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks.archive_query import dated
+from benchmarks.samples import SITES, synthetic_samples
+from soil_health.parquet_archive import ParquetArchive, _expression
+
+QUERIES = {
+    "mean ECe by site and month": dict(summary=["v_ece"]),
+    "site X, 2025, ECe > 8": dict(
+        columns=["month", "report_no", "v_ece", "overall_score"],
+        sites=[SITES[0]], months=("2025-01", "2025-12"), filters=[("v_ece", ">", 8)],
+    ),
+    "score trend, two sites": dict(summary=["overall_score", "s_ph", "s_ece"], sites=SITES[:2]),
+    "urea need, one quarter": dict(summary=["need_n", "rate_urea"], months=("2024-04", "2024-06")),
+    "salinity flag, all rows": dict(columns=["site", "flag_salinity"]),
+}
+
+# the same questions through SampleArchive.find (None: no SQLite equivalent)
+SQLITE_QUERIES = {
+    "mean ECe by site and month": (dict(), "v_ece"),
+    "site X, 2025, ECe > 8": (
+        dict(site=SITES[0], received_from="2025-01-01", received_to="2025-12-31", values={"ECe": (">", 8)}), None
+    ),
+    "score trend, two sites": None,  # indicator scores are a JSON document there
+    "urea need, one quarter": None,  # so are the fertilizer tables
+    "salinity flag, all rows": None,
+}
+
+
+def fill(archive: ParquetArchive, rows: int, sqlite=None, chunk: int = 20000) -> float:
+    t0 = time.perf_counter()
+    for offset in range(0, rows, chunk):
+        batch = dated(synthetic_samples(min(chunk, rows - offset), seed=offset))
+        for i, payload in enumerate(batch):
+            payload["sample_info"]["report_no"] = f"SYN-{offset + i + 1:06d}"
+        archive.append(batch)
+        if sqlite is not None:
+            sqlite.save_many(batch)
+    return time.perf_counter() - t0
+
+
+def run_parquet(archive: ParquetArchive, query: dict):
+    if "summary" in query:
+        return archive.monthly_summary(query["summary"], query.get("filters"), query.get("sites"), query.get("months"))
+    return archive.scan(query.get("columns"), query.get("filters"), query.get("sites"), query.get("months"))
+
+
+def run_sqlite(archive, kwargs: dict, column: str | None):
+    rows = archive.find(**kwargs, limit=None)
+    if column is None:
+        return rows
+    groups = defaultdict(list)
+    for row in rows:
+        if row[column] is not None and row["received"]:
+            groups[row["site"], row["received"][:7]].append(row[column])
+    return {key: statistics.fmean(values) for key, values in groups.items()}
+
+
+def timed(function, runs: int):
+    timings = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - t0)
+    return result, statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--path", default=None, help="Dataset directory (default: a temporary directory)")
+    parser.add_argument("--sqlite", action="store_true", help="Also fill a SQLite archive and compare")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="parquet_benchmark_")
+    archive = ParquetArchive(args.path or os.path.join(directory, "parquet"))
+    sqlite = None
+    if args.sqlite:
+        from soil_health.archive import SampleArchive
+
+        sqlite = SampleArchive(os.path.join(directory, "archive.sqlite3"))
+    if len(archive) < args.rows:
+        seconds = fill(archive, args.rows, sqlite)
+        print(f"filled {args.rows} rows in {seconds:.1f} s ({args.rows / seconds:.0f} rows/s)")
+    if sqlite is not None:
+        sqlite.analyze()
+    files = archive.dataset().files
+    size = sum(os.path.getsize(f) for f in files)
+    print(f"{len(archive)} rows, {len(files)} files, {size / 2**20:.1f} MiB\n")
+
+    report = {"rows": len(archive), "files": len(files), "mib": round(size / 2**20, 2), "queries": {}}
+    print(f"{'query':<30} {'rows':>6} {'files read':>11} {'parquet ms':>11} {'sqlite ms':>10}")
+    for name, query in QUERIES.items():
+        result, parquet_ms = timed(lambda: run_parquet(archive, query), args.runs)
+        expression = _expression(None, query.get("sites"), query.get("months"))
+        read = sum(1 for _ in archive.dataset().get_fragments(filter=expression))
+        sqlite_ms = None
+        if sqlite is not None and SQLITE_QUERIES.get(name):
+            kwargs, column = SQLITE_QUERIES[name]
+            _, sqlite_ms = timed(lambda: run_sqlite(sqlite, kwargs, column), max(1, args.runs // 5))
+        report["queries"][name] = {
+            "rows": result.num_rows, "files_read": read, "parquet_ms": round(parquet_ms, 2),
+            "sqlite_ms": round(sqlite_ms, 2) if sqlite_ms is not None else None,
+        }
+        print(
+            f"{name:<30} {result.num_rows:6d} {f'{read}/{len(files)}':>11} {parquet_ms:11.2f} "
+            f"{f'{sqlite_ms:.2f}' if sqlite_ms is not None else '-':>10}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Prompt compaction benchmark: full vs constraint-focused compact prompts.
+
+Offline it measures prompt size on synthetic reports and checks that the
+compact context keeps every parameter that matters: all out-of-range values
+and every parameter behind a raised constraint flag. With ``--live`` each
+sample is also sent in both forms (to ``--base-url`` or a local mock
+server) to compare latency, reported prompt tokens and schema validity.
+
+    python -m benchmarks.prompt_compaction --samples 200
+    python -m benchmarks.prompt_compaction --samples 20 --live
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.samples import synthetic_raw_data
+from soil_health.ai import MODEL, TEMPERATURE, build_ai_context, build_messages, make_client
+from soil_health.rules import RULE_THRESHOLDS, constraint_flags
+from soil_health.schema import invalid_entries, parse_recommendations
+from soil_health.scoring import PARAM_TO_INDICATOR, compute_score_card, extract_first_number
+from soil_health.specs import PARAM_SPECS, range_status
+
+
+def prompt_chars(messages: list[dict]) -> int:
+    return sum(len(m["content"]) for m in messages)
+
+
+def required_labels(raw_data: dict) -> set[str]:
+    """Parameters the compact context must not drop."""
+    flags = set(constraint_flags(raw_data))
+    needed = {label for flag, label, _, _ in RULE_THRESHOLDS if flag in flags}
+    for label, spec in PARAM_SPECS.items():
+        if range_status(extract_first_number(raw_data.get(label)), spec) in ("low", "high"):
+            needed.add(label)
+    return needed
+
+
+def missing_from(context: str, labels: set[str]) -> list[str]:
+    names = {row.split("|", 1)[0] for row in context.splitlines()}
+    missing = []
+    for label in labels:
+        name = PARAM_TO_INDICATOR[label][0] if label in PARAM_TO_INDICATOR else label
+        if name not in names:
+            missing.append(label)
+    return missing
+
+
+def offline(samples: list[dict]):
+    full_sizes, compact_sizes, full_ctx, compact_ctx = [], [], [], []
+    gaps = 0
+    for raw in samples:
+        _, score, _ = compute_score_card(raw)
+        full = build_ai_context(raw, score, compact=False)
+        compact = build_ai_context(raw, score, compact=True)
+        full_ctx.append(len(full))
+        compact_ctx.append(len(compact))
+        full_sizes.append(prompt_chars(build_messages(full, compact=False)))
+        compact_sizes.append(prompt_chars(build_messages(compact, compact=True)))
+        if missing_from(compact, required_labels(raw)):
+            gaps += 1
+
+    full_total, compact_total = statistics.mean(full_sizes), statistics.mean(compact_sizes)
+    print(f"{'':<22}{'full':>10}{'compact':>10}")
+    print(f"{'user context (chars)':<22}{statistics.mean(full_ctx):>10.0f}{statistics.mean(compact_ctx):>10.0f}")
+    print(f"{'whole prompt (chars)':<22}{full_total:>10.0f}{compact_total:>10.0f}")
+    print(f"{'~tokens (chars / 4)':<22}{full_total / 4:>10.0f}{compact_total / 4:>10.0f}")
+    print(f"prompt reduction: {(1 - compact_total / full_total) * 100:.1f}%")
+    print(f"constraint coverage: {len(samples) - gaps}/{len(samples)} samples keep every required parameter")
+    return gaps
+
+
+def live(samples: list[dict], base_url: str | None):
+    server = None
+    if base_url is None:
+        from soil_health.mock_openai import start_mock_server
+        server, base_url = start_mock_server(latency=0.05)
+    client = make_client("sk-benchmark") if server else make_client()
+    if client is None:
+        raise SystemExit("OPENAI_API_KEY is not configured")
+    client = client.with_options(base_url=base_url)
+
+    stats = {}
+    for compact in (False, True):
+        latencies, tokens, valid = [], [], 0
+        for raw in samples:
+            _, score, _ = compute_score_card(raw)
+            context = build_ai_context(raw, score, compact=compact)
+            started = time.perf_counter()
+            resp = client.chat.completions.create(
+                model=MODEL,
+                temperature=TEMPERATURE,
+                messages=build_messages(context, compact),
+            )
+            latencies.append(time.perf_counter() - started)
+            if resp.usage is not None:
+                tokens.append(resp.usage.prompt_tokens)
+            if not invalid_entries(parse_recommendations(resp.choices[0].message.content)):
+                valid += 1
+        stats["compact" if compact else "full"] = (latencies, tokens, valid)
+
+    if server is not None:
+        server.shutdown()
+
+    print(f"\nlive against {base_url}")
+    for name, (latencies, tokens, valid) in stats.items():
+        p50 = statistics.median(latencies) * 1000
+        p_tokens = f"{statistics.mean(tokens):.0f}" if tokens else "n/a"
+        print(f"{name:<8} p50 {p50:7.1f} ms  prompt tokens {p_tokens:>6}  schema-valid {valid}/{len(samples)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--live", action="store_true", help="Also send both prompt forms to the API")
+    parser.add_argument("--base-url", help="API base URL for --live (default: local mock server)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = [synthetic_raw_data(rng) for _ in range(args.samples)]
+    gaps = offline(samples)
+    if args.live:
+        live(samples, args.base_url)
+    if gaps:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Synthetic lab reports shaped like the PDF extraction output.
+
+Values are drawn per parameter from ranges typical of UAE sandy soils, so a
+batch mixes clean samples with saline, sodic, alkaline and micronutrient
+deficient ones. Seeded for repeatable benchmark runs.
+"""
+
+import io
+import random
+
+# label -> (low, high, decimals); every label matches soil_health.sample.PARAMS
+RANGES = {
+    "pH (paste extract)":          (7.0, 8.9, 1),
+    "ECe":                         (0.5, 14.0, 1),
+    "Organic Matter":              (0.2, 2.5, 2),
+    "SAR":                         (1.0, 20.0, 1),
+    "ESP":                         (1.0, 24.0, 1),
+    "CEC":                         (2.0, 14.0, 1),
+    "CaCO₃":                       (5.0, 45.0, 1),
+    "Saturation Percentage":       (18.0, 35.0, 0),
+    "Soluble Calcium (Ca²⁺)":      (40.0, 900.0, 0),
+    "Soluble Magnesium (Mg²⁺)":    (10.0, 400.0, 0),
+    "Soluble Sodium (Na⁺)":        (30.0, 2500.0, 0),
+    "Soluble Potassium (K⁺)":      (5.0, 120.0, 0),
+    "Soluble Chloride (Cl⁻)":      (50.0, 4000.0, 0),
+    "Soluble Bicarbonate (HCO₃⁻)": (40.0, 400.0, 0),
+    "Soluble Sulfate (SO₄²⁻)":     (50.0, 2500.0, 0),
+    "Exchangeable Calcium":        (600.0, 2600.0, 0),
+    "Exchangeable Magnesium":      (60.0, 320.0, 0),
+    "Exchangeable Sodium":         (20.0, 600.0, 0),
+    "Exchangeable Potassium":      (40.0, 300.0, 0),
+    "Available Nitrogen (N)":      (2.0, 40.0, 1),
+    "Available Phosphorus (P)":    (3.0, 45.0, 1),
+    "Available Potassium (K)":     (40.0, 260.0, 0),
+    "Available Sulfur (S)":        (4.0, 30.0, 1),
+    "Iron (Fe)":                   (1.0, 12.0, 2),
+    "Zinc (Zn)":                   (0.2, 3.0, 2),
+    "Copper (Cu)":                 (0.1, 1.5, 2),
+    "Manganese (Mn)":              (1.0, 12.0, 2),
+    "Boron (B)":                   (0.1, 1.4, 2),
+    "Molybdenum (Mo)":             (0.01, 0.2, 3),
+    "Bulk Density":                (1.3, 1.7, 2),
+    "Water Holding Capacity":      (8.0, 25.0, 1),
+    "Infiltration Rate":           (20.0, 200.0, 0),
+}
+
+TEXTURES = ["Sand", "Sand", "Sand", "Loamy sand", "Sandy loam"]
+SITES = ["Al Ain", "Liwa", "Madinat Zayed", "Al Dhaid", "Dibba", "Ras Al Khaimah"]
+OPTIONAL = ["Bulk Density", "Water Holding Capacity", "Infiltration Rate", "Molybdenum (Mo)"]
+
+# label -> line prefix as printed on an Innovation Oasis report (what extract_from_pdf matches)
+PDF_LINES = {
+    "pH (paste extract)":          ("pH (paste extract)", ""),
+    "Organic Matter":              ("Organic Matter", "%"),
+    "ESP":                         ("ESP", "%"),
+    "SAR":                         ("Sodium Adsorption Ratio (SAR)", ""),
+    "CEC":                         ("Cation Exchange Capacity", "meq/100g"),
+    "Soluble Calcium (Ca²⁺)":      ("Soluble Calcium", "mg/L"),
+    "Soluble Magnesium (Mg²⁺)":    ("Soluble Magnesium", "mg/L"),
+    "Soluble Sodium (Na⁺)":        ("Soluble Sodium", "mg/L"),
+    "Soluble Potassium (K⁺)":      ("Soluble Potassium", "mg/L"),
+    "Soluble Chloride (Cl⁻)":      ("Soluble Chloride", "mg/L"),
+    "Soluble Bicarbonate (HCO₃⁻)": ("Soluble Bicarbonate", "mg/L"),
+    "Soluble Sulfate (SO₄²⁻)":     ("Soluble Sulfate", "mg/L"),
+    "Exchangeable Calcium":        ("Exchangeable Calcium", "mg/kg"),
+    "Exchangeable Magnesium":      ("Exchangeable Magnesium", "mg/kg"),
+    "Exchangeable Sodium":         ("Exchangeable Sodium", "mg/kg"),
+    "Exchangeable Potassium":      ("Exchangeable Potassium", "mg/kg"),
+    "Available Nitrogen (N)":      ("Available Nitrogen", "mg/kg"),
+    "Available Phosphorus (P)":    ("Available Phosphorus", "mg/kg"),
+    "Available Potassium (K)":     ("Available Potassium", "mg/kg"),
+    "Available Sulfur (S)":        ("Available Sulfur", "mg/kg"),
+    "Iron (Fe)":                   ("Available Iron", "mg/kg"),
+    "Zinc (Zn)":                   ("Available Zinc", "mg/kg"),
+    "Copper (Cu)":                 ("Available Copper", "mg/kg"),
+    "Manganese (Mn)":              ("Available Manganese", "mg/kg"),
+    "Boron (B)":                   ("Available Boron", "mg/kg"),
+    "Molybdenum (Mo)":             ("Available Molybdenum", "mg/kg"),
+}
+
+
+def synthetic_raw_data(rng: random.Random) -> dict:
+    raw = {}
+    for label, (low, high, decimals) in RANGES.items():
+        if label in OPTIONAL and rng.random() < 0.4:
+            raw[label] = "Not analyzed"
+            continue
+        value = rng.uniform(low, high)
+        raw[label] = f"{value:.{decimals}f}" if decimals else str(int(round(value)))
+        if label == "Available Sulfur (S)" and rng.random() < 0.1:
+            raw[label] = "<LOQ"
+    raw["Soil Texture Class"] = rng.choice(TEXTURES)
+    return raw
+
+
+def synthetic_samples(n: int, seed: int = 0) -> list[dict]:
+    """``n`` report payloads (``sample_info`` + ``raw_data``) as stored in session state."""
+    rng = random.Random(seed)
+    return [
+        {
+            "sample_info": {
+                "customer": f"Farm {i % 40 + 1}",
+                "report_no": f"SYN-{i + 1:05d}",
+                "site": rng.choice(SITES),
+            },
+            "raw_data": synthetic_raw_data(rng),
+        }
+        for i in range(n)
+    ]
+
+
+def report_lines(sample: dict) -> list[str]:
+    """The text lines of a lab report PDF for one synthetic sample."""
+    info, raw = sample["sample_info"], sample["raw_data"]
+    lines = [
+        f"Customer Name Dr Ahmed - AK ({info['customer']})",
+        f"Test Report No. SP-{int(info['report_no'].split('-')[-1]):04d}-25",
+        f"Sample Description * {raw['Soil Texture Class']} topsoil 0-30 cm",
+        "Received on 12/03/2025",
+        "Analysed on 14/03/2025",
+        f"Site {info['site']}",
+        f"ECe {int(float(raw['ECe']) * 1000)} uS/cm",
+    ]
+    for label, (text, unit) in PDF_LINES.items():
+        if raw.get(label, "Not analyzed") != "Not analyzed":
+            lines.append(f"{text} {raw[label]} {unit}".rstrip())
+    return lines
+
+
+def synthetic_pdf(sample: dict) -> bytes:
+    """A one-page lab report PDF (reportlab) with the sample's header fields and values."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buf = io.BytesIO()
+    pdf = canvas.Canvas(buf, pagesize=A4)
+    y = 800
+    for line in report_lines(sample):
+        pdf.drawString(60, y, line)
+        y -= 16
+    pdf.save()
+    return buf.getvalue()
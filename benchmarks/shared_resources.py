@@ -0,0 +1,113 @@
+"""Per-rerun cost of the pages with many concurrent sessions.
+
+Opens ``--sessions`` AppTest sessions per page (each holding a synthetic
+sample, no OpenAI key, no cache db), runs each once and then reruns it, as
+a widget interaction would. Reports per page:
+
+- median rerun time,
+- asset files read from the repo per rerun (logos, templates, ...; counted
+  with an ``open`` audit hook, page scripts excluded),
+- memory retained per session (tracemalloc, all sessions kept alive).
+
+    python -m benchmarks.shared_resources --sessions 50
+    python -m benchmarks.shared_resources --pages main.py pages/soil_score_card.py --json shared.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PAGES = ["main.py", "pages/soil_score_card.py", "pages/report_pagefinal.py", "pages/farm_comparison.py"]
+
+_reads = {"on": False, "count": 0, "bytes": 0}
+
+
+def _audit(event, args):
+    if event != "open" or not _reads["on"] or not isinstance(args[0], str):
+        return
+    path = os.path.abspath(args[0])
+    if path.startswith(ROOT) and not path.endswith((".py", ".pyc")):
+        _reads["count"] += 1
+        if os.path.isfile(path):
+            _reads["bytes"] += os.path.getsize(path)
+
+
+def run_page(page: str, sessions: int) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    from benchmarks.samples import synthetic_samples
+    from soil_health.sample import SoilSample
+
+    payloads = synthetic_samples(sessions)
+    # warm the process-wide caches once, as a running server would have
+    warm = AppTest.from_file(os.path.join(ROOT, page), default_timeout=120)
+    warm.session_state["sample"] = SoilSample.from_payload(payloads[0])
+    warm.run()
+    exceptions = [str(e.value)[:200] for e in warm.exception]
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    apps, reruns = [], []
+    _reads.update(count=0, bytes=0)
+    for payload in payloads:
+        at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=120)
+        at.session_state["sample"] = SoilSample.from_payload(payload)
+        at.run()
+        _reads["on"] = True
+        t0 = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - t0)
+        _reads["on"] = False
+        apps.append(at)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    return {
+        "rerun_ms": round(statistics.median(reruns) * 1000, 1),
+        "reads_per_rerun": round(_reads["count"] / sessions, 2),
+        "read_kib_per_rerun": round(_reads["bytes"] / sessions / 1024, 1),
+        "retained_kib_per_session": round(retained / sessions / 1024, 1),
+        "exceptions": exceptions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--pages", nargs="+", default=DEFAULT_PAGES, help="Page scripts relative to the repo root")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)  # the pages resolve logos relative to the working directory
+    os.environ.pop("OPENAI_API_KEY", None)
+    os.environ["SOIL_HEALTH_CACHE_DB"] = os.path.join(ROOT, ".shared-benchmark-missing.sqlite3")
+    sys.addaudithook(_audit)
+    logging.disable(logging.WARNING)  # bare-mode and widget-default warnings, once per session
+
+    report = {"python": sys.version.split()[0], "sessions": args.sessions, "pages": {}}
+    print(f"{'page':<30} {'rerun ms':>9} {'reads/rerun':>12} {'KiB read/rerun':>15} {'KiB/session':>12}")
+    for page in args.pages:
+        row = run_page(page, args.sessions)
+        report["pages"][page] = row
+        flag = "  (exception)" if row["exceptions"] else ""
+        print(
+            f"{page:<30} {row['rerun_ms']:9.1f} {row['reads_per_rerun']:12.2f} "
+            f"{row['read_kib_per_rerun']:15.1f} {row['retained_kib_per_session']:12.1f}{flag}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
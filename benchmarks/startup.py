@@ -0,0 +1,190 @@
+"""Cold-start benchmark per page: import cost and time to first render.
+
+Every measurement runs in a fresh interpreter, as in a newly scaled
+container, so module caches do not hide the cost.
+
+- ``imports``: the page's leading import block under
+  ``python -X importtime``; total and the heaviest top-level modules.
+- ``render``: ``import streamlit`` plus the first ``AppTest`` run of the
+  page (the session holds a synthetic sample, no OpenAI key, no cache db).
+- ``scenarios``: the score card page's old eager OpenAI setup against the
+  current lazy one.
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --mode render --pages main.py pages/report_page.py --json startup.json
+"""
+
+import argparse
+import ast
+import glob
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PAGES = ["main.py"] + sorted(os.path.relpath(p, ROOT) for p in glob.glob(os.path.join(ROOT, "pages", "*.py")))
+
+SCENARIOS = {
+    "eager (old page top)": (
+        "import openai, dotenv\n"
+        "dotenv.load_dotenv()\n"
+        "openai.OpenAI(api_key='sk-benchmark')\n"
+    ),
+    "lazy (current page top)": (
+        "import soil_health.ai, soil_health.cache, soil_health.rules, soil_health.scoring, soil_health.streaming\n"
+    ),
+}
+
+TIMER = (
+    "import time\n"
+    "t0 = time.perf_counter()\n"
+    "{body}"
+    "print(time.perf_counter() - t0)\n"
+)
+
+MARKER = "-- page imports --"
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+RENDER = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+from benchmarks.samples import synthetic_samples
+from soil_health.sample import SoilSample
+at = AppTest.from_file({page!r}, default_timeout=120)
+at.session_state["sample"] = SoilSample.from_payload(synthetic_samples(1)[0])
+t2 = time.perf_counter()
+at.run()
+t3 = time.perf_counter()
+print(json.dumps({{"streamlit_s": t1 - t0, "first_run_s": t3 - t2, "total_s": (t1 - t0) + (t3 - t2),
+                  "exceptions": [str(e.value)[:200] for e in at.exception]}}))
+"""
+
+
+def clean_env() -> dict:
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    env["SOIL_HEALTH_CACHE_DB"] = os.path.join(ROOT, ".startup-benchmark-missing.sqlite3")
+    return env
+
+
+def page_imports(path: str) -> str:
+    """Source of the page's leading import block (imports deferred further down are not paid at load)."""
+    with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    block = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            block.append(ast.unparse(node))
+        elif not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)):
+            break
+    return "\n".join(block)
+
+
+def import_profile(path: str) -> dict:
+    code = f"import sys\nsys.stderr.write({MARKER!r} + '\\n')\n{page_imports(path)}\n"
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=clean_env(), capture_output=True, text=True, check=True,
+    )
+    lines = out.stderr.split(MARKER, 1)[-1].splitlines()
+    top = []
+    for line in lines:
+        m = IMPORTTIME_RE.match(line)
+        if m and len(m.group(3)) == 1:  # top-level entry: cumulative includes its children
+            top.append((m.group(4), int(m.group(2)) / 1000))
+    return {"total_ms": sum(ms for _, ms in top), "top": sorted(top, key=lambda t: -t[1])[:5]}
+
+
+def render_once(path: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", RENDER.format(page=os.path.join(ROOT, path))],
+        cwd=ROOT, env=clean_env(), capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def time_scenario(body: str, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", TIMER.format(body=body)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def run_imports(pages: list[str], runs: int) -> dict:
+    results = {}
+    print(f"{'page':<30} {'imports ms':>11}  heaviest top-level modules")
+    for page in pages:
+        profiles = [import_profile(page) for _ in range(runs)]
+        total = statistics.median(p["total_ms"] for p in profiles)
+        top = profiles[-1]["top"]
+        results[page] = {"imports_ms": round(total, 1), "top": top}
+        heaviest = ", ".join(f"{name} {ms:.0f}" for name, ms in top[:3])
+        print(f"{page:<30} {total:11.1f}  {heaviest}")
+    return results
+
+
+def run_render(pages: list[str], runs: int) -> dict:
+    results = {}
+    print(f"{'page':<30} {'streamlit ms':>12} {'first run ms':>13} {'cold total ms':>14}")
+    for page in pages:
+        samples = [render_once(page) for _ in range(runs)]
+        row = {
+            key: round(statistics.median(s[key] for s in samples) * 1000, 1)
+            for key in ("streamlit_s", "first_run_s", "total_s")
+        }
+        row["exceptions"] = samples[-1]["exceptions"]
+        results[page] = row
+        flag = "  (exception)" if row["exceptions"] else ""
+        print(f"{page:<30} {row['streamlit_s']:12.1f} {row['first_run_s']:13.1f} {row['total_s']:14.1f}{flag}")
+    return results
+
+
+def run_scenarios(runs: int) -> dict:
+    results = {}
+    for name, body in SCENARIOS.items():
+        timings = time_scenario(body, runs)
+        results[name] = statistics.median(timings)
+        print(f"{name:<28} median {results[name] * 1000:8.1f} ms  (min {min(timings) * 1000:.1f} ms)")
+
+    eager, lazy = results.values()
+    print(f"{'saved at page load':<28}        {(eager - lazy) * 1000:8.1f} ms")
+    return {name: round(s * 1000, 1) for name, s in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mode", choices=["imports", "render", "scenarios", "all"], default="all")
+    parser.add_argument("--pages", nargs="+", default=DEFAULT_PAGES, help="Page scripts relative to the repo root")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "runs": args.runs}
+    if args.mode in ("imports", "all"):
+        report["imports"] = run_imports(args.pages, args.runs)
+    if args.mode in ("render", "all"):
+        print()
+        report["render"] = run_render(args.pages, args.runs)
+    if args.mode in ("scenarios", "all"):
+        print()
+        report["scenarios"] = run_scenarios(args.runs)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Styled analytical table benchmark: pandas Styler vs the class-based renderer.
+
+Stacks the analytical rows of N synthetic samples (as a multi-sample table
+would) and times building the table plus its HTML both ways.
+
+    python -m benchmarks.styled_table --samples 300
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.samples import synthetic_samples
+from soil_health.scoring import extract_first_number
+from soil_health.specs import PARAM_SPECS, format_range
+from soil_health.tables import analytical_frame, status_table_html
+
+
+def styler_html(items: list[tuple[str, str]]) -> str:
+    """The report page's previous path: per-row comment, Styler.apply, to_html."""
+    rows = []
+    for key, val in items:
+        num_val = extract_first_number(val)
+        spec = PARAM_SPECS.get(key)
+        opt_min = spec["opt_min"] if spec else None
+        opt_max = spec["opt_max"] if spec else None
+        comment = ""
+        if str(val).lower() == "not analyzed":
+            comment = "Not analyzed"
+        elif spec and num_val is not None:
+            if opt_min is not None and num_val < opt_min:
+                comment = "Below optimum range"
+            elif opt_max is not None and num_val > opt_max:
+                comment = "Above optimum range"
+            else:
+                comment = "Within optimum range"
+        elif spec and num_val is None:
+            comment = "No numeric value"
+        rows.append({
+            "Parameter": key,
+            "Value": val,
+            "Unit": spec["unit"] if spec else "",
+            "Optimum range": format_range(opt_min, opt_max) if spec else "",
+            "Comment": comment,
+        })
+    df = pd.DataFrame(rows)
+
+    def highlight_row(row):
+        comment = str(row.get("Comment", "")).lower()
+        if "within optimum" in comment:
+            return ["background-color: #d4edda"] * len(row)
+        if "above" in comment:
+            return ["background-color: #f8d7da"] * len(row)
+        if "below" in comment:
+            return ["background-color: #fff3cd"] * len(row)
+        if "not analyzed" in comment or "no numeric" in comment:
+            return ["background-color: #e2e3e5"] * len(row)
+        return [""] * len(row)
+
+    return df.style.apply(highlight_row, axis=1).to_html()
+
+
+def class_html(items: list[tuple[str, str]]) -> str:
+    labels, values = zip(*items)
+    df, codes = analytical_frame(list(labels), list(values))
+    return status_table_html(df, codes)
+
+
+def best_of(fn, arg, repeat: int) -> tuple[float, str]:
+    best, out = float("inf"), ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn(arg)
+        best = min(best, time.perf_counter() - started)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    items = [(k, v) for s in synthetic_samples(args.samples) for k, v in s["raw_data"].items()]
+    old_t, old_html = best_of(styler_html, items, args.repeat)
+    new_t, new_html = best_of(class_html, items, args.repeat)
+
+    print(f"{len(items)} rows ({args.samples} samples)")
+    print(f"{'Styler':<14} {old_t * 1000:9.1f} ms  {len(old_html) / 1024:9.1f} KiB")
+    print(f"{'class-based':<14} {new_t * 1000:9.1f} ms  {len(new_html) / 1024:9.1f} KiB")
+    print(f"speed-up x{old_t / new_t:.1f}, size x{len(old_html) / len(new_html):.1f} smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Cost of the per-stage spans, with and without a trace open.
+
+Times ``--iterations`` empty ``span`` blocks outside a trace (the API,
+background jobs) and inside one, and ``Trace.finish`` for a trace with as
+many spans as a score card rerun, with and without a trace file.
+
+    python -m benchmarks.tracing_overhead
+    python -m benchmarks.tracing_overhead --iterations 500000 --json tracing.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from soil_health.tracing import span, start_trace
+
+SCORE_CARD_SPANS = 20
+
+
+def per_span_us(iterations: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        with span("stage"):
+            pass
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+
+def finish_us(repeats: int, trace_file: str | None) -> float:
+    total = 0.0
+    for _ in range(repeats):
+        trace = start_trace("benchmark", trace_file)
+        for i in range(SCORE_CARD_SPANS):
+            with span(f"stage{i % 6}", table="x"):
+                pass
+        t0 = time.perf_counter()
+        trace.finish()
+        total += time.perf_counter() - t0
+    return total / repeats * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    outside = per_span_us(args.iterations)
+    trace = start_trace("benchmark", None)
+    inside = per_span_us(args.iterations)
+    trace.finish()
+
+    trace_file = os.path.join(tempfile.mkdtemp(prefix="tracing_benchmark_"), "trace.jsonl")
+    report = {
+        "python": sys.version.split()[0],
+        "span_us_no_trace": round(outside, 3),
+        "span_us_in_trace": round(inside, 3),
+        "finish_us": round(finish_us(1000, None), 1),
+        "finish_us_with_file": round(finish_us(1000, trace_file), 1),
+    }
+    print(f"span, no trace open                    {report['span_us_no_trace']:8.3f} us")
+    print(f"span, inside a trace                   {report['span_us_in_trace']:8.3f} us")
+    print(f"finish ({SCORE_CARD_SPANS} spans, metrics only)       {report['finish_us']:8.1f} us")
+    print(f"finish ({SCORE_CARD_SPANS} spans, + JSONL line)       {report['finish_us_with_file']:8.1f} us")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,19 @@
 import streamlit as st
-from datetime import datetime
-import re
-from pypdf import PdfReader
+
+from soil_health.assets import header_logos
+from soil_health.sample import PARAMS, SoilSample
+from soil_health.tracing import span, start_trace
 
 st.set_page_config(page_title="Silal Soil Health Pro", layout="centered")
+# توقيت مراحل كل إعادة تشغيل للصفحة (لوحة الأداء في الشريط الجانبي)
+trace = start_trace("main")
 # ==== HEADER WITH LOGOS ====
+# الشعارات تُقرأ مرة واحدة لكل عملية وتُرسل كـ data URI
+silal_logo, io_logo = header_logos()
 logo_col1, title_col, logo_col2 = st.columns([1, 3, 1])
 
 with logo_col1:
-    st.image("Silal_logo.jpeg", width=120)   # عدّل الاسم لو مختلف
+    st.image(silal_logo, width=120)
 
 with title_col:
     st.markdown(
@@ -24,61 +29,11 @@ with title_col:
     )
 
 with logo_col2:
-    st.image("IO_logo.png", width=120)       # عدّل الاسم لو مختلف
-
-
-
-# ============== MASTER PARAMETER DEFINITIONS ==============
-
-PARAMS = [
-    # --- Basic soil properties ---
-    {"key": "ph",        "label": "pH (paste extract)",        "unit": "-",        "section": "Basic Soil Properties"},
-    {"key": "ece",       "label": "ECe",                       "unit": "dS/m",     "section": "Basic Soil Properties"},
-    {"key": "om",        "label": "Organic Matter",            "unit": "%",        "section": "Basic Soil Properties"},
-    {"key": "sar",       "label": "SAR",                       "unit": "-",        "section": "Basic Soil Properties"},
-    {"key": "esp",       "label": "ESP",                       "unit": "%",        "section": "Basic Soil Properties"},
-    {"key": "cec",       "label": "CEC",                       "unit": "cmolc/kg", "section": "Basic Soil Properties"},
-    {"key": "caco3",     "label": "CaCO₃",                     "unit": "%",        "section": "Basic Soil Properties"},
-    {"key": "sat_pct",   "label": "Saturation Percentage",     "unit": "%",        "section": "Basic Soil Properties"},
-    {"key": "texture",   "label": "Soil Texture Class",        "unit": "",         "section": "Basic Soil Properties"},
-
-    # --- Soluble ions ---
-    {"key": "sol_ca",    "label": "Soluble Calcium (Ca²⁺)",    "unit": "ppm",      "section": "Soluble Ions"},
-    {"key": "sol_mg",    "label": "Soluble Magnesium (Mg²⁺)",  "unit": "ppm",      "section": "Soluble Ions"},
-    {"key": "sol_na",    "label": "Soluble Sodium (Na⁺)",      "unit": "ppm",      "section": "Soluble Ions"},
-    {"key": "sol_k",     "label": "Soluble Potassium (K⁺)",    "unit": "ppm",      "section": "Soluble Ions"},
-    {"key": "sol_cl",    "label": "Soluble Chloride (Cl⁻)",    "unit": "ppm",      "section": "Soluble Ions"},
-    {"key": "sol_hco3",  "label": "Soluble Bicarbonate (HCO₃⁻)","unit": "ppm",     "section": "Soluble Ions"},
-    {"key": "sol_so4",   "label": "Soluble Sulfate (SO₄²⁻)",   "unit": "ppm",      "section": "Soluble Ions"},
-
-    # --- Exchangeable cations ---
-    {"key": "exch_ca",   "label": "Exchangeable Calcium",      "unit": "ppm",      "section": "Exchangeable Cations"},
-    {"key": "exch_mg",   "label": "Exchangeable Magnesium",    "unit": "ppm",      "section": "Exchangeable Cations"},
-    {"key": "exch_na",   "label": "Exchangeable Sodium",       "unit": "ppm",      "section": "Exchangeable Cations"},
-    {"key": "exch_k",    "label": "Exchangeable Potassium",    "unit": "ppm",      "section": "Exchangeable Cations"},
-
-    # --- Available nutrients & micros ---
-    {"key": "avail_n",   "label": "Available Nitrogen (N)",    "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
-    {"key": "avail_p",   "label": "Available Phosphorus (P)",  "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
-    {"key": "avail_k",   "label": "Available Potassium (K)",   "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
-    {"key": "avail_s",   "label": "Available Sulfur (S)",      "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
-    {"key": "fe",        "label": "Iron (Fe)",                 "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
-    {"key": "zn",        "label": "Zinc (Zn)",                 "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
-    {"key": "cu",        "label": "Copper (Cu)",               "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
-    {"key": "mn",        "label": "Manganese (Mn)",            "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
-    {"key": "b",         "label": "Boron (B)",                 "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
-    {"key": "mo",        "label": "Molybdenum (Mo)",           "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
-
-    # --- Physical ---
-    {"key": "bd",        "label": "Bulk Density",              "unit": "g/cm³",    "section": "Soil Physical Properties"},
-    {"key": "whc",       "label": "Water Holding Capacity",    "unit": "%",        "section": "Soil Physical Properties"},
-    {"key": "infil",     "label": "Infiltration Rate",         "unit": "mm/h",     "section": "Soil Physical Properties"},
-
-    # --- Biological (optional) ---
-    {"key": "mic_c",     "label": "Microbial Biomass Carbon",  "unit": "mg/kg",    "section": "Soil Biological Properties (Optional)"},
-    {"key": "resp",      "label": "Soil Respiration (CO₂)",    "unit": "mg CO₂/kg/day","section": "Soil Biological Properties (Optional)"},
-    {"key": "worms",     "label": "Earthworm Count",           "unit": "per m²",   "section": "Soil Biological Properties (Optional)"},
-]
+    st.image(io_logo, width=120)
+
+
+
+# ============== PARAMETERS (defined with the sample record) ==============
 
 PDF_NAME_MAP = {
     "pH (paste extract)": "ph",
@@ -116,9 +71,6 @@ ESSENTIAL_KEYS = ["ph", "ece", "om", "sar", "texture", "avail_p", "avail_k"]
 
 # ============== SESSION STATE INIT ==============
 
-if "extracted" not in st.session_state:
-    st.session_state.extracted = {}
-
 if "sample_info" not in st.session_state:
     st.session_state.sample_info = {
         "customer": "",
@@ -137,236 +89,30 @@ st.markdown("### Option 1 – Upload Innovation Oasis Report (PDF)")
 uploaded_file = st.file_uploader("Drag & drop or click to browse", type=["pdf"])
 
 
-def extract_from_pdf(pdf_file):
-    reader = PdfReader(pdf_file)
-    text = ""
-    for page in reader.pages:
-        t = page.extract_text()
-        if t:
-            text += t + "\n"
-
-    data = {}
-    lines = [l.strip() for l in text.split("\n") if l.strip()]
-
-    # --- Header info ---
-    if "Dr Ahmed - AK" in text:
-        data["Customer Name"] = "Dr Ahmed - AK"
-    elif "Dr Ahmed (AK)" in text:
-        data["Customer Name"] = "Dr Ahmed (AK)"
-    elif "Dr. Ahmad" in text:
-        data["Customer Name"] = "Dr. Ahmad"
-    elif "Dr Ahmed" in text:
-        data["Customer Name"] = "Dr Ahmed"
-
-    report_match = re.search(r"SP[-\s]*[\d]+[-\s]*25", text, re.IGNORECASE)
-    if report_match:
-        rep = report_match.group(0).replace("SP", "SP").replace("  ", " ").strip()
-        rep = rep.replace("  ", " ")
-        data["Test Report No."] = rep
-
-    desc_match = re.search(r"Sample Description\s*\*\s*([^\n]+)", text)
-    if desc_match:
-        data["Sample Description"] = desc_match.group(1).strip()
-
-    received_match = re.search(r"Received on\s*([0-9/ -]+)", text, re.IGNORECASE)
-    if received_match:
-        data["Received On"] = received_match.group(1).strip()
-
-    analysed_match = re.search(r"Analysed on\s*([0-9/ -]+)", text, re.IGNORECASE)
-    if analysed_match:
-        data["Analyzed On"] = analysed_match.group(1).strip()
-
-    site_match = re.search(r"Site\s*([^\n]+)", text)
-    if site_match:
-        data["Site"] = site_match.group(1).strip()
-
-    # --- Main values & ions ---
-    for line in lines:
-        line_lower = line.lower()
-
-        # pH
-        if "ph" in line_lower and "ece" not in line_lower and "base saturation" not in line_lower:
-            if "pH (paste extract)" not in data:
-                m = re.search(r"([0-9]+\.?[0-9]*)", line)
-                if m:
-                    data["pH (paste extract)"] = m.group(1)
-
-        # ECe (µS/cm → dS/m)
-        if "ece" in line_lower:
-            m = re.search(r"([0-9]+)", line)
-            if m:
-                ec_us = int(m.group(1))
-                data["ECe"] = round(ec_us / 1000, 2)
-
-        # Organic Matter
-        if "organic matter" in line_lower:
-            m = re.search(r"([0-9]+\.?[0-9]*)", line)
-            if m:
-                data["Organic Matter"] = m.group(1)
-
-        # SAR
-        if re.search(r"\bsar\b", line_lower):
-            m = re.search(r"([0-9]+\.?[0-9]*)", line)
-            if m:
-                data["SAR"] = m.group(1)
-
-        # ESP
-        if re.search(r"\besp\b", line_lower):
-            m = re.search(r"([0-9]+\.?[0-9]*)", line)
-            if m:
-                data["ESP"] = m.group(1)
-
-        # CEC
-        if "cation exchange capacity" in line_lower:
-            m = re.search(r"([0-9]+\.?[0-9]*)", line)
-            if m:
-                data["CEC"] = m.group(1)
-
-        # ===== Soluble Ions =====
-        if "soluble" in line_lower and "calcium" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Soluble Calcium (Ca²⁺)"] = m.group(1)
-
-        if "soluble" in line_lower and "magnesium" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Soluble Magnesium (Mg²⁺)"] = m.group(1)
-
-        if "soluble" in line_lower and "sodium" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Soluble Sodium (Na⁺)"] = m.group(1)
-
-        if "soluble" in line_lower and "potassium" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Soluble Potassium (K⁺)"] = m.group(1)
-
-        if "soluble" in line_lower and "chloride" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Soluble Chloride (Cl⁻)"] = m.group(1)
-
-        if "soluble" in line_lower and "bicarbonate" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Soluble Bicarbonate (HCO₃⁻)"] = m.group(1)
-
-        if "soluble" in line_lower and ("sulfate" in line_lower or "sulphate" in line_lower):
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Soluble Sulfate (SO₄²⁻)"] = m.group(1)
-
-        # ===== Exchangeable Cations =====
-        if "exchangeable" in line_lower and "calcium" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Exchangeable Calcium"] = m.group(1)
-
-        if "exchangeable" in line_lower and "magnesium" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Exchangeable Magnesium"] = m.group(1)
-
-        if "exchangeable" in line_lower and "sodium" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Exchangeable Sodium"] = m.group(1)
-
-        if "exchangeable" in line_lower and "potassium" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Exchangeable Potassium"] = m.group(1)
-
-        # ===== Available Nutrients & Micronutrients =====
-        # N
-        if "available" in line_lower and "nitrogen" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Available Nitrogen (N)"] = m.group(1)
-
-        # P  ✅ أكثر مرونة: أي سطر فيه available + phosphorus
-        if "available" in line_lower and "phosph" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Available Phosphorus (P)"] = m.group(1)
-
-        # K  ✅ نفس الفكرة
-        if "available" in line_lower and "potass" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Available Potassium (K)"] = m.group(1)
-
-        # S
-        if "available" in line_lower and ("sulfur" in line_lower or "sulphur" in line_lower):
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Available Sulfur (S)"] = m.group(1)
-
-        # Micronutrients: Fe, Zn, Cu, Mn, B, Mo
-        if "available" in line_lower and "iron" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Iron (Fe)"] = m.group(1)
-
-        if "available" in line_lower and "zinc" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Zinc (Zn)"] = m.group(1)
-
-        if "available" in line_lower and "copper" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Copper (Cu)"] = m.group(1)
-
-        if "available" in line_lower and "manganese" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Manganese (Mn)"] = m.group(1)
-
-        if "available" in line_lower and "boron" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Boron (B)"] = m.group(1)
-
-        if "available" in line_lower and "molybdenum" in line_lower:
-            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
-            if m:
-                data["Molybdenum (Mo)"] = m.group(1)
-
-    return data
-
-
-
 if uploaded_file and st.button("Extract data from PDF", type="primary", use_container_width=True):
     with st.spinner("Extracting values from Innovation Oasis report..."):
         try:
-            pdf_data = extract_from_pdf(uploaded_file)
-            st.session_state.extracted = pdf_data
+            # pypdf يُحمَّل فقط عند استخراج ملف، وليس عند فتح الصفحة
+            from soil_health.extraction import sample_from_pdf
 
-            # fill sample_info if available
+            # fill sample_info if available; the values are parsed once into the sample record
             si = st.session_state.sample_info
-            si["customer"]   = pdf_data.get("Customer Name", si["customer"])
-            si["report_no"]  = pdf_data.get("Test Report No.", si["report_no"])
-            si["description"]= pdf_data.get("Sample Description", si["description"])
-            si["received"]   = pdf_data.get("Received On", si["received"])
-            si["analyzed"]   = pdf_data.get("Analyzed On", si["analyzed"])
-            si["site"]       = pdf_data.get("Site", si["site"])
+            sample = sample_from_pdf(uploaded_file, si)
+            si.update(sample.info)
 
             # map PDF names to our param keys
-            for pdf_name, value in pdf_data.items():
-                if pdf_name in PDF_NAME_MAP:
-                    key = PDF_NAME_MAP[pdf_name]
-                    ss_key = f"val_{key}"
-                    st.session_state[ss_key] = str(value)
+            with span("session.map", source="pdf"):
+                for pdf_name, key in PDF_NAME_MAP.items():
+                    if pdf_name in sample:
+                        st.session_state[f"val_{key}"] = str(sample[pdf_name])
+            st.session_state.extracted = sample
 
-            st.success(f"Extracted {len(pdf_data)} values.")
+            st.success(f"Extracted {len(sample)} values.")
         except Exception as e:
             st.error(f"Error while reading PDF: {e}")
 
 with st.expander("DEBUG – Extracted from PDF"):
-    st.json(st.session_state.extracted)
+    st.json(st.session_state.extracted.to_payload() if "extracted" in st.session_state else {})
 
 st.markdown("---")
 
@@ -432,7 +178,8 @@ for section in sections:
 
                 # default from extracted or "Not specified"
                 if texture_key not in st.session_state:
-                    default_texture = st.session_state.extracted.get("Soil Texture Class", "Not specified")
+                    extracted = st.session_state.get("extracted") or {}
+                    default_texture = extracted.get("Soil Texture Class", "Not specified")
                     if default_texture not in TEXTURE_OPTIONS:
                         default_texture = "Not specified"
                     st.session_state[texture_key] = default_texture
@@ -443,8 +190,6 @@ for section in sections:
                     index=TEXTURE_OPTIONS.index(st.session_state[texture_key]),
                     key=texture_key,
                 )
-
-                st.session_state.extracted["Soil Texture Class"] = val_texture
             else:
                 param_text_input(p)
         i += 1
@@ -483,27 +228,39 @@ if btn:
             + "\n- ".join(missing)
         )
     else:
-        raw_data = {}
-        for p in PARAMS:
-            key = p["key"]
-            label = p["label"]
-            if key == "texture":
-                val = st.session_state.get("val_texture", "Not specified")
-                if val == "Not specified":
-                    raw_data[label] = "Not analyzed"
+        with span("session.map", source="form"):
+            raw_data = {}
+            for p in PARAMS:
+                key = p["key"]
+                label = p["label"]
+                if key == "texture":
+                    val = st.session_state.get("val_texture", "Not specified")
+                    if val == "Not specified":
+                        raw_data[label] = "Not analyzed"
+                    else:
+                        raw_data[label] = val
                 else:
-                    raw_data[label] = val
-            else:
-                val = st.session_state.get(f"val_{key}", "").strip()
-                if val == "":
-                    raw_data[label] = "Not analyzed"
-                else:
-                    raw_data[label] = val
+                    val = st.session_state.get(f"val_{key}", "").strip()
+                    if val == "":
+                        raw_data[label] = "Not analyzed"
+                    else:
+                        raw_data[label] = val
 
-        st.session_state.report_payload = {
-            "sample_info": st.session_state.sample_info,
-            "raw_data": raw_data,
-        }
+            st.session_state.sample = SoilSample(raw_data, st.session_state.sample_info)
 
         st.success("Report data collected. Opening report page...")
+        # switch_page ينهي التشغيل فوراً، لذا يُسجَّل التوقيت قبله
+        trace.finish()
         st.switch_page("pages/report_page.py")
+
+# ============== PERFORMANCE PANEL (debug) ==============
+
+trace.finish()
+if st.sidebar.toggle(
+    "⏱ Performance panel", value=st.session_state.get("perf_panel", False), key="perf_panel_toggle"
+):
+    st.session_state.perf_panel = True
+    st.sidebar.caption(f"Last rerun: {trace.total_ms:.0f} ms")
+    st.sidebar.dataframe(trace.rows(), hide_index=True)
+else:
+    st.session_state.perf_panel = False
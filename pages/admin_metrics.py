@@ -0,0 +1,191 @@
+import hmac
+import os
+
+import streamlit as st
+import pandas as pd
+
+from soil_health.metrics import (
+    LLM_CACHE,
+    LLM_COMPLETION_TOKENS,
+    LLM_COST,
+    LLM_LATENCY,
+    LLM_PROMPT_TOKENS,
+    LLM_REQUESTS,
+    LLM_RETRIES,
+    LLM_TTFT,
+    REGISTRY,
+)
+from soil_health.tracing import RERUN_LATENCY, STAGE_LATENCY
+
+st.set_page_config(page_title="Admin – LLM Metrics", layout="wide")
+
+st.markdown(
+    """
+<style>
+    .big-title {
+        font-size: 32px;
+        font-weight: bold;
+        text-align: center;
+        color: #006400;
+    }
+</style>
+""",
+    unsafe_allow_html=True,
+)
+
+st.markdown('<div class="big-title">Admin – AI Recommendation Metrics</div>', unsafe_allow_html=True)
+st.caption("In-process metrics for this server since start-up (shared by all sessions).")
+st.markdown("---")
+
+# ============ SUMMARY PER MODEL ============
+
+# one consistent copy of each metric for this run, taken under its lock
+requests_snapshot = LLM_REQUESTS.snapshot()
+latency_snapshot = LLM_LATENCY.snapshot()
+
+models = sorted(
+    {dict(k).get("model") for k, _ in requests_snapshot}
+    | {dict(k).get("model") for k, _ in LLM_CACHE.snapshot()}
+)
+
+rows = []
+for model in models:
+    requests = {
+        (dict(k)["operation"], dict(k)["status"]): v
+        for k, v in requests_snapshot
+        if dict(k).get("model") == model
+    }
+    total_calls = sum(requests.values())
+    errors = sum(v for (op, status), v in requests.items() if status == "error")
+    latency_count = sum(
+        s["count"] for k, s in latency_snapshot if dict(k).get("model") == model
+    )
+    latency_sum = sum(
+        s["sum"] for k, s in latency_snapshot if dict(k).get("model") == model
+    )
+    hits = LLM_CACHE.get(model=model, result="hit")
+    misses = LLM_CACHE.get(model=model, result="miss")
+
+    rows.append(
+        {
+            "Model": model,
+            "Calls": int(total_calls),
+            "Errors": int(errors),
+            "Retries": int(LLM_RETRIES.get(model=model)),
+            "Mean latency (s)": round(latency_sum / latency_count, 2) if latency_count else None,
+            "p50 first token (s) ≤": LLM_TTFT.quantile(0.5, model=model),
+            "Prompt tokens": int(LLM_PROMPT_TOKENS.get(model=model)),
+            "Completion tokens": int(LLM_COMPLETION_TOKENS.get(model=model)),
+            "Est. cost (USD)": round(LLM_COST.get(model=model), 4),
+            "Cache hit rate": f"{hits / (hits + misses):.0%}" if hits + misses else "",
+        }
+    )
+
+if rows:
+    st.dataframe(pd.DataFrame(rows), width="stretch")
+else:
+    st.info("No AI calls recorded yet in this server process.")
+
+st.subheader("Latency by operation")
+st.caption(
+    "full: report page requests; repair: re-requests of invalid sections; "
+    "batch: the batch CLI, pre-warming and the API."
+)
+latency_rows = []
+for key, state in sorted(latency_snapshot):
+    labels = dict(key)
+    latency_rows.append(
+        {
+            "Model": labels.get("model"),
+            "Operation": labels.get("operation"),
+            "Calls": state["count"],
+            "Mean (s)": round(state["sum"] / state["count"], 2) if state["count"] else None,
+            "p50 (s) ≤": LLM_LATENCY.quantile(0.5, **labels),
+            "p95 (s) ≤": LLM_LATENCY.quantile(0.95, **labels),
+        }
+    )
+if latency_rows:
+    st.dataframe(pd.DataFrame(latency_rows), width="stretch", hide_index=True)
+
+st.subheader("Calls by operation")
+op_rows = [
+    {**dict(k), "Calls": int(v)} for k, v in requests_snapshot
+]
+if op_rows:
+    st.dataframe(pd.DataFrame(op_rows), width="stretch")
+
+st.markdown("---")
+
+# ============ PAGE TIMINGS ============
+
+st.subheader("Page script runs by stage")
+st.caption("From traced reruns of the report pages; a stage's time is its total within one rerun.")
+
+stage_rows = []
+stage_snapshot = STAGE_LATENCY.snapshot()
+for key, state in RERUN_LATENCY.snapshot():
+    page = dict(key)["page"]
+    stage_rows.append(
+        {
+            "Page": page,
+            "Stage": "(whole rerun)",
+            "Reruns": state["count"],
+            "Mean (ms)": round(state["sum"] * 1000 / state["count"], 1),
+            "p50 (ms) ≤": RERUN_LATENCY.quantile(0.5, page=page) * 1000,
+            "p95 (ms) ≤": RERUN_LATENCY.quantile(0.95, page=page) * 1000,
+        }
+    )
+    for stage_key, stage in stage_snapshot:
+        labels = dict(stage_key)
+        if labels["page"] != page:
+            continue
+        stage_rows.append(
+            {
+                "Page": page,
+                "Stage": labels["stage"],
+                "Reruns": stage["count"],
+                "Mean (ms)": round(stage["sum"] * 1000 / stage["count"], 1),
+                "p50 (ms) ≤": STAGE_LATENCY.quantile(0.5, **labels) * 1000,
+                "p95 (ms) ≤": STAGE_LATENCY.quantile(0.95, **labels) * 1000,
+            }
+        )
+
+if stage_rows:
+    st.dataframe(pd.DataFrame(stage_rows), width="stretch", hide_index=True)
+else:
+    st.info("No page reruns traced yet in this server process.")
+
+st.markdown("---")
+
+# ============ EXPORT ============
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.download_button(
+        "⬇️ Prometheus text",
+        data=REGISTRY.to_prometheus(),
+        file_name="metrics.prom",
+        mime="text/plain",
+    )
+with col2:
+    st.download_button(
+        "⬇️ JSON",
+        data=REGISTRY.to_json(),
+        file_name="metrics.json",
+        mime="application/json",
+    )
+with col3:
+    # resetting wipes the numbers for every session: only with the admin token
+    admin_token = os.environ.get("SOIL_HEALTH_ADMIN_TOKEN")
+    if admin_token:
+        token = st.text_input("Admin token", type="password")
+        if st.button("Reset metrics", disabled=not token):
+            if hmac.compare_digest(token.encode(), admin_token.encode()):
+                REGISTRY.reset()
+                st.rerun()
+            st.error("Wrong admin token.")
+    else:
+        st.caption("Reset is disabled; set SOIL_HEALTH_ADMIN_TOKEN to enable it.")
+
+with st.expander("Prometheus exposition"):
+    st.code(REGISTRY.to_prometheus(), language="text")
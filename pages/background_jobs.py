@@ -0,0 +1,82 @@
+import streamlit as st
+import time
+import pandas as pd
+
+from soil_health.jobs import ACTIVE, DEFAULT_JOBS_PATH, JobQueue, ensure_workers
+
+st.set_page_config(page_title="Background Jobs", layout="wide")
+
+st.markdown(
+    """
+<style>
+    .big-title {
+        font-size: 32px;
+        font-weight: bold;
+        text-align: center;
+        color: #006400;
+    }
+</style>
+""",
+    unsafe_allow_html=True,
+)
+
+st.markdown('<div class="big-title">Background Jobs / المهام في الخلفية</div>', unsafe_allow_html=True)
+st.caption("PDF extraction, archive imports and bulk exports submitted from the other pages (all sessions).")
+st.markdown("---")
+
+
+@st.cache_resource
+def job_queue() -> JobQueue:
+    return JobQueue(DEFAULT_JOBS_PATH)
+
+
+queue = job_queue()
+
+
+def duration(job: dict) -> str:
+    if job["started"] is None:
+        return ""
+    return f"{(job['finished'] or time.time()) - job['started']:.1f}"
+
+
+@st.fragment(run_every=2.0)
+def job_table():
+    jobs = queue.jobs(limit=100)
+    if any(job["status"] in ACTIVE for job in jobs):
+        ensure_workers(DEFAULT_JOBS_PATH)
+    if not jobs:
+        st.info("No jobs yet.")
+        return
+    st.dataframe(
+        pd.DataFrame(
+            [
+                {
+                    "ID": job["id"],
+                    "Kind": job["kind"],
+                    "Status": job["status"],
+                    "Progress": job["progress"],
+                    "Message": job["error"] or job["message"] or "",
+                    "Submitted": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(job["created"])),
+                    "Run time (s)": duration(job),
+                    "Attempts": job["attempts"],
+                }
+                for job in jobs
+            ]
+        ),
+        column_config={"Progress": st.column_config.ProgressColumn(min_value=0.0, max_value=1.0)},
+        width="stretch",
+        hide_index=True,
+    )
+    active = [job["id"] for job in jobs if job["status"] in ACTIVE]
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        choice = st.selectbox("Cancel job / إلغاء مهمة", active, disabled=not active)
+    with col2:
+        st.button("Cancel / إلغاء", disabled=not active, on_click=queue.cancel, args=(choice,))
+
+
+job_table()
+
+st.markdown("---")
+if st.button("Remove jobs finished over a day ago (and their files)"):
+    st.caption(f"Removed {queue.purge(older_than=86400)} jobs.")
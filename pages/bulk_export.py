@@ -0,0 +1,211 @@
+import streamlit as st
+import json
+import os
+
+from soil_health.cache import DEFAULT_CACHE_PATH
+from soil_health.jobs import ACTIVE, CANCELLED, DEFAULT_JOBS_PATH, DONE, JobQueue, ensure_workers
+
+st.set_page_config(page_title="Bulk Report Export", layout="wide")
+
+st.markdown(
+    """
+<style>
+    .big-title {
+        font-size: 32px;
+        font-weight: bold;
+        text-align: center;
+        color: #006400;
+    }
+</style>
+""",
+    unsafe_allow_html=True,
+)
+
+st.markdown('<div class="big-title">Bulk Report Export / تصدير التقارير دفعة واحدة</div>', unsafe_allow_html=True)
+st.caption(
+    "Upload a JSON-lines file of samples ({\"sample_info\": ..., \"raw_data\": ...} per line) or lab report PDFs, "
+    "select the samples and download one ZIP with a report per sample and a manifest.csv. "
+    "Reading PDFs and building the ZIP run as background jobs."
+)
+st.markdown("---")
+
+
+@st.cache_resource
+def job_queue() -> JobQueue:
+    return JobQueue(DEFAULT_JOBS_PATH)
+
+
+queue = job_queue()
+
+
+@st.fragment(run_every=1.0)
+def job_progress(job_id: int, label: str):
+    # يُحدَّث شريط التقدم كل ثانية دون إعادة تشغيل الصفحة كاملة
+    ensure_workers(DEFAULT_JOBS_PATH)
+    job = queue.get(job_id)
+    if job is None or job["status"] not in ACTIVE:
+        st.rerun()
+    text = job["message"] or ("Waiting for a worker..." if job["status"] == "queued" else "Starting...")
+    st.progress(job["progress"], text=f"{label}: {text}")
+    st.button("Cancel / إلغاء", key=f"cancel_{job_id}", on_click=queue.cancel, args=(job_id,))
+
+
+def job_outcome(job_id: int, label: str) -> dict | None:
+    """Progress while the job runs; its result once done (errors are shown)."""
+    job = queue.get(job_id)
+    if job is None:
+        return None
+    if job["status"] in ACTIVE:
+        job_progress(job_id, label)
+        return None
+    if job["status"] == CANCELLED:
+        st.warning(f"{label}: cancelled.")
+    elif job["status"] != DONE:
+        st.error(f"{label} failed: {job['error']}")
+    return job["result"] if job["status"] == DONE else None
+
+
+# ============ SAMPLES ============
+
+uploads = st.file_uploader(
+    "Samples file (.jsonl) or lab report PDFs", type=["jsonl", "json", "pdf"], accept_multiple_files=True
+)
+pdfs = [f for f in uploads if f.name.lower().endswith(".pdf")]
+
+samples = []
+for uploaded in uploads:
+    if uploaded.name.lower().endswith(".pdf"):
+        continue
+    try:
+        lines = uploaded.getvalue().decode("utf-8-sig").splitlines()
+    except UnicodeDecodeError:
+        st.error(f"{uploaded.name}: not a UTF-8 text file; skipped.")
+        continue
+    # a broken line is skipped and reported, the rest of the file still loads
+    bad_lines = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            bad_lines.append(number)
+            continue
+        if not isinstance(item, dict):
+            bad_lines.append(number)
+            continue
+        samples.append(item if "raw_data" in item else {"sample_info": {}, "raw_data": item})
+    if bad_lines:
+        shown = ", ".join(map(str, bad_lines[:20])) + (" …" if len(bad_lines) > 20 else "")
+        st.error(f"{uploaded.name}: skipped {len(bad_lines)} line(s) that are not a JSON object (line {shown}).")
+
+if pdfs and st.button(f"Read {len(pdfs)} PDF report(s) / قراءة التقارير"):
+    names = [f"{i:04d}_{os.path.basename(f.name)}" for i, f in enumerate(pdfs)]
+    st.session_state.extract_job = queue.submit(
+        "extract", {"files": names}, {name: f.getvalue() for name, f in zip(names, pdfs)}
+    )
+
+if "extract_job" in st.session_state:
+    extracted = job_outcome(st.session_state.extract_job, "Reading PDF reports")
+    if extracted is not None:
+        from soil_health.export import iter_samples
+
+        samples.extend(iter_samples(extracted["path"]))
+        for failure in extracted["failed"]:
+            st.warning(f"Could not read {failure['file'].split('_', 1)[-1]}: {failure['error']}")
+
+if "sample" in st.session_state:
+    if st.checkbox("Include the sample currently open in the score card / إضافة العينة الحالية", value=not samples):
+        samples.insert(0, st.session_state.sample.to_payload())
+
+if not samples:
+    st.info("No samples loaded yet.")
+    st.stop()
+
+# pandas ووحدة التصدير تُحمَّل فقط بعد تحميل العينات
+import pandas as pd
+
+from soil_health.export import FORMATS
+from soil_health.fertilizer import TARGET_LEVELS
+
+table = pd.DataFrame(
+    [
+        {
+            "Export": True,
+            "Report No": s.get("sample_info", {}).get("report_no", ""),
+            "Customer": s.get("sample_info", {}).get("customer", ""),
+            "Site": s.get("sample_info", {}).get("site", ""),
+            "Parameters": len(s.get("raw_data", {})),
+        }
+        for s in samples
+    ]
+)
+edited = st.data_editor(
+    table,
+    disabled=["Report No", "Customer", "Site", "Parameters"],
+    hide_index=True,
+    width="stretch",
+)
+selected = [s for s, keep in zip(samples, edited["Export"]) if keep]
+st.caption(f"{len(selected)} of {len(samples)} samples selected")
+
+# ============ OPTIONS ============
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    fmt = st.selectbox("Format", sorted(FORMATS))
+with col2:
+    crop_group = st.selectbox("Crop group / المجموعة المحصولية", list(TARGET_LEVELS))
+with col3:
+    depth_m = st.number_input("Rooting depth (m)", min_value=0.1, max_value=1.0, value=0.3, step=0.05)
+with col4:
+    bulk_density = st.number_input("Bulk density (t/m³)", min_value=1.2, max_value=1.8, value=1.5, step=0.05)
+
+cpu_count = os.cpu_count() or 1
+workers = st.number_input("Worker processes", min_value=1, max_value=cpu_count, value=min(4, cpu_count))
+use_prewarmed = st.checkbox(
+    "Use pre-warmed AI recommendations where available (otherwise rule-based)",
+    value=os.path.exists(DEFAULT_CACHE_PATH),
+    disabled=not os.path.exists(DEFAULT_CACHE_PATH),
+)
+
+# ============ EXPORT ============
+
+if st.button("Build ZIP / إنشاء الملف", type="primary", disabled=not selected):
+    # العينات تُكتب في مجلد المهمة ويُبنى الملف في عملية منفصلة
+    lines = "".join(json.dumps(s, ensure_ascii=False) + "\n" for s in selected)
+    st.session_state.export_job = queue.submit(
+        "export",
+        {
+            "format": fmt,
+            "workers": int(workers),
+            "crop_group": crop_group,
+            "depth_m": depth_m,
+            "bulk_density": bulk_density,
+            "prewarmed_cache": os.path.abspath(DEFAULT_CACHE_PATH) if use_prewarmed else None,
+        },
+        {"samples.jsonl": lines.encode("utf-8")},
+    )
+
+summary = None
+if "export_job" in st.session_state:
+    summary = job_outcome(st.session_state.export_job, "Rendering reports")
+if summary and os.path.exists(summary["path"]):
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Reports", summary["ok"])
+    c2.metric("Failed", summary["failed"])
+    c3.metric("Total time (s)", summary["elapsed_s"])
+    c4.metric("p50 / p95 per sample (ms)", f"{summary['render_ms_p50']} / {summary['render_ms_p95']}")
+
+    st.dataframe(pd.DataFrame(summary["manifest"]), width="stretch", hide_index=True)
+
+    def read_zip() -> bytes:
+        with open(summary["path"], "rb") as f:
+            return f.read()
+
+    st.download_button(
+        "⬇️ Download ZIP / تحميل الملف",
+        data=read_zip,
+        file_name="Silal_Soil_Health_Reports.zip",
+        mime="application/zip",
+    )
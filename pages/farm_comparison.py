@@ -0,0 +1,126 @@
+import streamlit as st
+import json
+
+st.set_page_config(page_title="Farm Soil Comparison", layout="wide")
+
+st.markdown(
+    """
+<style>
+    .big-title {
+        font-size: 32px;
+        font-weight: bold;
+        text-align: center;
+        color: #006400;
+    }
+    .wide-table { overflow-x: auto; }
+    .wide-table .soil-status th:first-child { position: sticky; left: 0; background: #f3f7f3; }
+</style>
+""",
+    unsafe_allow_html=True,
+)
+
+st.markdown('<div class="big-title">Farm Soil Comparison / مقارنة عينات المزرعة</div>', unsafe_allow_html=True)
+st.caption(
+    "Upload a JSON-lines file of samples ({\"sample_info\": ..., \"raw_data\": ...} per line). "
+    "Parameters are rows, samples are columns; cells are coloured against the optimum ranges."
+)
+st.markdown("---")
+
+# ============ SAMPLES ============
+
+uploaded = st.file_uploader("Samples file (.jsonl)", type=["jsonl", "json"])
+farm_name = st.text_input("Farm / report title", value="")
+
+
+# المصفوفة تُبنى مرة واحدة لكل ملف، والصفحات تعرض شرائح منها فقط
+# cache_resource: نسخة واحدة مشتركة للقراءة فقط بدل نسخة مفكوكة من pickle في كل إعادة تشغيل
+@st.cache_resource(show_spinner=False, max_entries=8)
+def load_matrix(text: str, extra: str = "") -> dict:
+    from soil_health.comparison import comparison_matrix
+
+    samples = [json.loads(extra)] if extra else []
+    for line in text.splitlines():
+        if line.strip():
+            item = json.loads(line)
+            samples.append(item if "raw_data" in item else {"sample_info": {}, "raw_data": item})
+    return comparison_matrix(samples)
+
+
+text = uploaded.getvalue().decode("utf-8") if uploaded is not None else ""
+extra = ""
+if "sample" in st.session_state:
+    if st.checkbox("Include the sample currently open in the score card / إضافة العينة الحالية", value=not text):
+        extra = json.dumps(st.session_state.sample.to_payload(), ensure_ascii=False, default=str)
+
+if not text and not extra:
+    st.info("No samples loaded yet.")
+    st.stop()
+
+# pandas / numpy تُحمَّل فقط بعد تحميل العينات
+import pandas as pd
+
+from soil_health.comparison import matrix_csv, matrix_html, page_bounds, render_farm_report, summary_stats
+from soil_health.report import GENERATED, cached_artifact, stamp
+from soil_health.tables import STATUS_TABLE_CSS, status_table_html
+
+st.markdown(STATUS_TABLE_CSS, unsafe_allow_html=True)
+
+matrix = load_matrix(text, extra)
+n_samples = len(matrix["columns"])
+
+# ============ SUMMARY ============
+
+st.subheader(f"Summary by parameter ({n_samples} samples)")
+summary, median_status = summary_stats(matrix)
+st.markdown(status_table_html(summary, median_status, include_css=False), unsafe_allow_html=True)
+st.caption("Row colour: status of the median. Within / below / above % are shares of samples with a numeric value.")
+
+st.markdown("---")
+
+# ============ SAMPLES (PAGINATED) ============
+
+st.subheader("Samples")
+col1, col2 = st.columns(2)
+with col1:
+    page_size = st.selectbox("Samples per page", [10, 25, 50, 100], index=1)
+n_pages = max(1, -(-n_samples // page_size))
+with col2:
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+
+start, stop = page_bounds(n_samples, int(page), page_size)
+st.caption(f"Samples {start + 1}–{stop} of {n_samples}")
+st.markdown(
+    f'<div class="wide-table">{matrix_html(matrix, start, stop, include_css=False)}</div>',
+    unsafe_allow_html=True,
+)
+
+with st.expander("Sample details on this page"):
+    st.dataframe(
+        pd.DataFrame(matrix["sample_info"][start:stop], index=matrix["columns"][start:stop]),
+        width="stretch",
+    )
+
+st.markdown("---")
+
+# ============ DOWNLOAD ============
+
+st.markdown("### Download")
+report_key = {"samples": text, "extra": extra, "title": farm_name}
+
+d1, d2 = st.columns(2)
+with d1:
+    st.download_button(
+        "⬇️ Download comparison (HTML)",
+        data=lambda: stamp(
+            cached_artifact("farm", report_key, lambda _: render_farm_report(matrix, farm_name, GENERATED))
+        ),
+        file_name="Silal_Farm_Soil_Comparison.html",
+        mime="text/html",
+    )
+with d2:
+    st.download_button(
+        "⬇️ Download values (CSV)",
+        data=lambda: matrix_csv(matrix).encode("utf-8-sig"),
+        file_name="Silal_Farm_Soil_Comparison.csv",
+        mime="text/csv",
+    )
@@ -19,14 +19,15 @@ st.markdown('<div class="subtitle">Generated from Silal Soil Health Pro</div>',
 st.markdown("---")
 
 # ============ CHECK PAYLOAD ============
-if "report_payload" not in st.session_state:
+if "sample" not in st.session_state:
     st.error("No report data found. Please go back and click 'Generate Official Soil Health Report' first.")
     st.stop()
 
-payload = st.session_state.report_payload
-sample_info = payload.get("sample_info", {})
-tables = payload.get("tables", {})
-raw_data = payload.get("raw_data", {})
+sample = st.session_state.sample
+sample_info = sample.info
+# main.py hands over the sample only; the PDF tables are not kept
+tables = {}
+raw_data = sample
 
 # ============ SAMPLE INFO ============
 st.subheader("Sample Information")
@@ -295,9 +296,9 @@ def extract_indicator_values_from_tables(tables_dict: dict) -> dict:
 def fill_from_raw_data(found: dict, raw: dict) -> dict:
     """
     Fallback: if some indicators not found in tables, try to get them
-    from raw_data (st.session_state.extracted copied into report_payload).
+    from raw_data (the SoilSample in st.session_state.sample).
     """
-    if not isinstance(raw, dict):
+    if not raw:
         return found
 
     for key, spec in INDICATORS.items():
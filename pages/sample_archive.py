@@ -0,0 +1,160 @@
+import streamlit as st
+import os
+import time
+import pandas as pd
+
+from soil_health.archive import DEFAULT_ARCHIVE_PATH, OPERATORS, SampleArchive, value_column
+from soil_health.jobs import ACTIVE, DEFAULT_JOBS_PATH, DONE, JobQueue, ensure_workers
+from soil_health.sample import LABELS, SoilSample
+
+st.set_page_config(page_title="Sample Archive", layout="wide")
+
+st.markdown(
+    """
+<style>
+    .big-title {
+        font-size: 32px;
+        font-weight: bold;
+        text-align: center;
+        color: #006400;
+    }
+</style>
+""",
+    unsafe_allow_html=True,
+)
+
+st.markdown('<div class="big-title">Sample Archive / أرشيف العينات</div>', unsafe_allow_html=True)
+st.caption("Samples saved from the score card, searchable by customer, site, report number, dates, score and values.")
+st.markdown("---")
+
+
+@st.cache_resource
+def open_archive() -> SampleArchive:
+    return SampleArchive(DEFAULT_ARCHIVE_PATH)
+
+
+@st.cache_resource
+def job_queue() -> JobQueue:
+    return JobQueue(DEFAULT_JOBS_PATH)
+
+
+archive = open_archive()
+queue = job_queue()
+
+# ============ IMPORT ============
+
+
+@st.fragment(run_every=1.0)
+def import_progress(job_id: int):
+    # يُحدَّث شريط التقدم كل ثانية دون إعادة تشغيل الصفحة كاملة
+    ensure_workers(DEFAULT_JOBS_PATH)
+    job = queue.get(job_id)
+    if job is None or job["status"] not in ACTIVE:
+        st.rerun()
+    st.progress(job["progress"], text=f"Importing: {job['message'] or 'waiting for a worker...'}")
+    st.button("Cancel / إلغاء", key=f"cancel_{job_id}", on_click=queue.cancel, args=(job_id,))
+
+
+with st.expander("Import samples / استيراد عينات"):
+    st.caption(
+        "JSON-lines file of samples, or a CSV / Excel export from the lab (one row per sample, "
+        "columns matched by name and unit); each sample is scored and saved in the background "
+        "(same report number replaces)."
+    )
+    uploaded = st.file_uploader("Samples file (.jsonl, .csv, .xlsx)", type=["jsonl", "json", "csv", "txt", "xlsx"])
+    if uploaded is not None and st.button("Import into archive / استيراد"):
+        from soil_health.parquet_archive import DEFAULT_PARQUET_PATH
+
+        targets = {"archive": os.path.abspath(DEFAULT_ARCHIVE_PATH), "parquet": os.path.abspath(DEFAULT_PARQUET_PATH)}
+        if uploaded.name.lower().endswith((".jsonl", ".json")):
+            st.session_state.import_job = queue.submit("score", targets, {"samples.jsonl": uploaded.getvalue()})
+        else:
+            name = os.path.basename(uploaded.name)
+            st.session_state.import_job = queue.submit(
+                "import", {**targets, "file": name}, {name: uploaded.getvalue()}
+            )
+    if "import_job" in st.session_state:
+        job = queue.get(st.session_state.import_job)
+        if job["status"] in ACTIVE:
+            import_progress(job["id"])
+        elif job["status"] == DONE:
+            bands = ", ".join(f"{band}: {n}" for band, n in job["result"]["bands"].items())
+            st.success(f"Imported {job['result']['archived']} samples ({bands}).")
+            details = job["result"].get("import")
+            if details:
+                st.caption(
+                    f"{details['rows']} rows, {details['skipped_rows']} skipped. "
+                    f"Columns: {', '.join(f'{h} → {k}' for h, k in details['columns'].items())}"
+                )
+                if details["skipped_columns"]:
+                    st.caption("Not imported: " + "; ".join(f"{h} ({why})" for h, why in details["skipped_columns"].items()))
+                if details["issues"]:
+                    st.warning(f"{details['issue_count']} value(s) left out")
+                    st.dataframe(details["issues"], hide_index=True)
+        else:
+            st.warning(f"Import {job['status']}: {job['error'] or 'samples saved before cancelling are kept'}")
+
+# ============ FILTERS ============
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    customer = st.text_input("Customer")
+    report_no = st.text_input("Report No.")
+with col2:
+    site = st.selectbox("Site", [""] + archive.sites())
+    received = st.date_input("Received between", value=(), format="YYYY-MM-DD")
+with col3:
+    min_score, max_score = st.slider("Overall score", 0, 100, (0, 100))
+    limit = st.selectbox("Max results", [100, 500, 2000], index=1)
+
+col4, col5, col6 = st.columns([3, 1, 2])
+with col4:
+    param = st.selectbox("Value condition (optional)", [""] + list(LABELS))
+with col5:
+    op = st.selectbox("Operator", OPERATORS, index=2)
+with col6:
+    threshold = st.number_input("Value", value=0.0, step=0.1)
+
+received_from = received[0] if len(received) > 0 else None
+received_to = received[1] if len(received) > 1 else received_from
+
+t0 = time.perf_counter()
+found = archive.find(
+    customer=customer.strip() or None,
+    site=site or None,
+    report_no=report_no.strip() or None,
+    received_from=received_from,
+    received_to=received_to,
+    min_score=min_score if min_score > 0 else None,
+    max_score=max_score if max_score < 100 else None,
+    values={param: (op, threshold)} if param else None,
+    limit=limit,
+)
+elapsed_ms = (time.perf_counter() - t0) * 1000
+
+st.caption(f"{len(found)} samples ({elapsed_ms:.1f} ms) of {len(archive)} archived")
+if not found:
+    st.info("No archived samples match these filters.")
+    st.stop()
+
+# ============ RESULTS ============
+
+columns = ["id", "report_no", "customer", "site", "received", "analyzed", "overall_score"]
+df = pd.DataFrame(found)
+shown = df[columns + ([value_column(param)] if param else [])].rename(
+    columns={value_column(param): param} if param else {}
+)
+st.dataframe(shown, width="stretch", hide_index=True)
+
+# ============ OPEN ONE SAMPLE ============
+
+st.markdown("---")
+choice = st.selectbox(
+    "Open a sample in the score card / فتح عينة في بطاقة التقييم",
+    df["id"],
+    format_func=lambda i: f"#{i} – {df.loc[df['id'] == i, 'report_no'].iloc[0] or 'no report no.'}",
+)
+if st.button("Open / فتح"):
+    record = archive.get(int(choice))
+    st.session_state.sample = SoilSample(record["raw_data"], record["sample_info"])
+    st.switch_page("pages/soil_score_card.py")
@@ -0,0 +1 @@
+"""Shared engines behind the Silal Soil Health Pro pages."""
@@ -0,0 +1,303 @@
+"""Prompt, context and response helpers for the bilingual AI recommendations."""
+
+import os
+
+MODEL = "gpt-4.1-mini"
+TEMPERATURE = 0.25
+# Constraint-focused compact prompt (key indicators and out-of-range values
+# only) by default; SOIL_HEALTH_COMPACT_PROMPT=0 sends every parameter.
+COMPACT_PROMPT = os.environ.get("SOIL_HEALTH_COMPACT_PROMPT", "1").strip().lower() not in ("0", "false", "no", "off")
+
+components_list = [
+    "Overall interpretation",
+    "Key soil constraints",
+    "Vegetables",
+    "Field crops",
+    "Fruit trees",
+    "Short-term actions",
+    "Long-term actions",
+]
+
+
+# =====================================================
+#  OpenAI client (created lazily, never at import time)
+# =====================================================
+
+def openai_api_key() -> str | None:
+    """Key from the environment / .env, falling back to Streamlit secrets."""
+    key = os.getenv("OPENAI_API_KEY")
+    if not key:
+        try:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            key = os.getenv("OPENAI_API_KEY")
+        except ImportError:
+            pass
+    if not key:
+        try:
+            import streamlit as st
+
+            key = st.secrets.get("OPENAI_API_KEY")
+        except Exception:
+            key = None
+    return key or None
+
+
+def make_client(api_key: str | None = None):
+    """Build a synchronous OpenAI client, or return None when no key is configured.
+
+    ``openai`` is imported here rather than at module level: it is the
+    heaviest import of the score card page and only needed once the AI
+    section actually runs.
+    """
+    api_key = api_key or openai_api_key()
+    if not api_key:
+        return None
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key)
+
+
+MISSING_MARKERS = [
+    "not analyzed",
+    "not analysed",
+    "غير محللة",
+    "غير مُحلَّلة",
+    "na",
+    "n/a",
+]
+
+
+SITE_CONTEXT_LINES = [
+    "- Country: United Arab Emirates (UAE).",
+    "- Climate: Arid, hot, high evaporative demand, risk of salinity build-up.",
+    "- Typical soils: Sandy, very low organic matter, low CEC, often calcareous.",
+    "- Irrigation water may be saline or marginal in quality.",
+    "- Biochar is NOT to be recommended (not commercially available locally).",
+    "- Focus on compost, manures, green waste compost, gypsum, elemental sulfur, balanced mineral fertilizers, and micronutrients.",
+]
+
+# Indicators always sent in compact mode, even when within optimum.
+CORE_LABELS = ["pH (paste extract)", "ECe", "Organic Matter", "SAR", "Soil Texture Class"]
+
+# Parameters without an optimum range that are sent when their constraint is raised.
+CONSTRAINT_DRIVERS = {
+    "salinity": ["Soluble Sodium (Na⁺)", "Soluble Chloride (Cl⁻)", "Soluble Sulfate (SO₄²⁻)"],
+    "sodicity": ["Soluble Sodium (Na⁺)", "Exchangeable Sodium"],
+    "high_ph":  ["Soluble Bicarbonate (HCO₃⁻)", "CaCO₃"],
+}
+
+
+def build_ai_context(raw_data: dict, overall_score: float | None, compact: bool = COMPACT_PROMPT) -> str:
+    if compact:
+        return build_compact_context(raw_data, overall_score)
+
+    lines = []
+    lines.append("Soil analysis summary (parameters with values):")
+
+    for k, v in raw_data.items():
+        if v and str(v).strip().lower() not in MISSING_MARKERS:
+            lines.append(f"- {k}: {v}")
+
+    if overall_score is not None:
+        lines.append(f"\nCalculated Soil Health Score (0–100): {overall_score:.1f}")
+
+    lines.append("\nSite context:")
+    lines.extend(SITE_CONTEXT_LINES)
+    return "\n".join(lines)
+
+
+def build_compact_context(raw_data: dict, overall_score: float | None) -> str:
+    """Constraint-focused context: core indicators plus out-of-range parameters only.
+
+    Parameters within their optimum range (most ions and micronutrients) are
+    summarised as a count; the static site context lives in
+    ``SYSTEM_PROMPT_COMPACT`` so it forms a stable, cacheable prompt prefix.
+    """
+    from soil_health.rules import RULE_THRESHOLDS, constraint_flags
+    from soil_health.sample import number_of
+    from soil_health.scoring import PARAM_TO_INDICATOR
+    from soil_health.specs import PARAM_SPECS, range_status
+
+    flags = constraint_flags(raw_data)
+    drivers = {label for flag in flags for label in CONSTRAINT_DRIVERS.get(flag, [])}
+    drivers.update(label for flag, label, _, _ in RULE_THRESHOLDS if flag in flags)
+
+    rows = []
+    omitted = 0
+    for label, value in raw_data.items():
+        if not value or str(value).strip().lower() in MISSING_MARKERS:
+            continue
+        spec = PARAM_SPECS.get(label)
+        num_val = number_of(raw_data, label)
+        status = range_status(num_val, spec)
+        if status is None and num_val is None and str(value).strip().startswith("<"):
+            status = "low"  # below the limit of quantification
+        if label in CORE_LABELS or label in drivers or status in ("low", "high"):
+            name = PARAM_TO_INDICATOR[label][0] if label in PARAM_TO_INDICATOR else label
+            unit = spec["unit"] if spec and spec["unit"] != "-" else ""
+            rows.append(f"{name}|{value} {unit}".rstrip() + f"|{status or ''}")
+        else:
+            omitted += 1
+
+    lines = ["param|value|status"]
+    lines.extend(rows)
+    if omitted:
+        lines.append(f"({omitted} other analysed parameters omitted)")
+    lines.append(f"constraints: {', '.join(flags) if flags else 'none'}")
+    if overall_score is not None:
+        lines.append(f"score: {overall_score:.1f}/100")
+    return "\n".join(lines)
+
+
+SYSTEM_PROMPT_JSON = """
+You are an expert soil fertility and crop nutrition specialist working in arid, sandy soils of the UAE.
+
+You will receive:
+- Soil test data (pH, ECe, OM, SAR, ESP, CEC, texture, macro- and micronutrients, etc.).
+- A soil health score (0–100).
+
+You MUST return ONLY valid JSON (no markdown, no commentary, no code fences) with the following structure:
+
+{
+  "Overall interpretation": {
+    "en": "...",
+    "ar": "..."
+  },
+  "Key soil constraints": {
+    "en": "...",
+    "ar": "..."
+  },
+  "Vegetables": {
+    "en": "...",
+    "ar": "..."
+  },
+  "Field crops": {
+    "en": "...",
+    "ar": "..."
+  },
+  "Fruit trees": {
+    "en": "...",
+    "ar": "..."
+  },
+  "Short-term actions": {
+    "en": "...",
+    "ar": "..."
+  },
+  "Long-term actions": {
+    "en": "...",
+    "ar": "..."
+  }
+}
+
+RULES:
+1. Each "en" value: 3–6 concise bullet-like sentences separated by line breaks.
+2. Each "ar" value: Modern Standard Arabic, accurate translation of the same ideas, also 3–6 bullet-like sentences separated by line breaks.
+3. NO English words inside the Arabic text; NO Arabic words inside the English text.
+4. DO NOT mention biochar at all.
+5. Use realistic, literature-based soil test target ranges for vegetables, field crops, and fruit trees in calcareous, sandy soils.
+6. Explicitly account for salinity, sodicity, low OM, low CEC, high pH and bicarbonate.
+7. Distinguish between vegetables, field crops, and fruit trees under UAE conditions.
+8. Focus on compost, manures, green waste compost, gypsum, elemental sulfur, micronutrients, foliar sprays, optimized fertigation.
+9. NO specific kg/ha fertilizer rates.
+"""
+
+
+# Static guidance first so every compact request shares the same prefix
+# (eligible for provider-side prompt caching).
+SYSTEM_PROMPT_COMPACT = SYSTEM_PROMPT_JSON + """
+Site context for every sample:
+""" + "\n".join(SITE_CONTEXT_LINES) + """
+Soil data arrives as "param|value|status" rows (status low/high/ok vs optimum): core indicators plus parameters outside optimum or driving a constraint; omitted ones are within optimum or not constraint-relevant.
+"""
+
+
+def system_prompt(compact: bool = COMPACT_PROMPT) -> str:
+    return SYSTEM_PROMPT_COMPACT if compact else SYSTEM_PROMPT_JSON
+
+
+def build_messages(context: str, compact: bool = COMPACT_PROMPT) -> list[dict]:
+    return [
+        {"role": "system", "content": system_prompt(compact)},
+        {"role": "user", "content": context},
+    ]
+
+
+def html_escape(text: str) -> str:
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+    )
+
+
+RECO_TABLE_CSS = """
+<style>
+.soil-reco-table {
+  width: 100%;
+  border-collapse: collapse;
+}
+.soil-reco-table th, .soil-reco-table td {
+  border: 1px solid #ddd;
+  padding: 0.6rem;
+  vertical-align: top;
+  font-size: 0.9rem;
+}
+.soil-reco-table th {
+  background-color: #f5f5f5;
+  text-align: center;
+}
+.soil-reco-comp {
+  width: 12rem;
+  white-space: nowrap;
+}
+.soil-reco-en {
+  text-align: left;
+  direction: ltr;
+  white-space: pre-wrap;
+}
+.soil-reco-ar {
+  text-align: right;
+  direction: rtl;
+  white-space: pre-wrap;
+}
+.soil-reco-pending {
+  color: #999;
+}
+</style>
+"""
+
+
+def render_reco_table(ai_json: dict, pending: bool = False) -> str:
+    """HTML table of the seven sections.
+
+    With ``pending=True`` sections not yet present in ``ai_json`` are shown
+    as placeholders (used while the response is still streaming).
+    """
+    table_html = RECO_TABLE_CSS + """
+<table class="soil-reco-table">
+  <tr>
+    <th>Component</th>
+    <th>Summary / Recommendations</th>
+    <th>الخلاصة والتوصيات</th>
+  </tr>
+"""
+    for comp in components_list:
+        block = ai_json.get(comp)
+        if block is None and pending:
+            en = '<span class="soil-reco-pending">…</span>'
+            ar = '<span class="soil-reco-pending">…</span>'
+        else:
+            block = block or {}
+            en = html_escape(block.get("en", "").strip())
+            ar = html_escape(block.get("ar", "").strip())
+        table_html += f"""
+  <tr>
+    <td class="soil-reco-comp">{html_escape(comp)}</td>
+    <td class="soil-reco-en">{en}</td>
+    <td class="soil-reco-ar">{ar}</td>
+  </tr>
+"""
+    table_html += "</table>"
+    return table_html
@@ -0,0 +1,411 @@
+"""Headless HTTP API for LIMS and farm-management integrations.
+
+JSON over HTTP on the standard library server, next to the Streamlit app:
+
+- ``POST /extract``: the bytes of a lab report PDF; returns the sample
+  (``{"sample_info", "raw_data"}``)
+- ``POST /score``: sample(s); returns the score card rows, overall score,
+  band and constraint flags
+- ``POST /fertilizer``: sample(s) plus ``crop_group`` / ``depth_m`` /
+  ``bulk_density``; returns the nutrient requirements and product rates
+- ``POST /recommend``: sample(s); returns the seven bilingual sections and
+  their ``source`` (``ai``, ``cache``, ``prewarmed`` or ``rules``)
+- ``GET /health``
+
+A request body is one sample payload or ``{"samples": [...]}``; a batch
+answers ``{"results": [...]}`` in input order.
+
+PDF parsing and large score / fertilizer batches run in a process pool, so
+the request threads never hold the GIL through CPU work. Recommendations use
+one asyncio loop shared by all requests: LLM calls from concurrent requests
+overlap under the rate limits of one :class:`BatchRecommender`, behind the
+same context cache, pre-warmed cache and rule-engine fallback as the score
+card page. Without an OpenAI key (or ``--base-url``) the rule engine answers.
+
+    python -m soil_health.api --port 8080 --workers 4
+    curl -s localhost:8080/score -d '{"raw_data": {"pH (paste extract)": "8.1", "ECe": "4.2"}}'
+    curl -s localhost:8080/extract --data-binary @report.pdf -H "Content-Type: application/pdf"
+"""
+
+import argparse
+import asyncio
+import importlib
+import io
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from soil_health.ai import COMPACT_PROMPT, MODEL, build_ai_context, openai_api_key
+from soil_health.cache import DEFAULT_CACHE_PATH, PersistentCache, TTLCache
+from soil_health.fertilizer import TARGET_LEVELS, fertilizer_products, fertilizer_requirements
+from soil_health.metrics import record_cache
+from soil_health.prewarm import prewarm_key
+from soil_health.rules import constraint_flags, rule_based_recommendations, score_band
+from soil_health.sample import SoilSample
+from soil_health.schema import invalid_entries, merge_entries
+from soil_health.scoring import compute_score_card
+
+MAX_BODY_BYTES = 20 * 2**20
+MAX_BATCH = 5000
+# batches smaller than this are computed on the request thread: a round trip
+# to a worker costs more than scoring a few samples
+POOL_MIN_BATCH = 64
+POOL_CHUNK = 256
+
+
+class BadRequest(ValueError):
+    """Invalid request body; answered with HTTP 400."""
+
+
+# ============ CPU work (module level, so it runs in worker processes) ============
+
+def _init_worker():
+    # pypdf and the scoring tables are imported once per worker, not per request
+    importlib.import_module("soil_health.extraction")
+
+
+def extract_payload(pdf_bytes: bytes) -> dict:
+    """The sample of one lab report PDF."""
+    from soil_health.extraction import sample_from_pdf
+
+    return sample_from_pdf(io.BytesIO(pdf_bytes)).to_payload()
+
+
+def score_payloads(payloads: list[dict]) -> list[dict]:
+    results = []
+    for payload in payloads:
+        sample = SoilSample.from_payload(payload)
+        rows, overall_score, missing = compute_score_card(sample)
+        results.append(
+            {
+                "overall_score": overall_score,
+                "band": score_band(overall_score),
+                "constraints": list(constraint_flags(sample)),
+                "missing_mandatory": missing,
+                "score_rows": rows,
+            }
+        )
+    return results
+
+
+def fertilizer_payloads(payloads: list[dict], crop_group: str, depth_m: float, bulk_density: float) -> list[dict]:
+    results = []
+    for payload in payloads:
+        rows_fert = fertilizer_requirements(SoilSample.from_payload(payload), crop_group, depth_m, bulk_density)
+        results.append({"fert_rows": rows_fert, "product_rows": fertilizer_products(rows_fert)})
+    return results
+
+
+# ============ Shared engines ============
+
+class Engines:
+    """Process pool, recommendation loop and caches shared by all request threads.
+
+    ``workers=0`` runs everything on the request threads. ``use_ai`` defaults
+    to whether an OpenAI key or ``base_url`` is configured.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        base_url: str | None = None,
+        use_ai: bool | None = None,
+        cache_path: str = DEFAULT_CACHE_PATH,
+        max_concurrency: int = 32,
+        requests_per_minute: float = 500,
+        tokens_per_minute: float = 200_000,
+        compact: bool = COMPACT_PROMPT,
+        recommender=None,
+    ):
+        self.pool = None
+        if workers != 0:
+            self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker)
+            # start the workers now, before the loop and server threads exist
+            self.pool.submit(_init_worker).result()
+        self.compact = compact
+        self.use_ai = use_ai if use_ai is not None else bool(base_url or openai_api_key())
+        self.cache = TTLCache(ttl=3600)
+        self.prewarmed = PersistentCache(cache_path) if os.path.exists(cache_path) else None
+        self.recommender = None
+        if self.use_ai:
+            from soil_health.batch import BatchRecommender
+
+            self.recommender = recommender or BatchRecommender(
+                base_url=base_url,
+                max_concurrency=max_concurrency,
+                requests_per_minute=requests_per_minute,
+                tokens_per_minute=tokens_per_minute,
+                compact=compact,
+            )
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, name="recommend-loop", daemon=True)
+        self._loop_thread.start()
+
+    def cpu(self, fn, payloads: list, *args) -> list:
+        """``fn(payloads, *args)``, split over the pool for large batches."""
+        if self.pool is None or len(payloads) < POOL_MIN_BATCH:
+            return fn(payloads, *args)
+        chunk = max(1, min(POOL_CHUNK, -(-len(payloads) // self.pool._max_workers)))
+        futures = [self.pool.submit(fn, payloads[i:i + chunk], *args) for i in range(0, len(payloads), chunk)]
+        return [item for future in futures for item in future.result()]
+
+    def extract(self, pdf_bytes: bytes) -> dict:
+        if self.pool is None:
+            return extract_payload(pdf_bytes)
+        return self.pool.submit(extract_payload, pdf_bytes).result()
+
+    def recommend(self, payloads: list[dict]) -> list[dict]:
+        """Recommendations per sample; LLM calls of one batch (and of all threads) run concurrently."""
+        results, pending = [], {}
+        for payload in payloads:
+            sample = SoilSample.from_payload(payload)
+            _, overall_score, _ = compute_score_card(sample)
+            rules = rule_based_recommendations(sample, overall_score)
+            entry = {"recommendations": rules, "source": "rules", "overall_score": overall_score}
+            results.append(entry)
+            if not self.use_ai:
+                continue
+            context = build_ai_context(sample, overall_score, compact=self.compact)
+            cached, source = self.cache.get(context), "cache"
+            if cached is None and self.prewarmed is not None:
+                cached, source = self.prewarmed.get(prewarm_key(sample, overall_score)), "prewarmed"
+            record_cache(MODEL, hit=cached is not None)
+            if cached is not None:
+                entry.update(recommendations=merge_entries(cached, rules, invalid_entries(cached)), source=source)
+            else:
+                pending.setdefault(context, []).append((entry, rules))
+
+        if pending:
+            contexts = list(pending)
+            future = asyncio.run_coroutine_threadsafe(self._generate(contexts), self.loop)
+            for context, outcome in zip(contexts, future.result()):
+                if outcome["result"] is not None:
+                    self.cache.set(context, outcome["result"])
+                for entry, rules in pending[context]:
+                    if outcome["result"] is None:
+                        entry["error"] = outcome["error"]
+                        continue
+                    result = outcome["result"]
+                    entry.update(recommendations=merge_entries(result, rules, invalid_entries(result)), source="ai")
+        return results
+
+    async def _generate(self, contexts: list[str]) -> list[dict]:
+        return await asyncio.gather(*(self.recommender.recommend(context) for context in contexts))
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join(timeout=5)
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+        if self.prewarmed is not None:
+            self.prewarmed.close()
+
+
+# ============ Request handling ============
+
+def _json_body(body: bytes) -> dict:
+    try:
+        data = json.loads(body or b"{}")
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise BadRequest(f"Invalid JSON: {e}") from None
+    if not isinstance(data, dict):
+        raise BadRequest("Expected a JSON object")
+    return data
+
+
+def _payloads(data: dict) -> tuple[list[dict], bool]:
+    """(sample payloads, whether the request was a batch)."""
+    if "samples" in data:
+        samples = data["samples"]
+        if not isinstance(samples, list):
+            raise BadRequest("'samples' must be a list")
+        if len(samples) > MAX_BATCH:
+            raise BadRequest(f"At most {MAX_BATCH} samples per request")
+        batch = True
+    else:
+        samples, batch = [data], False
+    for sample in samples:
+        if not isinstance(sample, dict) or not isinstance(sample.get("raw_data"), dict):
+            raise BadRequest("Each sample needs a 'raw_data' object")
+        if not isinstance(sample.get("sample_info") or {}, dict):
+            raise BadRequest("'sample_info' must be an object")
+    return [{"sample_info": s.get("sample_info") or {}, "raw_data": s["raw_data"]} for s in samples], batch
+
+
+def _answer(results: list, batch: bool):
+    return {"results": results} if batch else results[0]
+
+
+def handle_extract(engines: Engines, body: bytes, headers) -> dict:
+    if not body.lstrip()[:5] == b"%PDF-":
+        raise BadRequest("Expected the bytes of a PDF file")
+    return engines.extract(body)
+
+
+def handle_score(engines: Engines, body: bytes, headers) -> dict:
+    payloads, batch = _payloads(_json_body(body))
+    return _answer(engines.cpu(score_payloads, payloads), batch)
+
+
+def handle_fertilizer(engines: Engines, body: bytes, headers) -> dict:
+    data = _json_body(body)
+    crop_group = data.get("crop_group", "Vegetables")
+    if crop_group not in TARGET_LEVELS:
+        raise BadRequest(f"Unknown crop group: {crop_group}")
+    try:
+        depth_m = float(data.get("depth_m", 0.3))
+        bulk_density = float(data.get("bulk_density", 1.5))
+    except (TypeError, ValueError):
+        raise BadRequest("'depth_m' and 'bulk_density' must be numbers") from None
+    payloads, batch = _payloads(data)
+    return _answer(engines.cpu(fertilizer_payloads, payloads, crop_group, depth_m, bulk_density), batch)
+
+
+def handle_recommend(engines: Engines, body: bytes, headers) -> dict:
+    payloads, batch = _payloads(_json_body(body))
+    return _answer(engines.recommend(payloads), batch)
+
+
+ROUTES = {
+    "/extract": handle_extract,
+    "/score": handle_score,
+    "/fertilizer": handle_fertilizer,
+    "/recommend": handle_recommend,
+}
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "SoilHealthAPI/1.0"
+    protocol_version = "HTTP/1.1"  # keep-alive: integrations send many requests per connection
+    disable_nagle_algorithm = True  # headers and body are separate writes; no 40 ms delayed-ACK stall
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str):
+        self._send_json(status, {"error": message})
+
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") != "/health":
+            self._error(404, f"Unknown path {self.path}")
+            return
+        engines = self.server.engines
+        self._send_json(
+            200,
+            {
+                "status": "ok",
+                "workers": engines.pool._max_workers if engines.pool is not None else 0,
+                "ai": engines.use_ai,
+                "cached_recommendations": len(engines.cache),
+            },
+        )
+
+    def do_POST(self):
+        handler = ROUTES.get(self.path.split("?")[0].rstrip("/"))
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if handler is None or length < 0 or length > MAX_BODY_BYTES:
+            # the body is not read, so the connection cannot be reused
+            self.close_connection = True
+            if handler is None:
+                self._error(404, f"Unknown path {self.path}")
+            elif length < 0:
+                self._error(400, "Invalid Content-Length")
+            else:
+                self._error(413, f"Request body over {MAX_BODY_BYTES // 2**20} MiB")
+            return
+
+        body = self.rfile.read(length)
+        started = time.perf_counter()
+        try:
+            result = handler(self.server.engines, body, self.headers)
+        except BadRequest as e:
+            self._error(400, str(e))
+            return
+        except Exception as e:
+            self._error(500, f"{type(e).__name__}: {e}")
+            return
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        self._send_json(200, result)
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 drops connections from concurrent clients
+
+
+def start_api_server(host: str = "127.0.0.1", port: int = 0, verbose: bool = False, **engine_options):
+    """Start the API on a daemon thread; returns ``(server, base_url)``.
+
+    ``engine_options`` go to :class:`Engines`; ``server.engines.close()``
+    stops the pool and the recommendation loop after ``server.shutdown()``.
+    """
+    engines = Engines(**engine_options)
+    server = ApiServer((host, port), ApiHandler)
+    server.engines = engines
+    server.verbose = verbose
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve extract / score / fertilizer / recommend over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (0: none; default: CPU count)")
+    parser.add_argument("--base-url", default=None, help="OpenAI-compatible endpoint (e.g. the mock server)")
+    parser.add_argument("--no-ai", action="store_true", help="Rule-based recommendations only")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent LLM calls")
+    parser.add_argument("--rpm", type=float, default=500, help="LLM requests per minute")
+    parser.add_argument("--tpm", type=float, default=200_000, help="LLM tokens per minute")
+    parser.add_argument("--cache-db", default=DEFAULT_CACHE_PATH, help="Pre-warmed recommendations")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server, base_url = start_api_server(
+        args.host,
+        args.port,
+        verbose=args.verbose,
+        workers=args.workers,
+        base_url=args.base_url,
+        use_ai=False if args.no_ai else None,
+        cache_path=args.cache_db,
+        max_concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+    )
+    print(f"Soil health API listening on {base_url}", flush=True)
+    # SIGTERM (service stop) shuts down like Ctrl+C, so the worker processes exit too
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.engines.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""Persistent sample archive in SQLite (WAL mode).
+
+Each archived sample is one row of searchable fields: customer, site,
+report number, dates, overall score and the parsed number of every
+``PARAMS`` parameter in its own column (``v_<key>``). The sample info, the
+values as reported, the indicator scores, fertilizer tables and
+recommendations are JSON documents in a side table, so searches never read
+them. Report numbers are unique, so saving a report again replaces it.
+
+Received / analyzed dates are normalised to ISO ``YYYY-MM-DD`` (the lab
+PDFs write ``dd/mm/yyyy``) so date ranges use the indexes. Queries such as
+"site X in 2025 with ECe > 8" go through the ``(site, received)`` index and
+then check the ``v_ece`` column of the matching rows only.
+
+The path defaults to ``SOIL_HEALTH_ARCHIVE_DB`` or ``soil_archive.sqlite3``.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+
+from soil_health.sample import PARAMS, SoilSample
+from soil_health.scoring import compute_score_card
+
+DEFAULT_ARCHIVE_PATH = os.environ.get("SOIL_HEALTH_ARCHIVE_DB", "soil_archive.sqlite3")
+
+VALUE_COLUMNS = {p["key"]: f"v_{p['key']}" for p in PARAMS}
+KEY_BY_LABEL = {p["label"]: p["key"] for p in PARAMS}
+OPERATORS = ("<", "<=", ">", ">=", "=")
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%d/%m/%y", "%d %b %Y", "%d %B %Y", "%d-%b-%Y")
+
+META_COLUMNS = ["id", "report_no", "customer", "site", "received", "analyzed", "overall_score", "saved_at"]
+RECORD_COLUMNS = META_COLUMNS[1:] + list(VALUE_COLUMNS.values())
+DOCUMENT_COLUMNS = ["sample_info", "raw_data", "scores", "fertilizer", "recommendations"]
+
+SCHEMA = [
+    # searchable fields only, so rows stay small and index lookups touch few pages
+    "CREATE TABLE IF NOT EXISTS samples ("
+    "id INTEGER PRIMARY KEY, report_no TEXT UNIQUE, customer TEXT, site TEXT, "
+    "received TEXT, analyzed TEXT, overall_score REAL, saved_at REAL NOT NULL, "
+    + ", ".join(f"{col} REAL" for col in VALUE_COLUMNS.values()) + ")",
+    "CREATE TABLE IF NOT EXISTS documents ("
+    "id INTEGER PRIMARY KEY REFERENCES samples (id), "
+    + ", ".join(f"{col} TEXT" for col in DOCUMENT_COLUMNS) + ")",
+    "CREATE INDEX IF NOT EXISTS samples_customer ON samples (customer, received)",
+    "CREATE INDEX IF NOT EXISTS samples_site ON samples (site, received)",
+    "CREATE INDEX IF NOT EXISTS samples_received ON samples (received)",
+    "CREATE INDEX IF NOT EXISTS samples_analyzed ON samples (analyzed, received)",
+    "CREATE INDEX IF NOT EXISTS samples_score ON samples (overall_score, received)",
+]
+# saving a report number again replaces the row and keeps its id
+UPSERT = (
+    f"INSERT INTO samples ({', '.join(RECORD_COLUMNS)}) VALUES ({', '.join('?' * len(RECORD_COLUMNS))}) "
+    "ON CONFLICT (report_no) DO UPDATE SET "
+    + ", ".join(f"{col} = excluded.{col}" for col in RECORD_COLUMNS if col != "report_no")
+    + " RETURNING id"
+)
+UPSERT_DOCUMENT = (
+    f"INSERT OR REPLACE INTO documents (id, {', '.join(DOCUMENT_COLUMNS)}) "
+    f"VALUES (?, {', '.join('?' * len(DOCUMENT_COLUMNS))})"
+)
+
+
+def iso_date(text) -> str | None:
+    """``YYYY-MM-DD`` for a date as written on a report, or None."""
+    if isinstance(text, (date, datetime)):
+        return text.strftime("%Y-%m-%d")
+    text = " ".join(str(text or "").split())
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def value_column(name: str) -> str:
+    """Column of a parameter given by ``PARAMS`` key or label (e.g. ``"ece"`` or ``"ECe"``)."""
+    key = KEY_BY_LABEL.get(name, name)
+    if key not in VALUE_COLUMNS:
+        raise ValueError(f"Unknown parameter: {name!r}")
+    return VALUE_COLUMNS[key]
+
+
+def _dumps(value) -> str | None:
+    return json.dumps(value, ensure_ascii=False, default=str) if value is not None else None
+
+
+def _record(sample, score_rows, overall_score, fertilizer, recommendations) -> tuple[list, list]:
+    """(samples row, documents row without the id) in column order."""
+    sample = SoilSample.from_payload(sample)
+    if score_rows is None:
+        score_rows, overall_score, _ = compute_score_card(sample)
+    info = sample.info
+    row = [
+        str(info.get("report_no") or "").strip() or None,
+        str(info.get("customer") or "").strip() or None,
+        str(info.get("site") or "").strip() or None,
+        iso_date(info.get("received")),
+        iso_date(info.get("analyzed")),
+        overall_score,
+        time.time(),
+    ]
+    row.extend(sample.number(p["label"]) for p in PARAMS)
+    # score per indicator; value, unit and weight are in raw_data and scoring
+    scores = {r.get("Parameter (report label)", r["Indicator"]): r["Score (0–5)"] for r in score_rows}
+    document = [_dumps(info), _dumps(dict(sample)), _dumps(scores), _dumps(fertilizer), _dumps(recommendations)]
+    return row, document
+
+
+def _index_hint(customer, site, report_no, received, analyzed, score) -> str:
+    """Index for a search, most selective first.
+
+    Without histograms SQLite misjudges the range filters: it walks the
+    received index in order and tests every row for a score range (hundreds
+    of ms on 200k rows), or picks a wide score range over the site index.
+    The (customer|site, received) indexes also return rows in result order,
+    so a LIMIT stops early.
+    """
+    if report_no:
+        return ""  # unique index
+    if customer:
+        return "INDEXED BY samples_customer"
+    if site:
+        return "INDEXED BY samples_site"
+    if received:
+        return "INDEXED BY samples_received"
+    if analyzed:
+        return "INDEXED BY samples_analyzed"
+    if score:
+        return "INDEXED BY samples_score"
+    return ""
+
+
+def _decoded(names: list[str], row: tuple) -> dict:
+    item = dict(zip(names, row))
+    for column in DOCUMENT_COLUMNS:
+        if column in item:
+            item[column] = json.loads(item[column]) if item[column] is not None else None
+    return item
+
+
+class SampleArchive:
+    """Archived samples with their scores, fertilizer tables and recommendations."""
+
+    def __init__(self, path: str = DEFAULT_ARCHIVE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            # WAL: readers (other sessions, the search page) do not block the writer
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                for statement in SCHEMA:
+                    self._conn.execute(statement)
+
+    def save(
+        self,
+        sample,
+        score_rows: list[dict] | None = None,
+        overall_score: float | None = None,
+        fertilizer: dict | None = None,
+        recommendations: dict | None = None,
+    ) -> int:
+        """Archive one sample (a ``SoilSample`` or payload); returns its id.
+
+        The score is computed when ``score_rows`` is not given.
+        """
+        row, document = _record(sample, score_rows, overall_score, fertilizer, recommendations)
+        with self._lock, self._conn:
+            sample_id = self._conn.execute(UPSERT, row).fetchone()[0]
+            self._conn.execute(UPSERT_DOCUMENT, [sample_id, *document])
+        return sample_id
+
+    def save_many(self, samples) -> int:
+        """Archive many samples (scores computed) in one transaction; returns the count."""
+        records = [_record(s, None, None, None, None) for s in samples]
+        with self._lock, self._conn:
+            for row, document in records:
+                sample_id = self._conn.execute(UPSERT, row).fetchone()[0]
+                self._conn.execute(UPSERT_DOCUMENT, [sample_id, *document])
+        return len(records)
+
+    def find(
+        self,
+        customer: str | None = None,
+        site: str | None = None,
+        report_no: str | None = None,
+        received_from=None,
+        received_to=None,
+        analyzed_from=None,
+        analyzed_to=None,
+        min_score: float | None = None,
+        max_score: float | None = None,
+        values: dict | None = None,
+        limit: int | None = 500,
+        full: bool = False,
+    ) -> list[dict]:
+        """Matching samples, newest received first.
+
+        ``values`` maps a parameter (key or label) to ``(operator, number)``,
+        e.g. ``{"ECe": (">", 8)}``. Rows carry the indexed fields and the
+        parameter values; ``full=True`` adds the decoded documents.
+        """
+        where, params = [], []
+        for column, value in (("customer", customer), ("site", site), ("report_no", report_no)):
+            if value:
+                where.append(f"s.{column} = ?")
+                params.append(value)
+        for column, low, high in (
+            ("received", received_from, received_to),
+            ("analyzed", analyzed_from, analyzed_to),
+            ("overall_score", min_score, max_score),
+        ):
+            if low is not None:
+                where.append(f"s.{column} >= ?")
+                params.append(iso_date(low) if column != "overall_score" else low)
+            if high is not None:
+                where.append(f"s.{column} <= ?")
+                params.append(iso_date(high) if column != "overall_score" else high)
+        for name, (op, number) in (values or {}).items():
+            if op not in OPERATORS:
+                raise ValueError(f"Unsupported operator: {op!r}")
+            where.append(f"s.{value_column(name)} {op} ?")
+            params.append(float(number))
+
+        # ids first (the sort needs only the index columns), then the full
+        # rows of the page that is returned
+        ids = f"SELECT s.id FROM samples s {_index_hint(customer, site, report_no, received_from or received_to, analyzed_from or analyzed_to, min_score is not None or max_score is not None)}"
+        if where:
+            ids += " WHERE " + " AND ".join(where)
+        ids += " ORDER BY s.received DESC, s.id DESC"
+        if limit is not None:
+            ids += f" LIMIT {int(limit)}"
+        columns = [f"s.{col}" for col in META_COLUMNS + list(VALUE_COLUMNS.values())]
+        if full:
+            columns += [f"d.{col}" for col in DOCUMENT_COLUMNS]
+        sql = f"SELECT {', '.join(columns)} FROM samples s"
+        if full:
+            sql += " LEFT JOIN documents d ON d.id = s.id"
+        sql += f" WHERE s.id IN ({ids}) ORDER BY s.received DESC, s.id DESC"
+
+        names = [col.split(".")[1] for col in columns]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        if not full:
+            return [dict(zip(names, row)) for row in rows]
+        return [_decoded(names, row) for row in rows]
+
+    def get(self, sample_id: int) -> dict | None:
+        """One archived sample with its documents decoded."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT * FROM samples s LEFT JOIN documents d USING (id) WHERE s.id = ?", (sample_id,)
+            )
+            row = cursor.fetchone()
+        return _decoded([d[0] for d in cursor.description], row) if row is not None else None
+
+    def iter_raw_data(self, received_from=None, chunk: int = 1000):
+        """The stored ``raw_data`` of every sample (received on or after ``received_from``), streamed."""
+        sql = "SELECT s.id, d.raw_data FROM samples s JOIN documents d ON d.id = s.id WHERE s.id > ?"
+        params = []
+        if received_from is not None:
+            sql += " AND s.received >= ?"
+            params.append(iso_date(received_from))
+        sql += f" ORDER BY s.id LIMIT {int(chunk)}"
+        last = 0
+        while True:
+            # one page per lock hold, so saves are not blocked for the whole scan
+            with self._lock:
+                rows = self._conn.execute(sql, [last, *params]).fetchall()
+            if not rows:
+                return
+            for sample_id, raw_data in rows:
+                if raw_data is not None:
+                    yield json.loads(raw_data)
+            last = rows[-1][0]
+
+    def analyze(self):
+        """Refresh the planner statistics (after large imports)."""
+        with self._lock:
+            self._conn.execute("ANALYZE")
+
+    def sites(self) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT site FROM samples WHERE site IS NOT NULL ORDER BY site")
+            return [row[0] for row in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
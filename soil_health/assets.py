@@ -0,0 +1,62 @@
+"""Static page assets, loaded once per process and shared by all sessions.
+
+``st.image("Silal_logo.jpeg")`` re-reads and re-decodes the file on every
+rerun of every session. The logos are read once here and handed to
+``st.image`` as base64 data URIs, which Streamlit passes straight to the
+browser (no disk read, no PIL decode, no media file per session). Style
+blocks that pages send on each rerun live here as constants.
+"""
+
+import base64
+import mimetypes
+import os
+from functools import lru_cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SILAL_LOGO = os.path.join(ROOT, "Silal_logo.jpeg")
+IO_LOGO = os.path.join(ROOT, "IO_logo.png")
+
+
+@lru_cache(maxsize=8)
+def logo_data_uri(path: str) -> str:
+    """``data:`` URI of an image file, encoded once per process."""
+    mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    with open(path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode('ascii')}"
+
+
+def header_logos() -> tuple[str, str]:
+    """(Silal, IO) logos for the page headers."""
+    return logo_data_uri(SILAL_LOGO), logo_data_uri(IO_LOGO)
+
+
+SCORE_BAR_CSS = """
+<style>
+.score-container {
+    margin-top: 0.3rem;
+    margin-bottom: 1rem;
+}
+.score-bar-bg {
+    width: 100%;
+    height: 22px;
+    border-radius: 999px;
+    background: linear-gradient(90deg, #2e7d32, #f9a825, #c62828); /* green → yellow → red */
+    position: relative;
+    overflow: hidden;
+}
+.score-bar-mask {
+    position: absolute;
+    top: 0;
+    right: 0;
+    height: 100%;
+    background: rgba(255,255,255,0.7);
+}
+.score-label {
+    margin-top: 0.25rem;
+    font-size: 0.8rem;
+    color: #555;
+    display: flex;
+    justify-content: space-between;
+}
+</style>
+"""
@@ -0,0 +1,291 @@
+"""Concurrent batch generation of bilingual recommendations.
+
+Fans out over many sample contexts with the async OpenAI client while
+staying inside the account rate limits:
+
+- a semaphore bounds the number of in-flight requests,
+- token buckets cap requests/min and (estimated) tokens/min,
+- retryable errors (429, 5xx, timeouts) back off exponentially with jitter,
+- identical contexts are sent once and the result is shared.
+
+``python -m benchmarks.batch_recommender`` checks each of these against
+the mock server in ``soil_health.mock_openai``.
+
+CLI (e.g. against ``python -m soil_health.mock_openai``):
+
+    python -m soil_health.batch samples.jsonl --out recos.jsonl --base-url http://127.0.0.1:8765/v1
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+from soil_health.ai import COMPACT_PROMPT, MODEL, TEMPERATURE, build_ai_context, build_messages
+from soil_health.metrics import record_call, record_retry
+
+
+class TokenBucket:
+    """Asyncio token bucket: ``rate`` tokens per second, bursting up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, limit: float) -> "TokenBucket":
+        return cls(rate=limit / 60.0, capacity=limit)
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+def context_key(context: str) -> str:
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(context: str, max_output_tokens: int = 1500, compact: bool = COMPACT_PROMPT) -> int:
+    # ~4 characters per token is close enough for budgeting; the real count
+    # comes back in resp.usage.
+    prompt_chars = sum(len(m["content"]) for m in build_messages(context, compact))
+    return prompt_chars // 4 + max_output_tokens
+
+
+def _is_retryable(exc: Exception) -> bool:
+    import openai
+
+    if isinstance(exc, (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in (408, 409, 429) or exc.status_code >= 500
+    return isinstance(exc, (json.JSONDecodeError, asyncio.TimeoutError))
+
+
+def _retry_after(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class BatchRecommender:
+    def __init__(
+        self,
+        client=None,
+        *,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        model: str = MODEL,
+        temperature: float = TEMPERATURE,
+        max_concurrency: int = 8,
+        requests_per_minute: float = 500,
+        tokens_per_minute: float = 200_000,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        timeout: float = 120.0,
+        compact: bool = COMPACT_PROMPT,
+    ):
+        if client is None:
+            from openai import AsyncOpenAI
+
+            # Retries are handled here so they share the rate limiter.
+            client = AsyncOpenAI(
+                api_key=api_key or os.getenv("OPENAI_API_KEY") or "missing-key",
+                base_url=base_url,
+                max_retries=0,
+                timeout=timeout,
+            )
+        self.client = client
+        self.model = model
+        self.temperature = temperature
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.compact = compact
+        self._limits = None
+
+    async def _call(self, context: str, semaphore, request_bucket, token_bucket) -> dict:
+        attempts = 0
+        started = time.perf_counter()
+        while True:
+            attempts += 1
+            await request_bucket.acquire()
+            await token_bucket.acquire(estimate_tokens(context, compact=self.compact))
+            attempt_started = time.perf_counter()
+            try:
+                async with semaphore:
+                    attempt_started = time.perf_counter()
+                    resp = await self.client.chat.completions.create(
+                        model=self.model,
+                        temperature=self.temperature,
+                        messages=build_messages(context, self.compact),
+                    )
+                record_call(self.model, "batch", time.perf_counter() - attempt_started, getattr(resp, "usage", None))
+                result = json.loads(resp.choices[0].message.content)
+                return {
+                    "result": result,
+                    "error": None,
+                    "attempts": attempts,
+                    "latency_s": round(time.perf_counter() - started, 3),
+                    "usage": resp.usage.model_dump() if getattr(resp, "usage", None) else None,
+                }
+            except Exception as exc:
+                if not isinstance(exc, json.JSONDecodeError):
+                    record_call(self.model, "batch", time.perf_counter() - attempt_started, error=exc)
+                if attempts > self.max_retries or not _is_retryable(exc):
+                    return {
+                        "result": None,
+                        "error": f"{type(exc).__name__}: {exc}",
+                        "attempts": attempts,
+                        "latency_s": round(time.perf_counter() - started, 3),
+                        "usage": None,
+                    }
+                delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+                delay = random.uniform(delay / 2, delay)
+                hint = _retry_after(exc)
+                if hint is not None:
+                    delay = max(delay, hint)
+                record_retry(self.model)
+                await asyncio.sleep(delay)
+
+    def _shared_limits(self):
+        # created on first use, inside the loop that runs every recommend() call
+        if self._limits is None:
+            self._limits = (
+                asyncio.Semaphore(self.max_concurrency),
+                TokenBucket.per_minute(self.requests_per_minute),
+                TokenBucket.per_minute(self.tokens_per_minute),
+            )
+        return self._limits
+
+    async def recommend(self, context: str) -> dict:
+        """One context, within limits shared by all ``recommend`` calls (long-running services).
+
+        Returns the same dict as one entry of :meth:`generate`, without ``key`` / ``deduplicated``.
+        """
+        return await self._call(context, *self._shared_limits())
+
+    async def generate(self, contexts: list[str]) -> list[dict]:
+        """Return one result dict per input context, in input order.
+
+        Each dict has ``result`` (the parsed seven-section JSON or None),
+        ``error``, ``attempts``, ``latency_s``, ``usage`` and ``deduplicated``.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        request_bucket = TokenBucket.per_minute(self.requests_per_minute)
+        token_bucket = TokenBucket.per_minute(self.tokens_per_minute)
+
+        unique = {}
+        for ctx in contexts:
+            unique.setdefault(context_key(ctx), ctx)
+
+        keys = list(unique)
+        outcomes = await asyncio.gather(
+            *(self._call(unique[k], semaphore, request_bucket, token_bucket) for k in keys)
+        )
+        by_key = dict(zip(keys, outcomes))
+
+        results = []
+        seen = set()
+        for ctx in contexts:
+            key = context_key(ctx)
+            results.append({**by_key[key], "key": key, "deduplicated": key in seen})
+            seen.add(key)
+        return results
+
+
+def generate_batch(contexts: list[str], **kwargs) -> list[dict]:
+    """Blocking wrapper around :meth:`BatchRecommender.generate`."""
+    return asyncio.run(BatchRecommender(**kwargs).generate(contexts))
+
+
+def load_contexts(path: str, compact: bool = COMPACT_PROMPT) -> list[str]:
+    """Read a JSON-lines file of ``{"context": ...}`` or ``{"raw_data": ..., "overall_score": ...}``."""
+    contexts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if "context" in item:
+                contexts.append(item["context"])
+            else:
+                contexts.append(
+                    build_ai_context(item.get("raw_data", {}), item.get("overall_score"), compact=compact)
+                )
+    return contexts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate recommendations for many samples concurrently.")
+    parser.add_argument("input", help="JSON-lines file of sample contexts")
+    parser.add_argument("--out", default="-", help="Output JSON-lines file (default: stdout)")
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=float, default=500)
+    parser.add_argument("--tpm", type=float, default=200_000)
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument(
+        "--compact", action=argparse.BooleanOptionalAction, default=COMPACT_PROMPT,
+        help="Use the constraint-focused compact prompt (default: SOIL_HEALTH_COMPACT_PROMPT, on)",
+    )
+    args = parser.parse_args()
+
+    contexts = load_contexts(args.input, compact=args.compact)
+    started = time.perf_counter()
+    results = generate_batch(
+        contexts,
+        base_url=args.base_url,
+        max_concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        max_retries=args.max_retries,
+        compact=args.compact,
+    )
+    elapsed = time.perf_counter() - started
+
+    out = open(args.out, "w", encoding="utf-8") if args.out != "-" else None
+    try:
+        for r in results:
+            line = json.dumps(r, ensure_ascii=False)
+            if out:
+                out.write(line + "\n")
+            else:
+                print(line)
+    finally:
+        if out:
+            out.close()
+
+    failed = sum(1 for r in results if r["error"])
+    unique = len({r["key"] for r in results})
+    print(
+        f"{len(results)} contexts ({unique} unique) in {elapsed:.2f}s, {failed} failed",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Farm-level comparison of many samples: parameters as rows, samples as columns.
+
+The matrix is parsed once (one vectorized pass over every value) and keeps
+raw values, parsed numbers and status codes side by side, so a page can
+render any slice of sample columns without re-parsing. Cells are coloured
+with the shared ``soil_health.tables`` classes.
+"""
+
+from datetime import datetime
+from string import Template
+
+import numpy as np
+import pandas as pd
+
+from soil_health.ai import html_escape
+from soil_health.specs import PARAM_SPECS, format_range
+from soil_health.tables import (
+    HIGH, LOW, NOT_ANALYZED, OK, OK_MAX, OK_MIN, STATUS_TABLE_CSS,
+    missing_mask, parse_numbers, spec_bounds, status_codes, status_matrix_html, status_table_html,
+)
+
+SUMMARY_COLUMNS = [
+    "Parameter", "Unit", "Optimum range", "Samples", "Mean", "Min", "Median", "Max",
+    "Within %", "Below %", "Above %", "Not analyzed",
+]
+
+
+def sample_labels(samples: list[dict]) -> list[str]:
+    """Column label per sample: the report number, made unique."""
+    labels, seen = [], {}
+    for i, sample in enumerate(samples):
+        base = str((sample.get("sample_info") or {}).get("report_no") or f"Sample {i + 1}")
+        seen[base] = seen.get(base, 0) + 1
+        labels.append(base if seen[base] == 1 else f"{base} ({seen[base]})")
+    return labels
+
+
+def parameter_order(samples: list[dict]) -> list[str]:
+    """``PARAM_SPECS`` parameters first (in spec order), then the rest as first seen."""
+    present = {}
+    for sample in samples:
+        for key in sample.get("raw_data") or {}:
+            present.setdefault(key, None)
+    return [k for k in PARAM_SPECS if k in present] + [k for k in present if k not in PARAM_SPECS]
+
+
+def comparison_matrix(samples: list[dict]) -> dict:
+    """Parameters x samples arrays: ``values`` (raw), ``numbers`` (float/NaN) and ``codes``."""
+    parameters = parameter_order(samples)
+    columns = sample_labels(samples)
+    values = np.empty((len(parameters), len(samples)), dtype=object)
+    for j, sample in enumerate(samples):
+        raw = sample.get("raw_data") or {}
+        values[:, j] = [raw.get(p) for p in parameters]
+
+    flat = values.ravel()
+    numbers = parse_numbers(flat).reshape(values.shape)
+    missing = missing_mask(flat).reshape(values.shape)
+    opt_min, opt_max, has_spec = spec_bounds(parameters)
+    codes = status_codes(numbers, missing, opt_min[:, None], opt_max[:, None], has_spec[:, None])
+    return {
+        "parameters": parameters,
+        "columns": columns,
+        "sample_info": [s.get("sample_info") or {} for s in samples],
+        "values": values,
+        "numbers": np.where(missing, np.nan, numbers),
+        "codes": codes,
+    }
+
+
+def summary_stats(matrix: dict) -> tuple[pd.DataFrame, np.ndarray]:
+    """Per-parameter statistics and the status code of each parameter's median."""
+    numbers, codes = matrix["numbers"], matrix["codes"]
+    count = (~np.isnan(numbers)).sum(axis=1)
+    any_numeric = count > 0
+    safe = np.where(any_numeric[:, None], numbers, 0.0)  # keeps nan-reductions quiet on empty rows
+
+    def stat(fn):
+        return np.where(any_numeric, fn(safe, axis=1), np.nan).round(3)
+
+    ranged = np.isin(codes, (OK, OK_MIN, OK_MAX, LOW, HIGH))
+    n_ranged = ranged.sum(axis=1)
+
+    def share(*status):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n_ranged > 0, 100.0 * np.isin(codes, status).sum(axis=1) / n_ranged, np.nan).round(1)
+
+    parameters = matrix["parameters"]
+    specs = [PARAM_SPECS.get(p) for p in parameters]
+    median = stat(np.nanmedian)
+    df = pd.DataFrame(
+        {
+            "Parameter": parameters,
+            "Unit": [s["unit"] if s else "" for s in specs],
+            "Optimum range": [format_range(s["opt_min"], s["opt_max"]) if s else "" for s in specs],
+            "Samples": count,
+            "Mean": stat(np.nanmean),
+            "Min": stat(np.nanmin),
+            "Median": median,
+            "Max": stat(np.nanmax),
+            "Within %": share(OK, OK_MIN, OK_MAX),
+            "Below %": share(LOW),
+            "Above %": share(HIGH),
+            "Not analyzed": (codes == NOT_ANALYZED).sum(axis=1),
+        },
+        columns=SUMMARY_COLUMNS,
+    )
+    opt_min, opt_max, has_spec = spec_bounds(parameters)
+    median_codes = status_codes(median, np.zeros(len(parameters), dtype=bool), opt_min, opt_max, has_spec)
+    return df, median_codes
+
+
+def page_bounds(n_columns: int, page: int, page_size: int) -> tuple[int, int]:
+    """[start, stop) of sample columns on 1-based ``page``."""
+    start = max(0, (page - 1) * page_size)
+    return start, min(n_columns, start + page_size)
+
+
+def matrix_html(matrix: dict, start: int = 0, stop: int | None = None, include_css: bool = True) -> str:
+    """Class-per-cell table for sample columns ``start:stop`` only."""
+    window = slice(start, stop)
+    return status_matrix_html(
+        matrix["parameters"],
+        matrix["columns"][window],
+        matrix["values"][:, window],
+        matrix["codes"][:, window],
+        include_css=include_css,
+        index_header="Parameter",
+    )
+
+
+def matrix_csv(matrix: dict) -> str:
+    return pd.DataFrame(matrix["values"], index=matrix["parameters"], columns=matrix["columns"]).to_csv(
+        index_label="Parameter"
+    )
+
+
+FARM_REPORT_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<title>Silal Farm Soil Comparison</title>
+$css
+<style>
+body { font-family: Arial, sans-serif; margin: 24px; }
+h1, h2 { color: #006400; }
+.wide { overflow-x: auto; }
+.soil-status th:first-child { position: sticky; left: 0; background: #f3f7f3; }
+</style>
+</head>
+<body>
+<h1>Silal Farm Soil Comparison</h1>
+<p>$title &middot; $n_samples samples &middot; generated on $generated</p>
+<h2>Summary by parameter</h2>
+$summary
+<h2>Samples</h2>
+<div class="wide">$matrix</div>
+</body>
+</html>
+""")
+
+
+def render_farm_report(matrix: dict, title: str = "", generated: str | None = None) -> str:
+    """One self-contained HTML file: summary plus the full matrix, one shared stylesheet.
+
+    ``generated`` is the time shown (default now); pass ``report.GENERATED``
+    to memoize the document and ``report.stamp`` it per download.
+    """
+    summary, median_codes = summary_stats(matrix)
+    return FARM_REPORT_TEMPLATE.substitute(
+        css=STATUS_TABLE_CSS,
+        title=html_escape(title),
+        n_samples=len(matrix["columns"]),
+        generated=generated or f"{datetime.now():%Y-%m-%d %H:%M}",
+        summary=status_table_html(summary, median_codes, include_css=False),
+        matrix=matrix_html(matrix, include_css=False),
+    )
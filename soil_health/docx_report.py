@@ -0,0 +1,365 @@
+"""Word (DOCX) soil health report filled from a reusable template.
+
+The template (``templates/report_template.docx``, editable in Word) holds
+all static parts: styles, header logos, headings and table layouts. Data
+comes in through placeholders:
+
+- ``{name}`` in a paragraph or cell is replaced by a scalar (``{score}``,
+  ``{report_no}``, ``{generated}``, ...);
+- a table row whose cells read ``{table.column}`` is a prototype row: it is
+  cloned once per record of ``table`` and removed;
+- a row of ``{bar}`` cells is shaded as the score bar.
+
+Word often splits text into several runs while a template is edited; a
+placeholder split that way is joined into the run it starts in (and takes
+that run's formatting) when the template is parsed.
+
+The template is parsed once per process and its placeholders located once.
+The static body stays in place: each report rewrites the placeholder runs
+from their template text (before any data is inserted, so ``{...}`` in the
+data stays as written), shades the bar cells and inserts clones of the
+prototype rows only, which are removed again once the document is saved.
+Regenerate the default template with
+``python -m soil_health.docx_report --write-template``.
+"""
+
+import argparse
+import copy
+import io
+import os
+import re
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Mm, Pt, RGBColor
+
+from soil_health.ai import components_list
+from soil_health.report import plain_cell
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_PATH = os.environ.get(
+    "SOIL_HEALTH_DOCX_TEMPLATE", os.path.join(ROOT, "templates", "report_template.docx")
+)
+LOGOS = [os.path.join(ROOT, "Silal_logo.jpeg"), os.path.join(ROOT, "IO_logo.png")]
+
+ROW_RE = re.compile(r"^\{(\w+)\.([^}]+)\}$")
+SCALAR_RE = re.compile(r"\{(\w+)\}")
+
+BAR_CELLS = 20
+BAR_COLORS = ["2E7D32", "558B2F", "9E9D24", "F9A825", "EF6C00", "C62828"]
+BAR_EMPTY = "EEEEEE"
+
+TEMPLATE_TABLES = [
+    ("Analysis Results", "score", ["Indicator", "Value", "Unit", "Score (0–5)", "Weight", "Weighted score"]),
+    ("Soil Management Recommendations / التوصيات", "reco", ["Component", "English", "العربية"]),
+    ("Fertilizer Requirements (kg/ha of nutrient)", "fert",
+     ["Element", "Measured (mg/kg)", "Target (mg/kg)", "Deficit (mg/kg)", "Required nutrient (kg/ha)"]),
+    ("Fertilizer Products (kg/ha)", "products",
+     ["Fertilizer product", "Main element", "Required nutrient (kg/ha)", "Required fertilizer (kg/ha)"]),
+]
+
+# template column header -> record key, where they differ
+COLUMN_KEYS = {"reco": {"Component": "component", "English": "en", "العربية": "ar"}}
+
+
+# =====================================================
+#  Default template
+# =====================================================
+
+def set_rtl(paragraph):
+    p_pr = paragraph._p.get_or_add_pPr()
+    p_pr.append(OxmlElement("w:bidi"))
+    paragraph.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    for run in paragraph.runs:
+        r_pr = run._r.get_or_add_rPr()
+        r_pr.append(OxmlElement("w:rtl"))
+
+
+def build_template(target=TEMPLATE_PATH):
+    """Write the default template document to a path or binary stream."""
+    doc = Document()
+    section = doc.sections[0]
+    section.page_width, section.page_height = Mm(210), Mm(297)
+    section.left_margin = section.right_margin = Mm(15)
+    section.top_margin = section.bottom_margin = Mm(15)
+
+    normal = doc.styles["Normal"]
+    normal.font.name = "Arial"
+    normal.font.size = Pt(9)
+
+    header = section.header.paragraphs[0]
+    for logo in LOGOS:
+        if os.path.exists(logo):
+            header.add_run().add_picture(logo, height=Mm(14))
+            header.add_run("\t\t")
+
+    title = doc.add_heading("Silal Soil Health Report", level=0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    sub = doc.add_paragraph("Generated on {generated}")
+    sub.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    doc.add_heading("Sample Information", level=2)
+    info = doc.add_table(rows=2, cols=2)
+    info.style = "Table Grid"
+    info.rows[0].cells[0].text, info.rows[0].cells[1].text = "Field", "Value"
+    info.rows[1].cells[0].text, info.rows[1].cells[1].text = "{info.field}", "{info.value}"
+
+    doc.add_heading("Soil Health Score", level=2)
+    score = doc.add_paragraph()
+    score.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    big = score.add_run("{score}")
+    big.bold, big.font.size, big.font.color.rgb = True, Pt(28), RGBColor(0x00, 0x64, 0x00)
+    score.add_run(" / 100").font.size = Pt(14)
+
+    bar = doc.add_table(rows=1, cols=BAR_CELLS)
+    for cell in bar.rows[0].cells:
+        cell.text = "{bar}"
+    scale = doc.add_paragraph("0 (Poor)\t\t\t\t{score}\t\t\t\t100 (Excellent)")
+    scale.runs[0].font.size = Pt(7)
+
+    for heading, key, columns in TEMPLATE_TABLES:
+        doc.add_heading(heading, level=2)
+        table = doc.add_table(rows=2, cols=len(columns))
+        table.style = "Table Grid"
+        for cell, column in zip(table.rows[0].cells, columns):
+            cell.text = column
+            cell.paragraphs[0].runs[0].bold = True
+        for cell, column in zip(table.rows[1].cells, columns):
+            cell.text = "{%s.%s}" % (key, column)
+        if key == "reco":
+            set_rtl(table.rows[0].cells[2].paragraphs[0])
+            set_rtl(table.rows[1].cells[2].paragraphs[0])
+
+    if isinstance(target, str):
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    doc.save(target)
+    return target
+
+
+# =====================================================
+#  Per-process template state
+# =====================================================
+
+_fill_lock = threading.Lock()
+
+
+def cell_text(cell) -> str:
+    return "".join(t.text or "" for t in cell.iter(qn("w:t")))
+
+
+def set_cell_text(tc, text: str):
+    """Replace a cell's text, keeping the first run's formatting (e.g. RTL).
+
+    Newlines become ``w:br`` line breaks; Word ignores them inside ``w:t``.
+    """
+    paragraphs = tc.findall(qn("w:p"))
+    for extra in paragraphs[1:]:
+        tc.remove(extra)
+    p = paragraphs[0]
+    runs = p.findall(qn("w:r"))
+    for extra in runs[1:]:
+        p.remove(extra)
+    if runs:
+        texts = runs[0].findall(qn("w:t"))
+        for extra in texts[1:]:
+            runs[0].remove(extra)
+        t = texts[0] if texts else OxmlElement("w:t")
+        if not texts:
+            runs[0].append(t)
+    else:
+        r = OxmlElement("w:r")
+        t = OxmlElement("w:t")
+        r.append(t)
+        p.append(r)
+    first, *rest = text.split("\n")
+    t.text = first
+    t.set(qn("xml:space"), "preserve")
+    for line in rest:
+        br = OxmlElement("w:br")
+        t.addnext(br)
+        t = OxmlElement("w:t")
+        t.text = line
+        t.set(qn("xml:space"), "preserve")
+        br.addnext(t)
+
+
+def join_split_placeholders(p):
+    """Move each ``{name}`` spread over several runs of ``p`` into its first run."""
+    texts = list(p.iter(qn("w:t")))
+    spans, offset = [], 0
+    for t in texts:
+        spans.append(offset)
+        offset += len(t.text or "")
+    joined = "".join(t.text or "" for t in texts)
+    # last first: editing a later placeholder leaves the offsets before it valid
+    for m in reversed(list(SCALAR_RE.finditer(joined))):
+        first = max(i for i, begin in enumerate(spans) if begin <= m.start())
+        last = max(i for i, begin in enumerate(spans) if begin < m.end())
+        if first == last:
+            continue
+        head = texts[first]
+        head.text = (head.text or "")[:m.start() - spans[first]] + m.group(0)
+        for t in texts[first + 1:last]:
+            t.text = ""
+        texts[last].text = (texts[last].text or "")[m.end() - spans[last]:]
+        for t in texts[first:last + 1]:
+            t.set(qn("xml:space"), "preserve")
+
+
+def shade(tc, color: str):
+    tc_pr = tc.get_or_add_tcPr()
+    for old in tc_pr.findall(qn("w:shd")):
+        tc_pr.remove(old)
+    shd = OxmlElement("w:shd")
+    shd.set(qn("w:val"), "clear")
+    shd.set(qn("w:color"), "auto")
+    shd.set(qn("w:fill"), color)
+    tc_pr.append(shd)
+
+
+class Template:
+    """The parsed template with its data-bearing parts located once.
+
+    Prototype rows are taken out of the body, placeholder runs and score bar
+    cells are remembered; everything else stays in place and is never
+    copied. Filling must hold ``_fill_lock``.
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+        body = doc.element.body
+        for p in body.iter(qn("w:p")):
+            join_split_placeholders(p)
+        self.bar = []  # score bar cells, emptied
+        for tr in body.iter(qn("w:tr")):
+            cells = tr.findall(qn("w:tc"))
+            if cells and all(cell_text(tc).strip() == "{bar}" for tc in cells):
+                for tc in cells:
+                    set_cell_text(tc, "")
+                self.bar.append(cells)
+        # (w:t, template text) of every run with a {name} placeholder
+        self.scalars = [(t, t.text) for t in body.iter(qn("w:t")) if t.text and SCALAR_RE.search(t.text)]
+        self.rows = []  # (table key, prototype w:tr, column names, element it goes after / parent)
+        for tr in list(body.iter(qn("w:tr"))):
+            cells = tr.findall(qn("w:tc"))
+            keys = [ROW_RE.match(cell_text(tc).strip()) for tc in cells]
+            if not keys or not all(keys):
+                continue
+            parent, previous = tr.getparent(), tr.getprevious()
+            parent.remove(tr)
+            self.rows.append((keys[0].group(1), tr, [k.group(2) for k in keys], previous, parent))
+
+    def fill_scalars(self, values: dict):
+        # from the template text, so data inserted into rows is never substituted
+        for t, text in self.scalars:
+            t.text = SCALAR_RE.sub(lambda m: str(values.get(m.group(1), m.group(0))), text)
+
+    def fill_bar(self, score: float | None):
+        filled = 0 if score is None else round(max(0.0, min(100.0, score)) / 100 * BAR_CELLS)
+        for cells in self.bar:
+            for i, tc in enumerate(cells):
+                color = BAR_COLORS[i * len(BAR_COLORS) // len(cells)] if i < filled else BAR_EMPTY
+                shade(tc, color)
+
+    def fill_rows(self, tables: dict) -> list:
+        """Insert a filled clone of each prototype row per record; returns the clones."""
+        inserted = []
+        for table_key, prototype, columns, previous, parent in self.rows:
+            column_keys = COLUMN_KEYS.get(table_key, {})
+            anchor = previous
+            for rec in tables.get(table_key, []):
+                clone = copy.deepcopy(prototype)
+                for tc, column in zip(clone.findall(qn("w:tc")), columns):
+                    set_cell_text(tc, plain_cell(rec.get(column_keys.get(column, column))))
+                if anchor is None:
+                    parent.insert(0, clone)
+                else:
+                    anchor.addnext(clone)
+                anchor = clone
+                inserted.append(clone)
+        return inserted
+
+
+@lru_cache(maxsize=1)
+def template() -> Template:
+    """The template, parsed once per process."""
+    if os.path.exists(TEMPLATE_PATH):
+        doc = Document(TEMPLATE_PATH)
+    else:
+        buf = io.BytesIO()
+        build_template(buf)
+        buf.seek(0)
+        doc = Document(buf)
+    return Template(doc)
+
+
+def warm_up():
+    """Parse the template (worker initializer for bulk export)."""
+    template()
+
+
+# =====================================================
+#  Filling
+# =====================================================
+
+def report_tables(job: dict) -> dict:
+    recommendations = job.get("recommendations") or {}
+    return {
+        "info": [{"field": k, "value": v} for k, v in (job.get("sample_info") or {}).items()],
+        "score": job.get("score_rows", []),
+        "reco": [
+            {"component": comp, "en": (recommendations.get(comp) or {}).get("en", ""),
+             "ar": (recommendations.get(comp) or {}).get("ar", "")}
+            for comp in components_list
+        ],
+        "fert": job.get("fert_rows", []),
+        "products": job.get("product_rows", []),
+    }
+
+
+def render_docx(job: dict) -> bytes:
+    """DOCX report for a bulk-export job (see ``soil_health.export.build_job``).
+
+    ``job["generated"]`` is the time shown in the report (default now).
+    """
+    tpl = template()
+    score = job.get("overall_score")
+    info = job.get("sample_info") or {}
+    values = {
+        **{k: v for k, v in info.items() if isinstance(k, str)},
+        "score": "N/A" if score is None else f"{score:.1f}",
+        "generated": job.get("generated") or f"{datetime.now():%Y-%m-%d %H:%M}",
+        "crop_group": job.get("crop_group", ""),
+    }
+    tables = report_tables(job)
+    with _fill_lock:
+        tpl.fill_scalars(values)
+        tpl.fill_bar(score)
+        inserted = tpl.fill_rows(tables)
+        try:
+            buf = io.BytesIO()
+            tpl.doc.save(buf)
+        finally:
+            for tr in inserted:
+                tr.getparent().remove(tr)
+    return buf.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soil health DOCX template tools.")
+    parser.add_argument("--write-template", nargs="?", const=TEMPLATE_PATH, metavar="PATH",
+                        help="Write the default template document")
+    args = parser.parse_args()
+    if args.write_template:
+        print(build_template(args.write_template))
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
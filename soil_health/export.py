@@ -0,0 +1,278 @@
+"""Bulk export of per-sample reports into a ZIP archive.
+
+Each sample (``{"sample_info": ..., "raw_data": ...}``, the same payload the
+score card page reads from session state) is rendered in a process pool:
+score card, fertilizer requirements and products, and the recommendations
+(pre-warmed AI entries when available, otherwise the rule engine). Finished
+files are written into the ZIP as they complete, so only a bounded number of
+reports is held in memory, and ``manifest.csv`` records the outcome and
+render time of every sample.
+
+    python -m soil_health.export samples.jsonl --out reports.zip --workers 4
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from soil_health.ai import render_reco_table
+from soil_health.fertilizer import TARGET_LEVELS, fertilizer_products, fertilizer_requirements
+from soil_health.report import render_score_card_report
+from soil_health.rules import constraint_flags, rule_based_recommendations, score_band
+from soil_health.schema import invalid_entries, merge_entries
+from soil_health.scoring import compute_score_card
+
+MANIFEST_FIELDS = [
+    "index", "report_no", "customer", "site", "file", "overall_score", "band",
+    "constraints", "recommendations", "bytes", "render_ms", "status", "error",
+]
+
+# format -> (extension, renderer, per-worker initializer or None), as "module:function"
+FORMATS = {
+    "html": (".html", "soil_health.export:render_html", None),
+    "pdf":  (".pdf", "soil_health.pdf:render_pdf", "soil_health.pdf:warm_up"),
+    "docx": (".docx", "soil_health.docx_report:render_docx", "soil_health.docx_report:warm_up"),
+}
+
+
+def render_html(job: dict) -> bytes:
+    payload = {
+        "overall_score": job["overall_score"],
+        "score_rows": job["score_rows"],
+        "reco_html": render_reco_table(job["recommendations"]),
+        "fert_rows": job["fert_rows"],
+        "product_rows": job["product_rows"],
+    }
+    return render_score_card_report(payload).encode("utf-8")
+
+
+def _resolve(target: str):
+    module_name, _, func = target.partition(":")
+    module = __import__(module_name, fromlist=[func])
+    return getattr(module, func)
+
+
+def _init_worker(target: str):
+    _resolve(target)()
+
+
+def build_job(sample: dict, options: dict) -> dict:
+    """Everything one report needs, computed from the sample payload."""
+    raw_data = sample.get("raw_data", {})
+    rows, overall_score, missing = compute_score_card(raw_data)
+    rows_fert = fertilizer_requirements(
+        raw_data, options["crop_group"], options["depth_m"], options["bulk_density"]
+    )
+    rule_json = rule_based_recommendations(raw_data, overall_score)
+    recommendations = sample.get("recommendations")
+    source = "ai" if recommendations else "rules"
+    if recommendations:
+        recommendations = merge_entries(recommendations, rule_json, invalid_entries(recommendations))
+    else:
+        recommendations = rule_json
+    return {
+        "sample_info": sample.get("sample_info", {}),
+        "raw_data": raw_data,
+        "overall_score": overall_score,
+        "missing_mandatory": missing,
+        "score_rows": rows,
+        "fert_rows": rows_fert,
+        "product_rows": fertilizer_products(rows_fert),
+        "recommendations": recommendations,
+        "recommendations_source": source,
+        "crop_group": options["crop_group"],
+    }
+
+
+def render_sample(index: int, sample: dict, options: dict) -> dict:
+    """Worker entry point: render one sample and time it."""
+    started = time.perf_counter()
+    info = sample.get("sample_info", {})
+    record = {
+        "index": index,
+        "report_no": info.get("report_no", ""),
+        "customer": info.get("customer", ""),
+        "site": info.get("site", ""),
+    }
+    try:
+        job = build_job(sample, options)
+        renderer = _resolve(FORMATS[options["format"]][1])
+        data = renderer(job)
+        record.update(
+            overall_score="" if job["overall_score"] is None else f"{job['overall_score']:.1f}",
+            band=score_band(job["overall_score"]),
+            constraints="+".join(constraint_flags(job["raw_data"])),
+            recommendations=job["recommendations_source"],
+            bytes=len(data),
+            status="ok",
+            error="",
+        )
+    except Exception as e:
+        data = None
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    record["render_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return {"record": record, "data": data}
+
+
+def safe_name(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(text)).strip("_")
+
+
+def export_zip(
+    samples,
+    out,
+    fmt: str = "html",
+    workers: int | None = None,
+    crop_group: str = "Vegetables",
+    depth_m: float = 0.3,
+    bulk_density: float = 1.5,
+    max_in_flight: int | None = None,
+    initializer=None,
+    initargs=(),
+    progress=None,
+) -> dict:
+    """Render ``samples`` in a process pool and stream them into a ZIP.
+
+    ``out`` is a path or a writable binary file object. ``progress(done,
+    total)`` is called after each sample when ``total`` is known. Returns a
+    summary with the manifest rows and timing percentiles.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if crop_group not in TARGET_LEVELS:
+        raise ValueError(f"Unknown crop group: {crop_group}")
+    options = {"format": fmt, "crop_group": crop_group, "depth_m": depth_m, "bulk_density": bulk_density}
+    extension = FORMATS[fmt][0]
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    if initializer is None and FORMATS[fmt][2] is not None:
+        initializer, initargs = _init_worker, (FORMATS[fmt][2],)
+    total = len(samples) if hasattr(samples, "__len__") else None
+
+    manifest, used_names = [], set()
+    started = time.perf_counter()
+
+    def write_result(zf, result):
+        record = result["record"]
+        if result["data"] is not None:
+            base = safe_name(record["report_no"]) or f"sample_{record['index'] + 1:05d}"
+            name, n = base, 1
+            while name in used_names:
+                n += 1
+                name = f"{base}_{n}"
+            used_names.add(name)
+            record["file"] = f"reports/{name}{extension}"
+            zf.writestr(record["file"], result["data"])
+        else:
+            record["file"] = ""
+        manifest.append(record)
+        if progress is not None:
+            progress(len(manifest), total)
+
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+            pending = deque()
+            for index, sample in enumerate(samples):
+                pending.append(pool.submit(render_sample, index, sample, options))
+                if len(pending) >= max_in_flight:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        write_result(zf, future.result())
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    write_result(zf, future.result())
+
+        manifest.sort(key=lambda r: r["index"])
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=MANIFEST_FIELDS)
+        writer.writeheader()
+        writer.writerows(manifest)
+        zf.writestr("manifest.csv", buf.getvalue().encode("utf-8-sig"))
+
+    timings = [r["render_ms"] for r in manifest if r["status"] == "ok"]
+    return {
+        "samples": len(manifest),
+        "ok": len(timings),
+        "failed": len(manifest) - len(timings),
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "render_ms_p50": round(statistics.median(timings), 2) if timings else None,
+        "render_ms_p95": round(statistics.quantiles(timings, n=20)[-1], 2) if len(timings) > 1 else None,
+        "manifest": manifest,
+    }
+
+
+def iter_samples(path: str):
+    """Stream sample payloads from a JSON-lines file."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                yield item if "raw_data" in item else {"sample_info": {}, "raw_data": item}
+
+
+def attach_prewarmed(samples, cache):
+    """Attach pre-warmed AI recommendations (by signature) where the cache has them."""
+    from soil_health.prewarm import prewarm_key
+
+    for sample in samples:
+        if cache is not None and "recommendations" not in sample:
+            raw = sample.get("raw_data", {})
+            _, score, _ = compute_score_card(raw)
+            cached = cache.get(prewarm_key(raw, score))
+            if cached is not None:
+                sample = {**sample, "recommendations": cached}
+        yield sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export per-sample reports into one ZIP.")
+    parser.add_argument("input", help="JSON-lines file of {sample_info, raw_data} payloads")
+    parser.add_argument("--out", default="reports.zip")
+    parser.add_argument("--format", default="html", choices=sorted(FORMATS))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--crop-group", default="Vegetables", choices=list(TARGET_LEVELS))
+    parser.add_argument("--depth", type=float, default=0.3, help="Rooting depth (m)")
+    parser.add_argument("--bulk-density", type=float, default=1.5, help="t/m³")
+    parser.add_argument("--select", default=None, help="Comma-separated report numbers to export")
+    parser.add_argument("--cache-db", default=None, help="Use pre-warmed AI recommendations from this cache")
+    args = parser.parse_args()
+
+    samples = iter_samples(args.input)
+    if args.select:
+        wanted = {s.strip() for s in args.select.split(",")}
+        samples = (s for s in samples if s.get("sample_info", {}).get("report_no") in wanted)
+    if args.cache_db:
+        from soil_health.cache import PersistentCache
+
+        samples = attach_prewarmed(samples, PersistentCache(args.cache_db))
+
+    summary = export_zip(
+        samples,
+        args.out,
+        fmt=args.format,
+        workers=args.workers,
+        crop_group=args.crop_group,
+        depth_m=args.depth,
+        bulk_density=args.bulk_density,
+    )
+    manifest = summary.pop("manifest")
+    for r in manifest:
+        if r["status"] != "ok":
+            print(f"sample {r['index']} ({r['report_no']}): {r['error']}", file=sys.stderr)
+    print(json.dumps({**summary, "out": args.out}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Values and sample details from an Innovation Oasis soil report PDF.
+
+Imported by ``main.py`` only when a PDF is extracted, so ``pypdf`` stays out
+of the page's cold start.
+"""
+
+import re
+
+from pypdf import PdfReader
+
+from soil_health.sample import LABELS, SoilSample
+from soil_health.tracing import span
+
+# sample_info key -> header field of the report
+SAMPLE_INFO_FIELDS = {
+    "customer": "Customer Name",
+    "report_no": "Test Report No.",
+    "description": "Sample Description",
+    "received": "Received On",
+    "analyzed": "Analyzed On",
+    "site": "Site",
+}
+
+
+def extract_from_pdf(pdf_file):
+    with span("pdf.read") as read:
+        reader = PdfReader(pdf_file)
+        text = ""
+        for page in reader.pages:
+            t = page.extract_text()
+            if t:
+                text += t + "\n"
+        read.attrs["pages"] = len(reader.pages)
+
+    with span("pdf.match_lines"):
+        return _match_lines(text)
+
+
+def _match_lines(text: str) -> dict:
+    data = {}
+    lines = [l.strip() for l in text.split("\n") if l.strip()]
+
+    # --- Header info ---
+    if "Dr Ahmed - AK" in text:
+        data["Customer Name"] = "Dr Ahmed - AK"
+    elif "Dr Ahmed (AK)" in text:
+        data["Customer Name"] = "Dr Ahmed (AK)"
+    elif "Dr. Ahmad" in text:
+        data["Customer Name"] = "Dr. Ahmad"
+    elif "Dr Ahmed" in text:
+        data["Customer Name"] = "Dr Ahmed"
+
+    report_match = re.search(r"SP[-\s]*[\d]+[-\s]*25", text, re.IGNORECASE)
+    if report_match:
+        rep = report_match.group(0).replace("SP", "SP").replace("  ", " ").strip()
+        rep = rep.replace("  ", " ")
+        data["Test Report No."] = rep
+
+    desc_match = re.search(r"Sample Description\s*\*\s*([^\n]+)", text)
+    if desc_match:
+        data["Sample Description"] = desc_match.group(1).strip()
+
+    received_match = re.search(r"Received on\s*([0-9/ -]+)", text, re.IGNORECASE)
+    if received_match:
+        data["Received On"] = received_match.group(1).strip()
+
+    analysed_match = re.search(r"Analysed on\s*([0-9/ -]+)", text, re.IGNORECASE)
+    if analysed_match:
+        data["Analyzed On"] = analysed_match.group(1).strip()
+
+    site_match = re.search(r"Site\s*([^\n]+)", text)
+    if site_match:
+        data["Site"] = site_match.group(1).strip()
+
+    # --- Main values & ions ---
+    for line in lines:
+        line_lower = line.lower()
+
+        # pH
+        if "ph" in line_lower and "ece" not in line_lower and "base saturation" not in line_lower:
+            if "pH (paste extract)" not in data:
+                m = re.search(r"([0-9]+\.?[0-9]*)", line)
+                if m:
+                    data["pH (paste extract)"] = m.group(1)
+
+        # ECe (µS/cm → dS/m)
+        if "ece" in line_lower:
+            m = re.search(r"([0-9]+)", line)
+            if m:
+                ec_us = int(m.group(1))
+                data["ECe"] = round(ec_us / 1000, 2)
+
+        # Organic Matter
+        if "organic matter" in line_lower:
+            m = re.search(r"([0-9]+\.?[0-9]*)", line)
+            if m:
+                data["Organic Matter"] = m.group(1)
+
+        # SAR
+        if re.search(r"\bsar\b", line_lower):
+            m = re.search(r"([0-9]+\.?[0-9]*)", line)
+            if m:
+                data["SAR"] = m.group(1)
+
+        # ESP
+        if re.search(r"\besp\b", line_lower):
+            m = re.search(r"([0-9]+\.?[0-9]*)", line)
+            if m:
+                data["ESP"] = m.group(1)
+
+        # CEC
+        if "cation exchange capacity" in line_lower:
+            m = re.search(r"([0-9]+\.?[0-9]*)", line)
+            if m:
+                data["CEC"] = m.group(1)
+
+        # ===== Soluble Ions =====
+        if "soluble" in line_lower and "calcium" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Soluble Calcium (Ca²⁺)"] = m.group(1)
+
+        if "soluble" in line_lower and "magnesium" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Soluble Magnesium (Mg²⁺)"] = m.group(1)
+
+        if "soluble" in line_lower and "sodium" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Soluble Sodium (Na⁺)"] = m.group(1)
+
+        if "soluble" in line_lower and "potassium" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Soluble Potassium (K⁺)"] = m.group(1)
+
+        if "soluble" in line_lower and "chloride" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Soluble Chloride (Cl⁻)"] = m.group(1)
+
+        if "soluble" in line_lower and "bicarbonate" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Soluble Bicarbonate (HCO₃⁻)"] = m.group(1)
+
+        if "soluble" in line_lower and ("sulfate" in line_lower or "sulphate" in line_lower):
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Soluble Sulfate (SO₄²⁻)"] = m.group(1)
+
+        # ===== Exchangeable Cations =====
+        if "exchangeable" in line_lower and "calcium" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Exchangeable Calcium"] = m.group(1)
+
+        if "exchangeable" in line_lower and "magnesium" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Exchangeable Magnesium"] = m.group(1)
+
+        if "exchangeable" in line_lower and "sodium" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Exchangeable Sodium"] = m.group(1)
+
+        if "exchangeable" in line_lower and "potassium" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Exchangeable Potassium"] = m.group(1)
+
+        # ===== Available Nutrients & Micronutrients =====
+        # N
+        if "available" in line_lower and "nitrogen" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Available Nitrogen (N)"] = m.group(1)
+
+        # P  ✅ أكثر مرونة: أي سطر فيه available + phosphorus
+        if "available" in line_lower and "phosph" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Available Phosphorus (P)"] = m.group(1)
+
+        # K  ✅ نفس الفكرة
+        if "available" in line_lower and "potass" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Available Potassium (K)"] = m.group(1)
+
+        # S
+        if "available" in line_lower and ("sulfur" in line_lower or "sulphur" in line_lower):
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Available Sulfur (S)"] = m.group(1)
+
+        # Micronutrients: Fe, Zn, Cu, Mn, B, Mo
+        if "available" in line_lower and "iron" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Iron (Fe)"] = m.group(1)
+
+        if "available" in line_lower and "zinc" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Zinc (Zn)"] = m.group(1)
+
+        if "available" in line_lower and "copper" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Copper (Cu)"] = m.group(1)
+
+        if "available" in line_lower and "manganese" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Manganese (Mn)"] = m.group(1)
+
+        if "available" in line_lower and "boron" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Boron (B)"] = m.group(1)
+
+        if "available" in line_lower and "molybdenum" in line_lower:
+            m = re.search(r"([<]?[0-9]*\.?[0-9]+)", line)
+            if m:
+                data["Molybdenum (Mo)"] = m.group(1)
+
+    return data
+
+
+def sample_from_pdf(pdf_file, sample_info: dict | None = None) -> SoilSample:
+    """The report as a sample; header fields missing from the PDF keep ``sample_info``'s values."""
+    pdf_data = extract_from_pdf(pdf_file)
+    info = dict(sample_info or {})
+    for key, field in SAMPLE_INFO_FIELDS.items():
+        if field in pdf_data:
+            info[key] = pdf_data[field]
+    return SoilSample({k: v for k, v in pdf_data.items() if k in LABELS}, info)
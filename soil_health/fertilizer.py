@@ -0,0 +1,163 @@
+"""Nutrient requirements (kg/ha of element) and fertilizer product rates.
+
+Shared by the score card page and the bulk exporters: deficits against the
+crop-group targets are converted to kg/ha for the rooting depth and bulk
+density, then to product rates by nutrient fraction.
+"""
+
+from soil_health.sample import number_of
+
+TARGET_LEVELS = {
+    "Vegetables": {
+        "N":  25,
+        "P":  20,
+        "K":  150,
+        "Ca": 2000,
+        "Mg": 200,
+        "S":  15,
+        "Fe": 5,
+        "Zn": 1.5,
+        "Cu": 0.6,
+        "Mn": 3,
+        "B":  0.7,
+    },
+    "Field crops": {
+        "N":  20,
+        "P":  15,
+        "K":  120,
+        "Ca": 2000,
+        "Mg": 180,
+        "S":  12,
+        "Fe": 4,
+        "Zn": 1.0,
+        "Cu": 0.4,
+        "Mn": 2.5,
+        "B":  0.6,
+    },
+    "Fruit trees": {
+        "N":  20,
+        "P":  18,
+        "K":  160,
+        "Ca": 2500,
+        "Mg": 220,
+        "S":  15,
+        "Fe": 5,
+        "Zn": 1.5,
+        "Cu": 0.6,
+        "Mn": 3,
+        "B":  0.7,
+    },
+}
+
+EFFICIENCY = {
+    "N":  0.30,
+    "P":  0.25,
+    "K":  0.60,
+    "Ca": 0.50,
+    "Mg": 0.50,
+    "S":  0.50,
+    "Fe": 0.40,
+    "Zn": 0.40,
+    "Cu": 0.40,
+    "Mn": 0.40,
+    "B":  0.40,
+}
+
+ELEMENT_MAP = {
+    "N":  "Available Nitrogen (N)",
+    "P":  "Available Phosphorus (P)",
+    "K":  "Available Potassium (K)",
+    "Ca": "Exchangeable Calcium",
+    "Mg": "Exchangeable Magnesium",
+    "S":  "Available Sulfur (S)",
+    "Fe": "Iron (Fe)",
+    "Zn": "Zinc (Zn)",
+    "Cu": "Copper (Cu)",
+    "Mn": "Manganese (Mn)",
+    "B":  "Boron (B)",
+}
+
+FERTILIZER_PRODUCTS = {
+    "Urea (46% N)":                     ("N", 0.46),
+    "Ammonium nitrate (34% N)":         ("N", 0.34),
+    "DAP 18-46-0 (P as P)":             ("P", 0.20),
+    "MAP 12-61-0 (P as P)":             ("P", 0.27),
+    "MOP 0-0-60 (K as K)":              ("K", 0.50),
+    "SOP 0-0-50 (K as K)":              ("K", 0.42),
+    "Gypsum (23% Ca, 18% S)":           ("Ca", 0.23),
+    "Calcium nitrate (19% Ca)":         ("Ca", 0.19),
+    "Kieserite (16% Mg, 13% S)":        ("Mg", 0.16),
+    "Magnesium sulfate heptahydrate":   ("Mg", 0.10),
+    "Ferrous sulfate (20% Fe)":         ("Fe", 0.20),
+    "Zinc sulfate (35% Zn)":            ("Zn", 0.35),
+    "Copper sulfate (25% Cu)":          ("Cu", 0.25),
+    "Manganese sulfate (30% Mn)":       ("Mn", 0.30),
+    "Borax (11% B)":                    ("B", 0.11),
+}
+
+
+def fertilizer_requirements(
+    raw_data: dict, crop_group: str = "Vegetables", depth_m: float = 0.3, bulk_density: float = 1.5
+) -> list[dict]:
+    """One row per element: measured, target, deficit and required nutrient (kg/ha)."""
+    rows_fert = []
+    targets = TARGET_LEVELS[crop_group]
+    soil_mass_t_ha = 10000 * depth_m * bulk_density
+
+    for elem, target in targets.items():
+        data_key = ELEMENT_MAP.get(elem)
+        if not data_key:
+            continue
+
+        measured = number_of(raw_data, data_key)
+        if measured is None:
+            deficit = None
+            elem_kg_ha = None
+        else:
+            deficit = max(target - measured, 0)
+            if deficit <= 0:
+                elem_kg_ha = 0.0
+            else:
+                E = EFFICIENCY.get(elem, 0.4)
+                elem_kg_ha = (deficit * soil_mass_t_ha) / (1000 * E)
+
+        rows_fert.append(
+            {
+                "Element": elem,
+                "Soil parameter": data_key,
+                "Measured (mg/kg)": measured,
+                "Target (mg/kg)": target,
+                "Deficit (mg/kg)": deficit,
+                "Required nutrient (kg/ha)": None if elem_kg_ha is None else round(elem_kg_ha, 1),
+            }
+        )
+
+    return rows_fert
+
+
+def fertilizer_products(rows_fert: list[dict]) -> list[dict]:
+    """Product rates (kg/ha) for every product whose element has a requirement row."""
+    product_rows = []
+
+    for fert_name, (elem, frac) in FERTILIZER_PRODUCTS.items():
+        row_match = next((r for r in rows_fert if r["Element"] == elem), None)
+        if row_match is None:
+            continue
+
+        nutrient_kg = row_match["Required nutrient (kg/ha)"]
+        if nutrient_kg is None:
+            fert_kg = None
+        else:
+            fert_kg = 0.0 if nutrient_kg == 0 else round(nutrient_kg / frac, 1)
+
+        product_rows.append(
+            {
+                "Fertilizer product": fert_name,
+                "Main element": elem,
+                "Nutrient fraction": frac,
+                "Required nutrient (kg/ha)": nutrient_kg,
+                "Required fertilizer (kg/ha)": fert_kg,
+            }
+        )
+
+    return product_rows
@@ -0,0 +1,499 @@
+"""Persistent background job queue in SQLite (WAL mode), run by worker processes.
+
+Batch PDF extraction, bulk scoring into the archive (from JSON lines or a
+lab's CSV / Excel export) and bulk report export take from seconds to many
+minutes. Pages submit them here and poll the job row about once a second, so
+no script run waits on the work itself.
+
+A job is a row with its kind, JSON parameters, state (``queued`` →
+``running`` → ``done`` / ``failed`` / ``cancelled``), progress and result;
+input and output files live in the job's own directory next to the
+database. Workers are separate processes (``python -m soil_health.jobs``)
+that claim the oldest queued job atomically, report progress through
+:class:`JobContext` and stop at the next progress report when the job is
+cancelled. A job whose worker stops sending heartbeats is queued again (up
+to ``MAX_ATTEMPTS`` runs).
+
+The path defaults to ``SOIL_HEALTH_JOBS_DB`` or ``soil_jobs.sqlite3``; the
+app starts ``SOIL_HEALTH_JOB_WORKERS`` (2) workers of its own.
+
+    python -m soil_health.jobs --workers 2
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from itertools import islice
+
+DEFAULT_JOBS_PATH = os.environ.get("SOIL_HEALTH_JOBS_DB", "soil_jobs.sqlite3")
+# workers the app starts for itself (see ensure_workers)
+DEFAULT_WORKERS = int(os.environ.get("SOIL_HEALTH_JOB_WORKERS", "2"))
+
+STAGING, QUEUED, RUNNING, DONE, FAILED, CANCELLED = "staging", "queued", "running", "done", "failed", "cancelled"
+ACTIVE = (QUEUED, RUNNING)
+FINISHED = (DONE, FAILED, CANCELLED)
+
+HEARTBEAT_INTERVAL = 5.0
+STALE_AFTER = 30.0  # a running job without a heartbeat for this long lost its worker
+MAX_ATTEMPTS = 3
+PROGRESS_INTERVAL = 0.5  # at most two progress writes per second and job
+
+COLUMNS = [
+    "id", "kind", "status", "params", "progress", "message", "result", "error", "cancel_requested",
+    "attempts", "worker", "created", "started", "finished", "heartbeat",
+]
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    "id INTEGER PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, params TEXT, "
+    "progress REAL NOT NULL DEFAULT 0, message TEXT, result TEXT, error TEXT, "
+    "cancel_requested INTEGER NOT NULL DEFAULT 0, attempts INTEGER NOT NULL DEFAULT 0, worker TEXT, "
+    "created REAL NOT NULL, started REAL, finished REAL, heartbeat REAL)",
+    "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id)",
+]
+
+
+class JobCancelled(Exception):
+    """Raised from :meth:`JobContext.progress` once the job has been cancelled."""
+
+
+def _decoded(row: tuple) -> dict:
+    job = dict(zip(COLUMNS, row))
+    for column in ("params", "result"):
+        job[column] = json.loads(job[column]) if job[column] is not None else None
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+
+class JobQueue:
+    """Jobs shared by the app sessions and the worker processes."""
+
+    def __init__(self, path: str = DEFAULT_JOBS_PATH):
+        self.path = path
+        self.files_dir = os.path.splitext(path)[0] + "_files"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            # WAL: polling sessions never block the workers' progress writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                for statement in SCHEMA:
+                    self._conn.execute(statement)
+
+    def job_dir(self, job_id: int) -> str:
+        """Directory of a job's input and output files."""
+        return os.path.join(self.files_dir, str(job_id))
+
+    def submit(self, kind: str, params: dict | None = None, files: dict | None = None) -> int:
+        """Queue a job; ``files`` (name -> bytes) are written to its directory first. Returns the id."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        # not visible to workers until the input files are in place
+        with self._lock, self._conn:
+            job_id = self._conn.execute(
+                "INSERT INTO jobs (kind, status, params, created) VALUES (?, ?, ?, ?) RETURNING id",
+                (kind, STAGING, json.dumps(params or {}, ensure_ascii=False), time.time()),
+            ).fetchone()[0]
+        directory = self.job_dir(job_id)
+        os.makedirs(directory, exist_ok=True)
+        for name, data in (files or {}).items():
+            with open(os.path.join(directory, os.path.basename(name)), "wb") as f:
+                f.write(data)
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET status = ? WHERE id = ?", (QUEUED, job_id))
+        return job_id
+
+    def get(self, job_id: int) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _decoded(row) if row is not None else None
+
+    def jobs(self, limit: int = 50, kind: str | None = None) -> list[dict]:
+        """Most recent jobs first."""
+        sql = f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE status != ?"
+        params = [STAGING]
+        if kind:
+            sql += " AND kind = ?"
+            params.append(kind)
+        sql += f" ORDER BY id DESC LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_decoded(row) for row in rows]
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a queued job now, or ask a running one to stop; False when already finished."""
+        now = time.time()
+        with self._lock, self._conn:
+            queued = self._conn.execute(
+                "UPDATE jobs SET status = ?, cancel_requested = 1, finished = ?, message = 'Cancelled' "
+                "WHERE id = ? AND status IN (?, ?)",
+                (CANCELLED, now, job_id, STAGING, QUEUED),
+            ).rowcount
+            running = self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING)
+            ).rowcount
+        return bool(queued or running)
+
+    def claim(self, worker: str) -> dict | None:
+        """Take the oldest queued job (atomically, across processes) and mark it running."""
+        self.requeue_stale()
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, started = ?, heartbeat = ?, attempts = attempts + 1, "
+                "progress = 0, message = NULL "
+                f"WHERE id = (SELECT id FROM jobs WHERE status = ? ORDER BY id LIMIT 1) RETURNING {', '.join(COLUMNS)}",
+                (RUNNING, worker, now, now, QUEUED),
+            ).fetchone()
+        return _decoded(row) if row is not None else None
+
+    def heartbeat(self, job_id: int) -> bool:
+        """Mark the job alive; returns whether it has been cancelled."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? RETURNING cancel_requested", (time.time(), job_id)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def update(self, job_id: int, progress: float, message: str | None = None) -> bool:
+        """Record progress (0-1); returns whether the job has been cancelled."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "UPDATE jobs SET progress = ?, message = ?, heartbeat = ? WHERE id = ? RETURNING cancel_requested",
+                (max(0.0, min(1.0, progress)), message, time.time(), job_id),
+            ).fetchone()
+        return bool(row and row[0])
+
+    def finish(self, job_id: int, status: str, result: dict | None = None, error: str | None = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ?, "
+                "progress = COALESCE(?, progress) WHERE id = ?",
+                (
+                    status,
+                    json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                    error,
+                    time.time(),
+                    1.0 if status == DONE else None,
+                    job_id,
+                ),
+            )
+
+    def requeue_stale(self, stale_after: float = STALE_AFTER):
+        """Queue running jobs whose worker died again, or fail them after ``MAX_ATTEMPTS`` runs."""
+        cutoff = time.time() - stale_after
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = CASE WHEN attempts >= ? THEN 'Worker stopped responding' ELSE error END, "
+                "finished = CASE WHEN attempts >= ? THEN ? ELSE finished END "
+                "WHERE status = ? AND heartbeat < ?",
+                (MAX_ATTEMPTS, FAILED, QUEUED, MAX_ATTEMPTS, MAX_ATTEMPTS, time.time(), RUNNING, cutoff),
+            )
+
+    def purge(self, older_than: float = 7 * 86400) -> int:
+        """Delete finished jobs (and their files) finished more than ``older_than`` seconds ago."""
+        cutoff = time.time() - older_than
+        with self._lock, self._conn:
+            ids = [
+                row[0]
+                for row in self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished <= ? RETURNING id", (*FINISHED, cutoff)
+                )
+            ]
+        for job_id in ids:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+        return len(ids)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status != ?", (STAGING,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobContext:
+    """What a job function sees: its id, parameters, directory and progress reporting."""
+
+    def __init__(self, queue: JobQueue, job: dict):
+        self.queue = queue
+        self.id = job["id"]
+        self.params = job["params"] or {}
+        self.dir = queue.job_dir(job["id"])
+        self._last_write = 0.0
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+
+    def progress(self, done: int, total: int | None, message: str | None = None):
+        """Report ``done`` of ``total`` items; raises :class:`JobCancelled` once cancelled.
+
+        Writes are throttled to ``PROGRESS_INTERVAL`` (the last item is always written).
+        """
+        now = time.monotonic()
+        if now - self._last_write < PROGRESS_INTERVAL and (total is None or done < total):
+            return
+        self._last_write = now
+        fraction = done / total if total else 0.0
+        if self.queue.update(self.id, fraction, message or (f"{done}/{total}" if total else f"{done}")):
+            raise JobCancelled()
+
+
+# ============ Job kinds ============
+
+def _read_samples(path: str) -> list[dict]:
+    from soil_health.export import iter_samples
+
+    return list(iter_samples(path))
+
+
+def _write_samples(path: str, samples) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for sample in samples:
+            f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def extract_job(job: JobContext) -> dict:
+    """PDF reports (``params["files"]`` in the job directory) → ``samples.jsonl``."""
+    from soil_health.extraction import sample_from_pdf
+
+    files = job.params.get("files", [])
+    samples, failed = [], []
+    for i, name in enumerate(files):
+        try:
+            samples.append(sample_from_pdf(job.path(name)).to_payload())
+        except Exception as e:
+            failed.append({"file": name, "error": f"{type(e).__name__}: {e}"})
+        job.progress(i + 1, len(files), f"Read {i + 1}/{len(files)} reports")
+    _write_samples(job.path("samples.jsonl"), samples)
+    return {"samples": len(samples), "failed": failed, "path": job.path("samples.jsonl")}
+
+
+def _score_samples(job: JobContext, samples, chunk: int, total: int | None = None, fraction=None) -> dict:
+    """Score an iterable of payloads ``chunk`` at a time into ``scores.csv`` (and the archives).
+
+    ``params["archive"]`` is a SQLite archive to save the samples in and
+    ``params["parquet"]`` a Parquet dataset to append them to.
+
+    Only one chunk is in memory at a time. Without ``total`` the progress bar
+    follows ``fraction()``, the share of the input read so far.
+    """
+    from soil_health.rules import constraint_flags, score_band
+    from soil_health.sample import SoilSample
+    from soil_health.scoring import compute_score_card
+
+    archive = None
+    if job.params.get("archive"):
+        from soil_health.archive import SampleArchive
+
+        archive = SampleArchive(job.params["archive"])
+    columnar = None
+    if job.params.get("parquet"):
+        from soil_health.parquet_archive import ParquetArchive, sample_record
+
+        columnar = ParquetArchive(job.params["parquet"])
+    samples = iter(samples)
+    bands, archived, done = {}, 0, 0
+    try:
+        with open(job.path("scores.csv"), "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(["report_no", "customer", "site", "overall_score", "band", "constraints", "missing"])
+            while True:
+                batch = list(islice(samples, chunk))
+                if not batch:
+                    break
+                records = []
+                for payload in batch:
+                    sample = SoilSample.from_payload(payload)
+                    score_rows, overall_score, missing = compute_score_card(sample)
+                    if columnar is not None:
+                        records.append(sample_record(sample, score_rows, overall_score, missing))
+                    band = score_band(overall_score)
+                    bands[band] = bands.get(band, 0) + 1
+                    writer.writerow([
+                        sample.info.get("report_no", ""), sample.info.get("customer", ""), sample.info.get("site", ""),
+                        "" if overall_score is None else f"{overall_score:.1f}", band,
+                        "+".join(constraint_flags(sample)), "; ".join(missing),
+                    ])
+                if archive is not None:
+                    archived += archive.save_many(batch)
+                if columnar is not None:
+                    columnar.append_records(records)
+                done += len(batch)
+                if total is not None:
+                    job.progress(done, total, f"Scored {done}/{total} samples")
+                else:
+                    job.progress(round(fraction() * 1000), 1000, f"Scored {done} samples")
+    finally:
+        if archive is not None:
+            archive.close()
+    return {"samples": done, "archived": archived, "bands": bands, "path": job.path("scores.csv")}
+
+
+def score_job(job: JobContext, chunk: int = 500) -> dict:
+    """Score ``samples.jsonl`` into ``scores.csv``; with ``params["archive"]`` also archive the samples."""
+    from soil_health.export import iter_samples
+
+    path = job.path("samples.jsonl")
+    with open(path, encoding="utf-8") as f:
+        total = sum(1 for line in f if line.strip())
+    return _score_samples(job, iter_samples(path), chunk, total=total)
+
+
+def import_job(job: JobContext, chunk: int = 500) -> dict:
+    """A CSV / Excel export of lab results (``params["file"]``) scored like :func:`score_job`, streamed."""
+    from soil_health.lab_exports import ImportReport, iter_samples
+
+    report = ImportReport()
+    samples = iter_samples(job.path(job.params["file"]), report=report, chunk_rows=chunk, sheet=job.params.get("sheet"))
+    result = _score_samples(job, samples, chunk, fraction=lambda: report.fraction)
+    return {**result, "import": report.to_dict(max_issues=50)}
+
+
+def export_job(job: JobContext) -> dict:
+    """Bulk report export of ``samples.jsonl`` into ``reports.zip`` (see :func:`export_zip`)."""
+    from soil_health.export import attach_prewarmed, export_zip
+
+    params = job.params
+    samples = _read_samples(job.path("samples.jsonl"))
+    if params.get("prewarmed_cache"):
+        from soil_health.cache import PersistentCache
+
+        samples = list(attach_prewarmed(samples, PersistentCache(params["prewarmed_cache"])))
+    try:
+        summary = export_zip(
+            samples,
+            job.path("reports.zip"),
+            fmt=params.get("format", "html"),
+            workers=params.get("workers"),
+            crop_group=params.get("crop_group", "Vegetables"),
+            depth_m=params.get("depth_m", 0.3),
+            bulk_density=params.get("bulk_density", 1.5),
+            progress=lambda done, total: job.progress(done, total, f"Rendered {done}/{total}"),
+        )
+    except JobCancelled:
+        if os.path.exists(job.path("reports.zip")):
+            os.remove(job.path("reports.zip"))
+        raise
+    return {**summary, "path": job.path("reports.zip")}
+
+
+JOB_KINDS = {
+    "extract": extract_job,
+    "score": score_job,
+    "import": import_job,
+    "export": export_job,
+}
+
+
+# ============ Workers ============
+
+def run_job(queue: JobQueue, job: dict):
+    """Run one claimed job to its final state, with a heartbeat while it runs."""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            queue.heartbeat(job["id"])
+
+    heartbeat = threading.Thread(target=beat, daemon=True)
+    heartbeat.start()
+    try:
+        result = JOB_KINDS[job["kind"]](JobContext(queue, job))
+        queue.finish(job["id"], DONE, result=result)
+    except JobCancelled:
+        queue.finish(job["id"], CANCELLED)
+    except Exception as e:
+        queue.finish(job["id"], FAILED, error=f"{type(e).__name__}: {e}")
+    finally:
+        stop.set()
+        heartbeat.join()
+
+
+def run_worker(path: str = DEFAULT_JOBS_PATH, poll_interval: float = 0.5, parent_pid: int | None = None):
+    """Claim and run jobs until interrupted (or until ``parent_pid`` exits)."""
+    queue = JobQueue(path)
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        while parent_pid is None or os.getppid() == parent_pid:
+            job = queue.claim(name)
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+            run_job(queue, job)
+    finally:
+        queue.close()
+
+
+def start_workers(path: str = DEFAULT_JOBS_PATH, workers: int = 1) -> list[subprocess.Popen]:
+    """Worker subprocesses for ``path`` that exit together with this process."""
+    path = os.path.abspath(path)
+    return [
+        subprocess.Popen(
+            [sys.executable, "-m", "soil_health.jobs", "--db", path, "--parent-pid", str(os.getpid())],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        for _ in range(workers)
+    ]
+
+
+_workers = {}
+_workers_lock = threading.Lock()
+
+
+def ensure_workers(path: str = DEFAULT_JOBS_PATH, workers: int = DEFAULT_WORKERS) -> list[subprocess.Popen]:
+    """Workers for ``path`` started by this process, restarting any that exited.
+
+    The Streamlit app calls this on page load, so the queue is served
+    without a separate service; ``python -m soil_health.jobs`` does the same
+    on its own.
+    """
+    path = os.path.abspath(path)
+    with _workers_lock:
+        running = [p for p in _workers.get(path, []) if p.poll() is None]
+        if len(running) < workers:
+            running += start_workers(path, workers - len(running))
+        _workers[path] = running
+        return running
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background job workers.")
+    parser.add_argument("--db", default=DEFAULT_JOBS_PATH)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--parent-pid", type=int, default=None, help="Exit when this process exits")
+    args = parser.parse_args()
+
+    if args.workers == 1:
+        try:
+            run_worker(args.db, args.poll_interval, args.parent_pid)
+        except KeyboardInterrupt:
+            pass
+        return
+    processes = start_workers(args.db, args.workers)
+    print(f"{len(processes)} workers serving {args.db}", flush=True)
+    try:
+        for p in processes:
+            p.wait()
+    except KeyboardInterrupt:
+        for p in processes:
+            p.wait()
+
+
+if __name__ == "__main__":
+    main()
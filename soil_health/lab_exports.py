@@ -0,0 +1,454 @@
+"""Samples from CSV / Excel exports of lab results.
+
+Labs name their columns in their own way ("pH", "EC (uS/cm)", "Avail. P
+mg/kg", "Exch Ca (meq/100g)", "Client"...). ``map_columns`` resolves each
+header through ``COLUMN_ALIASES`` to a ``PARAMS`` label or a sample info
+field, and takes the unit written in the header to convert the values to
+the app's units (``UNIT_FACTORS``). Columns it cannot resolve, or whose
+unit it cannot convert, are left out and listed in the ``ImportReport``.
+
+Files are read in chunks of ``chunk_rows`` rows (pandas ``read_csv`` with
+``chunksize`` for CSV, openpyxl read-only mode for ``.xlsx``) and
+``iter_samples`` yields one sample payload per row, so memory stays bounded
+by the chunk whatever the file size. Values are validated as they pass:
+text where a number is expected, negative numbers and out-of-range values
+(pH above 14, percentages above 100) are dropped with an issue recorded for
+the row.
+
+    python -m soil_health.lab_exports results.xlsx --archive soil_archive.sqlite3
+    python -m soil_health.lab_exports results.csv --jsonl samples.jsonl
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+import unicodedata
+from itertools import islice
+
+from soil_health.sample import NOT_ANALYZED_MARKERS, NUMBER, PARAMS, TEXT, parse_value
+
+LABEL_BY_KEY = {p["key"]: p["label"] for p in PARAMS}
+UNIT_BY_KEY = {p["key"]: p["unit"] for p in PARAMS}
+
+SAMPLE_INFO_ALIASES = {
+    "customer": ["customer", "customer name", "client", "client name", "farm", "grower"],
+    "report_no": ["report no", "test report no", "report number", "report", "lab no", "lab number", "lab id"],
+    "sample_ref": ["sample ref", "customer sample reference", "sample reference", "sample id", "sample no", "sample"],
+    "description": ["description", "sample description"],
+    "po_number": ["po", "po no", "po number", "purchase order", "purchase order number"],
+    "received": ["received", "received on", "date received", "receipt date"],
+    "analyzed": ["analyzed", "analysed", "analyzed on", "analysed on", "date analyzed", "date analysed"],
+    "site": ["site", "location", "field"],
+}
+
+# PARAMS key -> header names besides its label and key (compared after normalise_name)
+PARAM_ALIASES = {
+    "ph": ["ph paste", "ph se", "ph saturated paste", "ph paste extract", "soil ph", "ph h2o", "ph 1 1", "ph 1 2 5"],
+    "ece": ["ec", "ec e", "ec se", "ec paste", "electrical conductivity", "salinity"],
+    "om": ["som", "organic matter", "soil organic matter"],
+    "sar": ["sodium adsorption ratio"],
+    "esp": ["exchangeable sodium percentage", "exchangeable sodium percent"],
+    "cec": ["cation exchange capacity"],
+    "caco3": ["calcium carbonate", "lime", "carbonates"],
+    "sat_pct": ["sp", "saturation", "saturation percentage", "saturation percent"],
+    "texture": ["texture", "soil texture", "texture class"],
+    "avail_n": ["n", "available n", "available nitrogen", "no3 n", "nitrate n", "mineral n"],
+    "avail_p": ["p", "available p", "available phosphorus", "olsen p", "avail p"],
+    "avail_k": ["available k", "available potassium", "avail k"],
+    "avail_s": ["s", "available s", "available sulfur", "available sulphur", "so4 s"],
+    "fe": ["fe", "iron", "available fe", "available iron", "dtpa fe"],
+    "zn": ["zn", "zinc", "available zn", "available zinc", "dtpa zn"],
+    "cu": ["cu", "copper", "available cu", "available copper", "dtpa cu"],
+    "mn": ["mn", "manganese", "available mn", "available manganese", "dtpa mn"],
+    "b": ["b", "boron", "available b", "available boron", "hot water b"],
+    "mo": ["mo", "molybdenum", "available mo", "available molybdenum"],
+    "bd": ["bulk density", "bd"],
+    "whc": ["water holding capacity", "whc"],
+    "infil": ["infiltration", "infiltration rate"],
+    "mic_c": ["microbial biomass carbon", "mbc", "microbial biomass c"],
+    "resp": ["soil respiration", "respiration", "co2 respiration"],
+    "worms": ["earthworms", "earthworm count", "earthworm"],
+}
+
+# soluble and exchangeable ions: symbol -> (name, PARAMS key) for each header spelling
+SOLUBLE_IONS = {
+    "ca": ("calcium", "sol_ca"), "mg": ("magnesium", "sol_mg"), "na": ("sodium", "sol_na"),
+    "k": ("potassium", "sol_k"), "cl": ("chloride", "sol_cl"), "hco3": ("bicarbonate", "sol_hco3"),
+    "so4": ("sulfate", "sol_so4"),
+}
+EXCHANGEABLE_IONS = {
+    "ca": ("calcium", "exch_ca"), "mg": ("magnesium", "exch_mg"), "na": ("sodium", "exch_na"),
+    "k": ("potassium", "exch_k"),
+}
+# unambiguous on their own: the saturated paste extract anions
+SOLUBLE_ONLY = {
+    "cl": "sol_cl", "chloride": "sol_cl", "hco3": "sol_hco3", "bicarbonate": "sol_hco3",
+    "so4": "sol_so4", "sulfate": "sol_so4", "sulphate": "sol_so4",
+}
+
+# organic carbon is reported instead of organic matter by some labs (Van Bemmelen factor)
+ORGANIC_CARBON = ["oc", "organic carbon", "soil organic carbon", "soc"]
+OM_PER_OC = 1.724
+
+# mg per meq (equivalent weight) of the ions converted from meq/L or meq/100g
+EQUIVALENT_MG = {"ca": 20.04, "mg": 12.15, "na": 22.99, "k": 39.10, "cl": 35.45, "hco3": 61.02, "so4": 48.03}
+
+# app unit -> {header unit: factor to the app unit}
+UNIT_FACTORS = {
+    "dS/m": {"ds/m": 1.0, "ms/cm": 1.0, "mmhos/cm": 1.0, "us/cm": 0.001, "umhos/cm": 0.001, "ms/m": 0.01},
+    "%": {"%": 1.0, "g/kg": 0.1, "g/100g": 1.0},
+    "cmolc/kg": {"cmolc/kg": 1.0, "cmol/kg": 1.0, "cmol+/kg": 1.0, "meq/100g": 1.0},
+    "mg/kg": {"mg/kg": 1.0, "ppm": 1.0, "ug/g": 1.0},
+    "ppm": {"ppm": 1.0, "mg/kg": 1.0, "mg/l": 1.0},
+    "g/cm³": {"g/cm3": 1.0, "g/cc": 1.0, "t/m3": 1.0, "kg/m3": 0.001},
+    "mm/h": {"mm/h": 1.0, "mm/hr": 1.0, "cm/h": 10.0, "cm/hr": 10.0},
+    "-": {"-": 1.0},
+}
+KNOWN_UNITS = (
+    {unit for factors in UNIT_FACTORS.values() for unit in factors}
+    | {"meq/l", "mmolc/l", "cmolc/kg", "meq/100g", "per m2", "mg co2/kg/day"}
+)
+
+# plausible range (after conversion) per key; anything negative is rejected for every parameter
+VALID_RANGES = {"ph": (0.0, 14.0), "om": (0.0, 100.0), "esp": (0.0, 100.0), "caco3": (0.0, 100.0),
+                "sat_pct": (0.0, 100.0), "whc": (0.0, 100.0), "bd": (0.5, 2.7)}
+
+MAX_ISSUES = 200  # issues kept in a report; all are counted
+
+
+def normalise_name(text) -> str:
+    """Lower-case ASCII words: "Soluble Calcium (Ca²⁺)" -> "soluble calcium ca2"."""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+
+def normalise_unit(text) -> str:
+    """"µS cm-1" -> "us/cm", "mg CO₂/kg/day" -> "mg co2/kg/day"."""
+    text = unicodedata.normalize("NFKD", str(text).replace("µ", "u").replace("μ", "u")).encode("ascii", "ignore")
+    text = text.decode().lower().strip()
+    text = re.sub(r"(\w+)\s*(\w+)\s*-1\b", r"\1/\2", text)  # mg kg-1 -> mg/kg
+    text = re.sub(r"\s*/\s*", "/", text)
+    return " ".join(text.split())
+
+
+def split_header(header) -> tuple[str, str]:
+    """(normalised name, normalised unit) of a column header; the unit may be ""."""
+    text = str(header).strip()
+    match = re.search(r"[\(\[]([^\(\)\[\]]*)[\)\]]\s*$", text)
+    if match and normalise_unit(match.group(1)) in KNOWN_UNITS:
+        return normalise_name(text[:match.start()]), normalise_unit(match.group(1))
+    head, _, last = text.rpartition(" ")
+    if head and normalise_unit(last) in KNOWN_UNITS:
+        return normalise_name(head), normalise_unit(last)
+    return normalise_name(text), ""
+
+
+def _column_aliases() -> dict:
+    aliases = {}
+    for field, names in SAMPLE_INFO_ALIASES.items():
+        for name in names:
+            aliases[normalise_name(name)] = ("info", field)
+    for p in PARAMS:
+        for name in [p["label"], p["key"], *PARAM_ALIASES.get(p["key"], [])]:
+            aliases[normalise_name(name)] = ("param", p["key"])
+    for symbol, (name, key) in SOLUBLE_IONS.items():
+        for spelling in (symbol, name):
+            for pattern in ("soluble {}", "{} soluble", "sol {}", "{} sol", "water soluble {}"):
+                aliases[normalise_name(pattern.format(spelling))] = ("param", key)
+    for name, key in SOLUBLE_ONLY.items():
+        aliases[name] = ("param", key)
+    for symbol, (name, key) in EXCHANGEABLE_IONS.items():
+        for spelling in (symbol, name):
+            for pattern in ("exchangeable {}", "{} exchangeable", "exch {}", "{} exch", "exc {}"):
+                aliases[normalise_name(pattern.format(spelling))] = ("param", key)
+    for name in ORGANIC_CARBON:
+        aliases[name] = ("param", "om")
+    return aliases
+
+
+# normalised header name -> ("param", PARAMS key) or ("info", sample info field)
+COLUMN_ALIASES = _column_aliases()
+
+
+def unit_factor(key: str, name: str, unit: str) -> float | None:
+    """Factor from the header's unit to the app unit of ``key``; None when it cannot be converted."""
+    factor = OM_PER_OC if key == "om" and name in ORGANIC_CARBON else 1.0
+    if not unit or key == "texture":
+        return factor
+    target = UNIT_BY_KEY[key]
+    ion = key.split("_", 1)[1] if key.startswith(("sol_", "exch_")) else None
+    if ion and unit in ("meq/l", "mmolc/l") and key.startswith("sol_"):
+        return EQUIVALENT_MG[ion]
+    if ion and unit in ("meq/100g", "cmolc/kg", "cmol/kg", "cmol+/kg") and key.startswith("exch_"):
+        return EQUIVALENT_MG[ion] * 10
+    if normalise_unit(target) == unit:
+        return factor
+    converted = UNIT_FACTORS.get(target, {}).get(unit)
+    return None if converted is None else factor * converted
+
+
+def map_columns(headers) -> tuple[dict, dict]:
+    """(column index -> (kind, target, factor), header -> reason it is left out)."""
+    mapping, skipped, seen = {}, {}, {}
+    for i, header in enumerate(headers):
+        if header is None or str(header).strip() == "":
+            continue
+        name, unit = split_header(header)
+        target = COLUMN_ALIASES.get(name)
+        if target is None:
+            skipped[str(header)] = "unknown column"
+            continue
+        kind, field = target
+        factor = 1.0
+        if kind == "param":
+            factor = unit_factor(field, name, unit)
+            if factor is None:
+                skipped[str(header)] = f"cannot convert {unit} to {UNIT_BY_KEY[field]}"
+                continue
+        if (kind, field) in seen:
+            skipped[str(header)] = f"same column as {seen[(kind, field)]!r}"
+            continue
+        seen[(kind, field)] = str(header)
+        mapping[i] = (kind, field, factor)
+    return mapping, skipped
+
+
+def _format(number: float) -> str:
+    return f"{number:.6g}"
+
+
+def _info_text(value) -> str:
+    """Sample info cell as text: dates as ISO, whole numbers without ".0"."""
+    if hasattr(value, "date") and callable(value.date):
+        return value.date().isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def convert_value(key: str, value, factor: float) -> tuple[str | None, str | None]:
+    """(value text in the app's unit or None, issue or None) for one cell."""
+    if value is None:
+        return None, None
+    if isinstance(value, float) and value != value:  # NaN from pandas
+        return None, None
+    text = str(value).strip()
+    if text == "":
+        return None, None
+    if key == "texture":
+        return text[:1].upper() + text[1:].lower(), None
+    if text.lower() in NOT_ANALYZED_MARKERS:
+        return "Not analyzed", None
+    number, flag = parse_value(text)
+    if flag == TEXT:
+        return None, f"{text!r} is not a number"
+    if number is None:  # "<LOQ" without a limit
+        return text, None
+    if number < 0:
+        return None, f"negative value {text}"
+    if factor != 1.0:
+        number *= factor
+        text = ("" if flag == NUMBER else text.lstrip()[0]) + _format(number)
+    low, high = VALID_RANGES.get(key, (0.0, float("inf")))
+    if flag == NUMBER and not low <= number <= high:
+        return None, f"{_format(number)} outside {low:g}–{high:g}"
+    return text, None
+
+
+class ImportReport:
+    """What an import read, mapped and dropped; ``fraction`` is the share of the file read so far."""
+
+    def __init__(self):
+        self.rows = 0
+        self.samples = 0
+        self.skipped_rows = 0
+        self.columns = {}  # header -> PARAMS label or sample info field
+        self.skipped_columns = {}
+        self.issues = []  # (row, column, message), the first MAX_ISSUES
+        self.issue_count = 0
+        self.fraction = 0.0
+
+    def issue(self, row: int, column: str, message: str):
+        self.issue_count += 1
+        if len(self.issues) < MAX_ISSUES:
+            self.issues.append((row, column, message))
+
+    def to_dict(self, max_issues: int = MAX_ISSUES) -> dict:
+        return {
+            "rows": self.rows,
+            "samples": self.samples,
+            "skipped_rows": self.skipped_rows,
+            "columns": self.columns,
+            "skipped_columns": self.skipped_columns,
+            "issues": [{"row": r, "column": c, "message": m} for r, c, m in self.issues[:max_issues]],
+            "issue_count": self.issue_count,
+        }
+
+
+def _detect_format(source, filename: str | None) -> str:
+    name = (filename or getattr(source, "name", None) or (source if isinstance(source, str) else "")).lower()
+    if name.endswith((".xlsx", ".xlsm")):
+        return "xlsx"
+    if name.endswith((".csv", ".txt", ".tsv")):
+        return "csv"
+    raise ValueError(f"unsupported file type {name!r}: expected .csv or .xlsx")
+
+
+def _open_binary(source):
+    """(binary file object, whether we opened it) for a path, bytes or an upload."""
+    if isinstance(source, str):
+        return open(source, "rb"), True
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source), True
+    source.seek(0)
+    return source, False
+
+
+def _size(f) -> int:
+    position = f.tell()
+    f.seek(0, io.SEEK_END)
+    size = f.tell()
+    f.seek(position)
+    return size
+
+
+def _csv_chunks(f, chunk_rows: int, report: ImportReport):
+    import pandas as pd
+
+    size = _size(f) or 1
+    head = f.read(8192).decode("utf-8-sig", errors="replace")
+    f.seek(0)
+    try:
+        delimiter = csv.Sniffer().sniff(head.split("\n", 1)[0], delimiters=",;\t|").delimiter
+    except csv.Error:
+        delimiter = ","
+    reader = pd.read_csv(
+        f, sep=delimiter, dtype=str, keep_default_na=False, chunksize=chunk_rows,
+        encoding="utf-8-sig", skipinitialspace=True,
+    )
+    with reader:
+        for chunk in reader:
+            report.fraction = min(f.tell() / size, 1.0)
+            yield list(chunk.columns), chunk.itertuples(index=False, name=None)
+
+
+def _xlsx_chunks(f, chunk_rows: int, report: ImportReport, sheet: str | None):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(f, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.active
+        total = worksheet.max_row or 0
+        rows = worksheet.iter_rows(values_only=True)
+        headers = next((r for r in rows if any(c not in (None, "") for c in r)), None)
+        if headers is None:
+            return
+        done = 1
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                break
+            done += len(chunk)
+            report.fraction = min(done / total, 1.0) if total else 0.0
+            yield list(headers), chunk
+    finally:
+        workbook.close()
+
+
+def iter_samples(
+    source,
+    filename: str | None = None,
+    chunk_rows: int = 1000,
+    report: ImportReport | None = None,
+    sheet: str | None = None,
+):
+    """Stream ``{"sample_info", "raw_data"}`` payloads from a CSV / .xlsx file, path, bytes or upload."""
+    report = report if report is not None else ImportReport()
+    fmt = _detect_format(source, filename)
+    f, owned = _open_binary(source)
+    try:
+        chunks = _csv_chunks(f, chunk_rows, report) if fmt == "csv" else _xlsx_chunks(f, chunk_rows, report, sheet)
+        mapping = None
+        for headers, rows in chunks:
+            if mapping is None:
+                mapping, report.skipped_columns = map_columns(headers)
+                report.columns = {
+                    str(headers[i]): LABEL_BY_KEY[field] if kind == "param" else field
+                    for i, (kind, field, _) in mapping.items()
+                }
+                if not any(kind == "param" for kind, _, _ in mapping.values()):
+                    raise ValueError("no column matches a soil parameter; check the header row")
+            for row in rows:
+                report.rows += 1
+                row_no = report.rows + 1  # header is row 1
+                info, raw = {}, {}
+                for i, (kind, field, factor) in mapping.items():
+                    value = row[i] if i < len(row) else None
+                    if kind == "info":
+                        if value not in (None, ""):
+                            info[field] = _info_text(value)
+                        continue
+                    text, problem = convert_value(field, value, factor)
+                    if problem:
+                        report.issue(row_no, str(headers[i]), problem)
+                    if text is not None:
+                        raw[LABEL_BY_KEY[field]] = text
+                if not any(v != "Not analyzed" for v in raw.values()):
+                    report.skipped_rows += 1
+                    if any(v not in (None, "") for v in row):
+                        report.issue(row_no, "", "no parameter values")
+                    continue
+                report.samples += 1
+                yield {"sample_info": info, "raw_data": raw}
+        report.fraction = 1.0
+    finally:
+        if owned:
+            f.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a CSV / Excel export of lab results.")
+    parser.add_argument("input", help=".csv or .xlsx file, one sample per row")
+    parser.add_argument("--archive", default=None, help="Score and save the samples in this archive")
+    parser.add_argument("--jsonl", default=None, help="Write the samples as JSON lines (for export / jobs)")
+    parser.add_argument("--sheet", default=None, help="Worksheet name (.xlsx; default: the active sheet)")
+    parser.add_argument("--chunk-rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    report = ImportReport()
+    samples = iter_samples(args.input, report=report, chunk_rows=args.chunk_rows, sheet=args.sheet)
+    archive = out = None
+    if args.archive:
+        from soil_health.archive import SampleArchive
+
+        archive = SampleArchive(args.archive)
+    if args.jsonl:
+        out = open(args.jsonl, "w", encoding="utf-8")
+    try:
+        while True:
+            batch = list(islice(samples, 500))
+            if not batch:
+                break
+            if archive is not None:
+                archive.save_many(batch)
+            if out is not None:
+                out.writelines(json.dumps(s, ensure_ascii=False) + "\n" for s in batch)
+    finally:
+        if archive is not None:
+            archive.close()
+        if out is not None:
+            out.close()
+
+    for row, column, message in report.issues:
+        print(f"row {row} {column}: {message}", file=sys.stderr)
+    summary = report.to_dict(max_issues=0)
+    summary.pop("issues")
+    print(json.dumps({**summary, "input": os.path.basename(args.input)}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""In-process metrics registry with Prometheus text and JSON export.
+
+The registry lives at module level, so it is shared by every Streamlit
+session in the server process. Readers go through ``snapshot()``, which
+copies a metric's values under its lock, so an export never races a
+concurrent ``inc`` / ``observe``. LLM calls are recorded through
+``instrument_client`` (sync client wrapper) or ``record_call`` directly.
+"""
+
+import bisect
+import json
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+# Estimated USD per 1M tokens: (input, output). Update when pricing changes.
+MODEL_PRICING = {
+    "gpt-4.1":      (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4o":       (2.50, 10.00),
+    "gpt-4o-mini":  (0.15, 0.60),
+}
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: dict | None = None) -> str:
+    items = list(key) + sorted((extra or {}).items())
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in items)
+    return "{" + body + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        with self.lock:
+            return self.values.get(_label_key(labels), 0.0)
+
+    def snapshot(self) -> list[tuple]:
+        """``(label key, value)`` pairs, sorted, copied under the lock."""
+        with self.lock:
+            return sorted(self.values.items())
+
+    def prometheus_lines(self) -> list[str]:
+        return [f"{self.name}{_format_labels(k)} {v:g}" for k, v in self.snapshot()]
+
+    def to_dict(self) -> list[dict]:
+        return [{"labels": dict(k), "value": v} for k, v in self.snapshot()]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}  # key -> [bucket counts..., +Inf count], sum, count
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            state["counts"][bisect.bisect_left(self.buckets, value)] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def snapshot(self) -> list[tuple]:
+        """``(label key, {"counts", "sum", "count"})`` pairs, sorted, copied under the lock."""
+        with self.lock:
+            return sorted((k, {**s, "counts": list(s["counts"])}) for k, s in self.values.items())
+
+    def quantile(self, q: float, **labels) -> float | None:
+        """Approximate quantile (upper bound of the bucket that holds it)."""
+        with self.lock:
+            state = self.values.get(_label_key(labels))
+            if not state or not state["count"]:
+                return None
+            counts, count = list(state["counts"]), state["count"]
+        target = q * count
+        running = 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            running += n
+            if running >= target:
+                return bound
+        return float("inf")
+
+    def prometheus_lines(self) -> list[str]:
+        lines = []
+        for key, state in self.snapshot():
+            running = 0
+            for bound, n in zip(self.buckets, state["counts"]):
+                running += n
+                lines.append(f"{self.name}_bucket{_format_labels(key, {'le': f'{bound:g}'})} {running}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, {'le': '+Inf'})} {state['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {state['sum']:g}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {state['count']}")
+        return lines
+
+    def to_dict(self) -> list[dict]:
+        return [
+            {
+                "labels": dict(k),
+                "buckets": dict(zip([f"{b:g}" for b in self.buckets] + ["+Inf"], s["counts"])),
+                "sum": s["sum"],
+                "count": s["count"],
+            }
+            for k, s in self.snapshot()
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help, **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help, **kwargs)
+            return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get_or_create(Counter, name, help)
+
+    def histogram(self, name: str, help: str = "", buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, buckets=buckets)
+
+    def all(self) -> list:
+        with self.lock:
+            return list(self.metrics.values())
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for metric in self.all():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.prometheus_lines())
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        return {
+            m.name: {"type": m.kind, "help": m.help, "samples": m.to_dict()}
+            for m in self.all()
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def reset(self):
+        for metric in self.all():
+            with metric.lock:
+                metric.values.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+LLM_REQUESTS = REGISTRY.counter("llm_requests_total", "Chat completion calls by model, operation and status")
+LLM_LATENCY = REGISTRY.histogram("llm_request_latency_seconds", "Chat completion wall time")
+LLM_TTFT = REGISTRY.histogram("llm_time_to_first_token_seconds", "Streaming time to first content chunk")
+LLM_PROMPT_TOKENS = REGISTRY.counter("llm_prompt_tokens_total", "Prompt tokens reported in resp.usage")
+LLM_COMPLETION_TOKENS = REGISTRY.counter("llm_completion_tokens_total", "Completion tokens reported in resp.usage")
+LLM_COST = REGISTRY.counter("llm_cost_usd_total", "Estimated spend from MODEL_PRICING")
+LLM_RETRIES = REGISTRY.counter("llm_retries_total", "Retried chat completion attempts")
+LLM_CACHE = REGISTRY.counter("llm_cache_requests_total", "Recommendation cache lookups by result (hit/miss)")
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    price = MODEL_PRICING.get(model)
+    if price is None:
+        # dated snapshots such as "gpt-4.1-mini-2025-04-14": longest matching prefix
+        names = [name for name in MODEL_PRICING if model.startswith(name + "-")]
+        price = MODEL_PRICING[max(names, key=len)] if names else (0.0, 0.0)
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+
+def _usage_tokens(usage) -> tuple[int, int]:
+    if usage is None:
+        return 0, 0
+    if isinstance(usage, dict):
+        return usage.get("prompt_tokens") or 0, usage.get("completion_tokens") or 0
+    return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0
+
+
+def record_call(
+    model: str, operation: str, latency_s: float, usage=None, error: Exception | None = None, status: str | None = None
+):
+    """One chat completion: status ``ok``, ``error`` or (a stream closed early) ``cancelled``."""
+    status = status or ("error" if error is not None else "ok")
+    LLM_REQUESTS.inc(model=model, operation=operation, status=status)
+    LLM_LATENCY.observe(latency_s, model=model, operation=operation)
+    prompt_tokens, completion_tokens = _usage_tokens(usage)
+    if prompt_tokens or completion_tokens:
+        LLM_PROMPT_TOKENS.inc(prompt_tokens, model=model)
+        LLM_COMPLETION_TOKENS.inc(completion_tokens, model=model)
+        LLM_COST.inc(estimate_cost(model, prompt_tokens, completion_tokens), model=model)
+
+
+def record_retry(model: str):
+    LLM_RETRIES.inc(model=model)
+
+
+def record_cache(model: str, hit: bool):
+    LLM_CACHE.inc(model=model, result="hit" if hit else "miss")
+
+
+# =====================================================
+#  Client wrapper
+# =====================================================
+
+class _InstrumentedStream:
+    """A streamed completion, recorded once: when it ends, fails, or the consumer stops early."""
+
+    def __init__(self, stream, model, operation, started):
+        self._stream = stream
+        self._model = model
+        self._operation = operation
+        self._started = started
+        self._first = None
+        self._usage = None
+        self._recorded = False
+
+    def _record(self, error: Exception | None = None, status: str | None = None):
+        if self._recorded:
+            return
+        self._recorded = True
+        record_call(self._model, self._operation, time.perf_counter() - self._started, self._usage, error, status)
+
+    def __iter__(self):
+        try:
+            for chunk in self._stream:
+                if self._first is None and chunk.choices and chunk.choices[0].delta.content:
+                    self._first = time.perf_counter()
+                    LLM_TTFT.observe(self._first - self._started, model=self._model)
+                if getattr(chunk, "usage", None) is not None:
+                    self._usage = chunk.usage
+                yield chunk
+        except GeneratorExit:
+            # the consumer broke out of the loop (or a rerun stopped the script)
+            self._record(status="cancelled")
+            raise
+        except Exception as e:
+            self._record(e)
+            raise
+        self._record()
+
+    def close(self):
+        """Stop reading: closes the underlying stream and records the call."""
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            close()
+        self._record(status="cancelled")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        # never iterated or closed
+        try:
+            self._record(status="cancelled")
+        except Exception:
+            pass
+
+
+class _InstrumentedCompletions:
+    def __init__(self, completions, operation):
+        self._completions = completions
+        self._operation = operation
+
+    def create(self, **kwargs):
+        model = kwargs.get("model", "unknown")
+        operation = self._operation
+        stream = kwargs.get("stream", False)
+        if stream:
+            kwargs.setdefault("stream_options", {"include_usage": True})
+        started = time.perf_counter()
+        try:
+            resp = self._completions.create(**kwargs)
+        except Exception as e:
+            record_call(model, operation, time.perf_counter() - started, error=e)
+            raise
+        if stream:
+            return _InstrumentedStream(resp, model, operation, started)
+        record_call(model, operation, time.perf_counter() - started, getattr(resp, "usage", None))
+        return resp
+
+
+class _Namespace:
+    pass
+
+
+def instrument_client(client, operation: str = "full"):
+    """Wrap a sync OpenAI client so every ``chat.completions.create`` is recorded
+    under the given ``operation`` label (e.g. ``"full"``, ``"repair"``)."""
+    if client is None:
+        return None
+    wrapped = _Namespace()
+    wrapped.chat = _Namespace()
+    wrapped.chat.completions = _InstrumentedCompletions(client.chat.completions, operation)
+    wrapped.raw = client
+    return wrapped
@@ -0,0 +1,206 @@
+"""Local stand-in for the OpenAI chat completions endpoint.
+
+Used to exercise the batch recommender and load tests without an API key:
+
+    python -m soil_health.mock_openai --port 8765 --latency 0.5
+
+then point the client at ``http://127.0.0.1:8765/v1``.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from soil_health.ai import components_list
+
+
+def canned_recommendations(context: str = "") -> dict:
+    first_line = context.strip().splitlines()[0] if context.strip() else "Soil sample"
+    return {
+        comp: {
+            "en": f"{comp}: recommendation generated by the local mock server.\n{first_line}",
+            "ar": f"توصية تجريبية من الخادم المحلي لقسم {i + 1}.",
+        }
+        for i, comp in enumerate(components_list)
+    }
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    server_version = "MockOpenAI/1.0"
+
+    def log_message(self, format, *args):  # keep the console quiet
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: dict | None = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, n: int, model: str, content: str, usage: dict | None = None, chunk_size: int = 24):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        for start in range(0, len(content), chunk_size):
+            chunk = {
+                "id": f"chatcmpl-mock-{n}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": {"content": content[start:start + chunk_size]}, "finish_reason": None}
+                ],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if self.server.chunk_delay:
+                time.sleep(self.server.chunk_delay)
+        if usage is not None:
+            final = {
+                "id": f"chatcmpl-mock-{n}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [],
+                "usage": usage,
+            }
+            self.wfile.write(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        srv = self.server
+
+        with srv.lock:
+            srv.request_count += 1
+            n = srv.request_count
+            srv.in_flight += 1
+            srv.peak_in_flight = max(srv.peak_in_flight, srv.in_flight)
+        try:
+            self._respond(n, request)
+        finally:
+            with srv.lock:
+                srv.in_flight -= 1
+
+    def _respond(self, n: int, request: dict):
+        srv = self.server
+        if srv.rate_limit_every and n % srv.rate_limit_every == 0:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded"}},
+                headers={"Retry-After": f"{srv.retry_after:g}"},
+            )
+            return
+
+        if srv.latency:
+            time.sleep(srv.latency)
+
+        messages = request.get("messages", [])
+        user_content = next((m["content"] for m in messages if m.get("role") == "user"), "")
+        content = json.dumps(canned_recommendations(user_content), ensure_ascii=False)
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        completion_tokens = len(content) // 4
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        if request.get("stream"):
+            include_usage = (request.get("stream_options") or {}).get("include_usage")
+            self._send_stream(n, request.get("model", "mock"), content, usage if include_usage else None)
+            return
+
+        self._send_json(
+            200,
+            {
+                "id": f"chatcmpl-mock-{n}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "mock"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            },
+        )
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # concurrent clients (batch / API load) connect at once
+
+
+def start_mock_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    rate_limit_every: int = 0,
+    chunk_delay: float = 0.0,
+    retry_after: float = 0.05,
+):
+    """Start the mock server on a daemon thread; returns ``(server, base_url)``.
+
+    ``rate_limit_every=n`` answers every n-th request with HTTP 429 and a
+    ``Retry-After`` of ``retry_after`` seconds; ``chunk_delay`` is the pause
+    between streamed chunks when ``stream=True``. ``server.request_count``
+    and ``server.peak_in_flight`` count what the clients sent.
+    """
+    server = MockServer((host, port), MockOpenAIHandler)
+    server.latency = latency
+    server.rate_limit_every = rate_limit_every
+    server.chunk_delay = chunk_delay
+    server.retry_after = retry_after
+    server.request_count = 0
+    server.in_flight = 0
+    server.peak_in_flight = 0
+    server.lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    base_url = f"http://{host}:{server.server_address[1]}/v1"
+    return server, base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock of the OpenAI chat completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to sleep per request")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Return 429 on every n-th request")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds between streamed chunks")
+    parser.add_argument("--retry-after", type=float, default=0.05, help="Retry-After (s) sent with each 429")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(
+        args.host, args.port, args.latency, args.rate_limit_every, args.chunk_delay, args.retry_after
+    )
+    print(f"Mock OpenAI server listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
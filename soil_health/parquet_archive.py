@@ -0,0 +1,373 @@
+"""Columnar archive of processed samples: a Parquet dataset by site and month.
+
+The SQLite archive (``soil_health.archive``) answers "find these reports";
+this one answers "ECe by site and month across three seasons". Each
+processed sample is one row of typed columns:
+
+- ``report_no``, ``customer``, ``received``, ``analyzed``, ``saved_at``
+- ``v_<key>``: the parsed number of every ``PARAMS`` parameter (``texture``
+  as text)
+- ``band``, ``missing_mandatory`` and a ``flag_<name>`` boolean per rule
+  constraint (``rules.FLAGS``): the derived indices
+- ``s_<key>``: the 0–5 score of every indicator, and ``overall_score``
+- ``crop_group``, ``need_<element>`` (kg/ha of element) and
+  ``rate_<product>`` (kg/ha of product): the fertilizer outputs
+
+Rows are stored under ``site=<site>/month=<YYYY-MM>/`` (hive layout; the
+month of the received date, else the analyzed date, else the day it was
+saved). A reader that filters on ``site`` / ``month`` opens only those
+directories, reads only the columns it asks for, and skips row groups by
+their min/max statistics for the other filters:
+
+    archive = ParquetArchive()
+    archive.append(samples)
+    archive.scan(["month", "v_ece", "overall_score"], sites=["Farm A"],
+                 months=("2024-01", "2025-12"), filters=[("v_ece", ">", 8)])
+
+Appending writes new files and never rewrites old ones, so several workers
+can append at once; each write goes to a hidden directory first and its
+files are moved into place, so readers never see half a file. Saving a
+report number again adds another row; ``compact`` rewrites partitions into
+one file each and keeps only the latest row per report number.
+
+The directory defaults to ``SOIL_HEALTH_PARQUET_DIR`` or ``soil_parquet``.
+
+    python -m soil_health.parquet_archive append samples.jsonl
+    python -m soil_health.parquet_archive query --site "Farm A" --filter "v_ece > 8" --columns month v_ece
+    python -m soil_health.parquet_archive summary --columns v_ece overall_score
+    python -m soil_health.parquet_archive compact
+"""
+
+import argparse
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from soil_health.archive import KEY_BY_LABEL, iso_date
+from soil_health.fertilizer import FERTILIZER_PRODUCTS, TARGET_LEVELS, fertilizer_products, fertilizer_requirements
+from soil_health.rules import FLAGS, constraint_flags, score_band
+from soil_health.sample import PARAMS, SoilSample
+from soil_health.scoring import PARAM_TO_INDICATOR, compute_score_card
+
+DEFAULT_PARQUET_PATH = os.environ.get("SOIL_HEALTH_PARQUET_DIR", "soil_parquet")
+DEFAULT_CROP_GROUP = "Vegetables"
+
+PARTITION_COLUMNS = ["site", "month"]
+PARTITION_SCHEMA = pa.schema([("site", pa.string()), ("month", pa.string())])
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+# a partition written as one file is read back as a few row groups
+ROW_GROUP_SIZE = 64 * 1024
+# pre-buffering batches reads for object stores; on local disk it doubled scan
+# time over a few hundred small files
+PARQUET_FORMAT = ds.ParquetFileFormat(default_fragment_scan_options=ds.ParquetFragmentScanOptions(pre_buffer=False))
+OPERATORS = ("<", "<=", ">", ">=", "=", "==", "!=", "in", "not in")
+
+
+def _slug(name: str) -> str:
+    """``rate_`` suffix for a product: ``"Urea (46% N)"`` -> ``"urea"``."""
+    return re.sub(r"[^a-z0-9]+", "_", name.split("(")[0].lower()).strip("_")
+
+
+VALUE_COLUMNS = {p["label"]: f"v_{p['key']}" for p in PARAMS}
+SCORE_COLUMNS = {label: f"s_{KEY_BY_LABEL[label]}" for label in PARAM_TO_INDICATOR}
+FLAG_COLUMNS = {flag: f"flag_{flag}" for flag in FLAGS}
+NEED_COLUMNS = {element: f"need_{element.lower()}" for element in TARGET_LEVELS[DEFAULT_CROP_GROUP]}
+RATE_COLUMNS = {product: f"rate_{_slug(product)}" for product in FERTILIZER_PRODUCTS}
+
+SCHEMA = pa.schema(
+    [
+        ("report_no", pa.string()),
+        ("customer", pa.string()),
+        ("received", pa.date32()),
+        ("analyzed", pa.date32()),
+        ("saved_at", pa.timestamp("ms")),
+        *((column, pa.string() if label == "Soil Texture Class" else pa.float64()) for label, column in VALUE_COLUMNS.items()),
+        ("band", pa.string()),
+        ("missing_mandatory", pa.int8()),
+        *((column, pa.bool_()) for column in FLAG_COLUMNS.values()),
+        *((column, pa.int8()) for column in SCORE_COLUMNS.values()),
+        ("overall_score", pa.float64()),
+        ("crop_group", pa.string()),
+        *((column, pa.float64()) for column in NEED_COLUMNS.values()),
+        *((column, pa.float64()) for column in RATE_COLUMNS.values()),
+    ]
+)
+# the files hold the data columns; site and month come from the directories
+DATASET_SCHEMA = pa.schema(list(SCHEMA) + list(PARTITION_SCHEMA))
+
+
+def _date(text) -> date | None:
+    iso = iso_date(text) if text else None
+    return date.fromisoformat(iso) if iso else None
+
+
+def sample_record(
+    sample,
+    score_rows: list[dict] | None = None,
+    overall_score: float | None = None,
+    missing: list[str] | None = None,
+    crop_group: str = DEFAULT_CROP_GROUP,
+    fertilizer_rows: list[dict] | None = None,
+    product_rows: list[dict] | None = None,
+    saved_at: float | None = None,
+) -> dict:
+    """One dataset row for a sample (a ``SoilSample`` or payload).
+
+    Scores and fertilizer tables are computed when not given; a page that
+    already has them passes them in.
+    """
+    sample = SoilSample.from_payload(sample)
+    info = sample.info
+    if score_rows is None:
+        score_rows, overall_score, missing = compute_score_card(sample)
+    if fertilizer_rows is None:
+        fertilizer_rows = fertilizer_requirements(sample, crop_group)
+    if product_rows is None:
+        product_rows = fertilizer_products(fertilizer_rows)
+    saved_at = time.time() if saved_at is None else saved_at
+    received, analyzed = _date(info.get("received")), _date(info.get("analyzed"))
+    month = (received or analyzed or date.fromtimestamp(saved_at)).strftime("%Y-%m")
+
+    record = {
+        "report_no": str(info.get("report_no") or "").strip() or None,
+        "customer": str(info.get("customer") or "").strip() or None,
+        "site": str(info.get("site") or "").strip() or None,
+        "month": month,
+        "received": received,
+        "analyzed": analyzed,
+        "saved_at": int(saved_at * 1000),
+    }
+    for label, column in VALUE_COLUMNS.items():
+        if label == "Soil Texture Class":
+            record[column] = str(sample[label]).strip() or None if label in sample else None
+        else:
+            record[column] = sample.number(label)
+    flags = set(constraint_flags(sample))
+    record["band"] = score_band(overall_score)
+    record["missing_mandatory"] = len(missing) if missing is not None else None
+    for flag, column in FLAG_COLUMNS.items():
+        record[column] = flag in flags
+    for row in score_rows:
+        column = SCORE_COLUMNS.get(row.get("Parameter (report label)"))
+        if column is not None:
+            record[column] = row["Score (0–5)"]
+    record["overall_score"] = overall_score
+    record["crop_group"] = crop_group
+    for row in fertilizer_rows:
+        record[NEED_COLUMNS[row["Element"]]] = row["Required nutrient (kg/ha)"]
+    for row in product_rows:
+        record[RATE_COLUMNS[row["Fertilizer product"]]] = row["Required fertilizer (kg/ha)"]
+    return record
+
+
+def _expression(filters, sites, months):
+    """One dataset filter for ``filters`` (``[(column, op, value), ...]``), sites and a month range."""
+    parts = []
+    if filters:
+        for column, op, _ in filters:
+            if column not in DATASET_SCHEMA.names:
+                raise ValueError(f"Unknown column: {column!r}")
+            if op not in OPERATORS:
+                raise ValueError(f"Unsupported operator: {op!r}")
+        parts.append(pq.filters_to_expression([tuple(f) for f in filters]))
+    if sites:
+        parts.append(pc.field("site").isin(list(sites)))
+    if months:
+        low, high = months
+        if low:
+            parts.append(pc.field("month") >= low)
+        if high:
+            parts.append(pc.field("month") <= high)
+    expression = None
+    for part in parts:
+        expression = part if expression is None else expression & part
+    return expression
+
+
+def _latest_per_report(table: pa.Table) -> pa.Table:
+    """Only the most recently saved row of each report number (rows without one are kept)."""
+    numbered = pc.is_valid(table["report_no"])
+    if not pc.any(numbered).as_py():
+        return table
+    order = pc.sort_indices(table, [("report_no", "ascending"), ("saved_at", "descending")])
+    ordered = table.take(order)
+    report_no = ordered["report_no"]
+    previous = pa.concat_arrays([pa.array([None], pa.string()), report_no.slice(0, len(report_no) - 1).combine_chunks()])
+    first = pc.or_kleene(pc.invert(pc.is_valid(report_no)), pc.fill_null(pc.not_equal(report_no, previous), True))
+    return ordered.filter(first)
+
+
+class ParquetArchive:
+    """Processed samples as a Parquet dataset partitioned by site and month."""
+
+    def __init__(self, path: str = DEFAULT_PARQUET_PATH):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _write(self, table: pa.Table) -> int:
+        """Write ``table`` as new files, moving them into place once complete."""
+        if not table.num_rows:
+            return 0
+        # rows of a partition in date order, so the row group statistics are narrow
+        table = table.sort_by([("site", "ascending"), ("month", "ascending"), ("received", "ascending")])
+        staging = os.path.join(self.path, f".staging-{uuid.uuid4().hex}")
+        try:
+            ds.write_dataset(
+                table,
+                staging,
+                format="parquet",
+                partitioning=PARTITIONING,
+                basename_template=f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:12]}-{{i}}.parquet",
+                file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+                max_rows_per_group=ROW_GROUP_SIZE,
+            )
+            for directory, _, files in os.walk(staging):
+                target = os.path.join(self.path, os.path.relpath(directory, staging))
+                os.makedirs(target, exist_ok=True)
+                for name in files:
+                    os.replace(os.path.join(directory, name), os.path.join(target, name))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return table.num_rows
+
+    def append_records(self, records: list[dict]) -> int:
+        """Append rows built by :func:`sample_record`; returns the count."""
+        return self._write(pa.Table.from_pylist(records, schema=DATASET_SCHEMA))
+
+    def append(self, samples, crop_group: str = DEFAULT_CROP_GROUP) -> int:
+        """Score and append many samples (payloads or ``SoilSample``); returns the count."""
+        return self.append_records([sample_record(s, crop_group=crop_group) for s in samples])
+
+    def dataset(self) -> ds.Dataset:
+        # hidden staging directories are skipped (ignore_prefixes "." and "_")
+        return ds.dataset(self.path, format=PARQUET_FORMAT, partitioning=PARTITIONING, schema=DATASET_SCHEMA)
+
+    def scan(
+        self,
+        columns: list[str] | None = None,
+        filters: list[tuple] | None = None,
+        sites: list[str] | None = None,
+        months: tuple[str | None, str | None] | None = None,
+    ) -> pa.Table:
+        """Matching rows as an Arrow table.
+
+        ``columns`` limits the columns read (``site`` and ``month`` are
+        columns too); ``filters`` are ``(column, op, value)`` tuples, all of
+        which must hold; ``months`` is an inclusive ``("YYYY-MM", "YYYY-MM")``
+        range, either end may be None.
+        """
+        return self.dataset().to_table(columns=columns, filter=_expression(filters, sites, months))
+
+    def frame(self, columns=None, filters=None, sites=None, months=None):
+        """:meth:`scan` as a pandas DataFrame."""
+        return self.scan(columns, filters, sites, months).to_pandas()
+
+    def monthly_summary(self, columns: list[str], filters=None, sites=None, months=None) -> pa.Table:
+        """Sample count and the mean of each of ``columns`` per site and month, in order."""
+        table = self.scan(PARTITION_COLUMNS + list(columns), filters, sites, months)
+        summary = table.group_by(PARTITION_COLUMNS).aggregate(
+            [([], "count_all")] + [(column, "mean") for column in columns]
+        )
+        summary = summary.rename_columns(["samples" if n == "count_all" else n for n in summary.column_names])
+        return summary.sort_by([("site", "ascending"), ("month", "ascending")])
+
+    def sites(self) -> list[str]:
+        table = self.scan(["site"])
+        return sorted(s for s in pc.unique(table["site"]).to_pylist() if s is not None)
+
+    def compact(self) -> int:
+        """Rewrite each partition as one file, keeping the latest row per report number.
+
+        Returns the number of rows dropped. Run it when nothing is appending.
+        """
+        by_directory = {}
+        for fragment in self.dataset().get_fragments():
+            by_directory.setdefault(os.path.dirname(fragment.path), []).append(fragment)
+        dropped = 0
+        for fragments in by_directory.values():
+            table = pa.concat_tables(f.to_table(schema=DATASET_SCHEMA) for f in fragments)
+            latest = _latest_per_report(table)
+            if len(fragments) == 1 and latest.num_rows == table.num_rows:
+                continue
+            dropped += table.num_rows - latest.num_rows
+            self._write(latest)
+            for fragment in fragments:
+                os.remove(fragment.path)
+        return dropped
+
+    def __len__(self):
+        return self.dataset().count_rows()
+
+
+FILTER_RE = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|==|=|<|>)\s*(.+?)\s*$")
+
+
+def parse_filter(text: str) -> tuple:
+    """``"v_ece > 8"`` -> ``("v_ece", ">", 8.0)`` (numbers for numeric columns)."""
+    match = FILTER_RE.match(text)
+    if not match:
+        raise ValueError(f"Not a filter: {text!r} (expected e.g. 'v_ece > 8')")
+    column, op, value = match.groups()
+    if column in DATASET_SCHEMA.names and pa.types.is_floating(DATASET_SCHEMA.field(column).type):
+        value = float(value)
+    elif column in DATASET_SCHEMA.names and pa.types.is_integer(DATASET_SCHEMA.field(column).type):
+        value = int(value)
+    return column, "==" if op == "=" else op, value
+
+
+def main():
+    from itertools import islice
+
+    from soil_health.export import iter_samples
+
+    parser = argparse.ArgumentParser(description="Columnar (Parquet) archive of processed samples.")
+    parser.add_argument("--path", default=DEFAULT_PARQUET_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    append = commands.add_parser("append", help="Score and append a JSON-lines file of samples")
+    append.add_argument("input")
+    append.add_argument("--crop-group", default=DEFAULT_CROP_GROUP, choices=list(TARGET_LEVELS))
+    append.add_argument("--batch", type=int, default=5000, help="Samples per write (one file per partition each)")
+    for name in ("query", "summary"):
+        command = commands.add_parser(name)
+        command.add_argument("--columns", nargs="+", default=None)
+        command.add_argument("--site", action="append", default=None)
+        command.add_argument("--from-month", default=None, help="YYYY-MM")
+        command.add_argument("--to-month", default=None, help="YYYY-MM")
+        command.add_argument("--filter", action="append", default=[], help="e.g. 'v_ece > 8' (repeatable)")
+    commands.add_parser("compact", help="One file per partition, latest row per report number")
+    args = parser.parse_args()
+
+    archive = ParquetArchive(args.path)
+    if args.command == "append":
+        samples, total = iter_samples(args.input), 0
+        while True:
+            batch = list(islice(samples, args.batch))
+            if not batch:
+                break
+            total += archive.append(batch, crop_group=args.crop_group)
+        print(f"appended {total} samples to {args.path}")
+    elif args.command == "compact":
+        print(f"dropped {archive.compact()} superseded rows; {len(archive)} rows remain")
+    else:
+        months = (args.from_month, args.to_month) if args.from_month or args.to_month else None
+        filters = [parse_filter(f) for f in args.filter]
+        t0 = time.perf_counter()
+        if args.command == "summary":
+            table = archive.monthly_summary(args.columns or ["overall_score"], filters, args.site, months)
+        else:
+            table = archive.scan(args.columns, filters, args.site, months)
+        elapsed = time.perf_counter() - t0
+        print(table.to_pandas().to_string(index=False, max_rows=60))
+        print(f"{table.num_rows} rows in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""PDF score card report rendered with reportlab (no browser needed).
+
+Arabic text is shaped with ``arabic_reshaper`` and reordered with
+``python-bidi`` line by line after wrapping, so multi-line RTL cells read in
+the right order. Fonts and logos are loaded once per process (``warm_up``
+is the bulk exporter's worker initializer), and shaped strings are memoized
+because recommendation texts repeat across samples with the same signature.
+
+Font lookup: ``SOIL_HEALTH_PDF_FONT`` / ``SOIL_HEALTH_PDF_FONT_BOLD``, then
+common system fonts that cover both Latin and Arabic (DejaVu Sans, Arial).
+"""
+
+import io
+import os
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+import arabic_reshaper
+from bidi.algorithm import get_display
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Flowable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from soil_health.ai import components_list
+from soil_health.report import plain_cell
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOGOS = [os.path.join(ROOT, "Silal_logo.jpeg"), os.path.join(ROOT, "IO_logo.png")]
+
+FONT_CANDIDATES = [
+    (os.environ.get("SOIL_HEALTH_PDF_FONT"), os.environ.get("SOIL_HEALTH_PDF_FONT_BOLD")),
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"),
+    ("/usr/share/fonts/dejavu/DejaVuSans.ttf", "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf"),
+    ("/Library/Fonts/Arial Unicode.ttf", None),
+    ("C:/Windows/Fonts/arial.ttf", "C:/Windows/Fonts/arialbd.ttf"),
+]
+
+GREEN = colors.HexColor("#006400")
+PAGE_WIDTH = A4[0] - 30 * mm
+
+SCORE_COLUMNS = ["Indicator", "Value", "Unit", "Score (0–5)", "Weight", "Weighted score"]
+FERT_COLUMNS = ["Element", "Measured (mg/kg)", "Target (mg/kg)", "Deficit (mg/kg)", "Required nutrient (kg/ha)"]
+PRODUCT_COLUMNS = ["Fertilizer product", "Main element", "Required nutrient (kg/ha)", "Required fertilizer (kg/ha)"]
+
+
+# =====================================================
+#  Per-process resources
+# =====================================================
+
+@lru_cache(maxsize=1)
+def fonts() -> tuple[str, str]:
+    """Register the report fonts once; returns (regular, bold) font names."""
+    for regular, bold in FONT_CANDIDATES:
+        if regular and os.path.exists(regular):
+            pdfmetrics.registerFont(TTFont("SoilSans", regular))
+            if bold and os.path.exists(bold):
+                pdfmetrics.registerFont(TTFont("SoilSans-Bold", bold))
+                return "SoilSans", "SoilSans-Bold"
+            return "SoilSans", "SoilSans"
+    # Latin only: Arabic glyphs will be missing
+    return "Helvetica", "Helvetica-Bold"
+
+
+@lru_cache(maxsize=1)
+def logos() -> list:
+    return [ImageReader(path) for path in LOGOS if os.path.exists(path)]
+
+
+@lru_cache(maxsize=1)
+def styles() -> dict:
+    regular, bold = fonts()
+    return {
+        "title": ParagraphStyle("title", fontName=bold, fontSize=18, leading=22, alignment=TA_CENTER, textColor=GREEN),
+        "h2": ParagraphStyle("h2", fontName=bold, fontSize=12, leading=15, spaceBefore=8, spaceAfter=4, textColor=GREEN),
+        "cell": ParagraphStyle("cell", fontName=regular, fontSize=7.5, leading=9.5),
+        "head": ParagraphStyle("head", fontName=bold, fontSize=7.5, leading=9.5),
+        "score": ParagraphStyle("score", fontName=bold, fontSize=28, leading=32, alignment=TA_CENTER, textColor=GREEN),
+    }
+
+
+def warm_up():
+    """Load fonts, logos and styles (worker initializer for bulk export)."""
+    fonts()
+    logos()
+    styles()
+    base_style()
+    reco_style()
+
+
+# =====================================================
+#  Arabic shaping
+# =====================================================
+
+@lru_cache(maxsize=8192)
+def shape_line(text: str) -> str:
+    return get_display(arabic_reshaper.reshape(text))
+
+
+@lru_cache(maxsize=16384)
+def word_width(word: str, font: str, size: float) -> float:
+    # joining never crosses a space, so each word can be shaped on its own
+    return pdfmetrics.stringWidth(arabic_reshaper.reshape(word), font, size)
+
+
+@lru_cache(maxsize=4096)
+def rtl_lines(text: str, font: str, size: float, width: float) -> str:
+    """Wrap logical-order Arabic to ``width``, then shape and reorder each line.
+
+    Line breaks in ``text`` (between recommendation sentences) are kept.
+    Returns the display lines joined by newlines (a plain table cell).
+    """
+    space = pdfmetrics.stringWidth(" ", font, size)
+    lines = []
+    for paragraph in text.split("\n"):
+        current, used = [], 0.0
+        for word in paragraph.split():
+            w = word_width(word, font, size)
+            if current and used + space + w > width:
+                lines.append(" ".join(current))
+                current, used = [word], w
+            else:
+                used += (space if current else 0.0) + w
+                current.append(word)
+        if current:
+            lines.append(" ".join(current))
+    return "\n".join(shape_line(line) for line in lines)
+
+
+# =====================================================
+#  Flowables
+# =====================================================
+
+class ScoreBar(Flowable):
+    """The page's gradient score bar with 0 / score / 100 labels."""
+
+    def __init__(self, score: float, width: float = PAGE_WIDTH, height: float = 6 * mm):
+        super().__init__()
+        self.score = max(0.0, min(100.0, score))
+        self.width = width
+        self.bar_height = height
+        self.height = height + 5 * mm
+
+    def draw(self):
+        canv = self.canv
+        regular, _ = fonts()
+        top = self.height - self.bar_height
+        canv.saveState()
+        path = canv.beginPath()
+        path.roundRect(0, top, self.width, self.bar_height, self.bar_height / 2)
+        canv.clipPath(path, stroke=0, fill=0)
+        canv.linearGradient(
+            0, top, self.width, top,
+            (colors.HexColor("#2e7d32"), colors.HexColor("#f9a825"), colors.HexColor("#c62828")),
+            extend=False,
+        )
+        canv.setFillColor(colors.Color(1, 1, 1, alpha=0.7))
+        filled = self.width * self.score / 100
+        canv.rect(filled, top, self.width - filled, self.bar_height, stroke=0, fill=1)
+        canv.restoreState()
+
+        canv.setFont(regular, 7)
+        canv.setFillColor(colors.HexColor("#555555"))
+        canv.drawString(0, 0, "0 (Poor)")
+        canv.drawCentredString(self.width / 2, 0, f"{self.score:.1f}")
+        canv.drawRightString(self.width, 0, "100 (Excellent)")
+
+
+def table_style(font: str, bold: str, extra=()) -> TableStyle:
+    return TableStyle(
+        [
+            ("FONT", (0, 0), (-1, -1), font, 7.5, 9.5),
+            ("FONT", (0, 0), (-1, 0), bold, 7.5, 9.5),
+            ("GRID", (0, 0), (-1, -1), 0.4, colors.HexColor("#cccccc")),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f3f7f3")),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("TOPPADDING", (0, 0), (-1, -1), 2),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+            *extra,
+        ]
+    )
+
+
+@lru_cache(maxsize=1)
+def base_style() -> TableStyle:
+    return table_style(*fonts())
+
+
+def data_table(records: list[dict], columns: list[str]) -> Table:
+    """Plain-string cells: far cheaper to lay out than one Paragraph per cell."""
+    data = [columns]
+    for rec in records:
+        # plain strings are drawn as-is, so no HTML escaping here
+        data.append([plain_cell(rec.get(c)) for c in columns])
+    table = Table(data, repeatRows=1)
+    table.setStyle(base_style())
+    return table
+
+
+RECO_WIDTHS = [30 * mm, (PAGE_WIDTH - 30 * mm) / 2, (PAGE_WIDTH - 30 * mm) / 2]
+
+
+@lru_cache(maxsize=1)
+def reco_style() -> TableStyle:
+    regular, bold = fonts()
+    return table_style(regular, bold, [("ALIGN", (2, 0), (2, -1), "RIGHT"), ("FONT", (2, 1), (2, -1), regular, 8, 11)])
+
+
+def reco_table(recommendations: dict) -> Table:
+    st = styles()
+    regular, _ = fonts()
+    ar_width = RECO_WIDTHS[2] - 12  # minus cell padding
+    data = [["Component", "Summary / Recommendations", shape_line("الخلاصة والتوصيات")]]
+    for comp in components_list:
+        block = recommendations.get(comp) or {}
+        en = (block.get("en") or "").strip()
+        ar = (block.get("ar") or "").strip()
+        data.append([
+            Paragraph(escape(comp), st["head"]),
+            Paragraph(escape(en).replace("\n", "<br/>"), st["cell"]),
+            rtl_lines(ar, regular, 8, ar_width),
+        ])
+    table = Table(data, colWidths=RECO_WIDTHS, repeatRows=1)
+    table.setStyle(reco_style())
+    return table
+
+
+# =====================================================
+#  Document
+# =====================================================
+
+LOGO_HEIGHT = 14 * mm
+
+
+def draw_logos(canv, doc):
+    """First-page callback: logos left and right of the title (readers are cached per process)."""
+    images = logos()
+    if not images:
+        return
+    top = A4[1] - doc.topMargin - LOGO_HEIGHT
+    for reader, x_right in zip(images, (False, True)):
+        img_w, img_h = reader.getSize()
+        width = LOGO_HEIGHT * img_w / img_h
+        x = A4[0] - doc.rightMargin - width if x_right else doc.leftMargin
+        canv.drawImage(reader, x, top, width, LOGO_HEIGHT, mask="auto")
+
+
+def header(sample_info: dict) -> list:
+    st = styles()
+    flow = [Spacer(1, 3 * mm), Paragraph("Silal Soil Health Report", st["title"]), Spacer(1, 5 * mm)]
+    if sample_info:
+        info = [["Field", "Value"]] + [[str(k), str(v)] for k, v in sample_info.items()]
+        table = Table(info, colWidths=[40 * mm, PAGE_WIDTH - 40 * mm])
+        table.setStyle(base_style())
+        flow += [Spacer(1, 2 * mm), table]
+    return flow
+
+
+def render_pdf(job: dict) -> bytes:
+    """Score card PDF for a bulk-export job (see ``soil_health.export.build_job``)."""
+    st = styles()
+    score = job.get("overall_score")
+    flow = header(job.get("sample_info") or {})
+
+    flow.append(Paragraph("Soil Health Score", st["h2"]))
+    if score is not None:
+        flow += [Paragraph(f"{score:.1f} <font size=14 color='#555555'>/ 100</font>", st["score"]), ScoreBar(score)]
+    else:
+        flow.append(Paragraph("No soil health score calculated.", st["cell"]))
+
+    flow.append(Paragraph("Analysis Results", st["h2"]))
+    flow.append(data_table(job.get("score_rows", []), SCORE_COLUMNS))
+
+    flow.append(Paragraph("Soil Management Recommendations", st["h2"]))
+    flow.append(reco_table(job.get("recommendations") or {}))
+
+    flow.append(Paragraph(f"Fertilizer Requirements (kg/ha of nutrient) – {escape(job.get('crop_group', ''))}", st["h2"]))
+    flow.append(data_table(job.get("fert_rows", []), FERT_COLUMNS))
+
+    flow.append(Paragraph("Fertilizer Products (kg/ha)", st["h2"]))
+    flow.append(data_table(job.get("product_rows", []), PRODUCT_COLUMNS))
+
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buf,
+        pagesize=A4,
+        leftMargin=15 * mm,
+        rightMargin=15 * mm,
+        topMargin=12 * mm,
+        bottomMargin=12 * mm,
+        title="Silal Soil Health Report",
+    )
+    doc.build(flow, onFirstPage=draw_logos)
+    return buf.getvalue()
@@ -0,0 +1,216 @@
+"""Pre-generate AI recommendations for the most frequent soil signatures.
+
+Most samples reduce to a few dozen signatures (score band + constraint
+flags, see :mod:`soil_health.rules`). This job mines the sample archive
+(:class:`~soil_health.archive.SampleArchive`, or a JSON-lines file) for the
+most frequent ones, builds one representative context per signature
+(in the app's prompt format, ``ai.COMPACT_PROMPT``) and generates its
+recommendations with :class:`BatchRecommender` into the persistent cache.
+The score card page looks a sample's signature up there before calling the
+API.
+
+The budget caps both the number of signatures and the estimated spend; a
+``--window`` restricts runs to off-peak hours (e.g. from cron):
+
+    python -m soil_health.prewarm --budget 40 --max-cost 0.50 --window 22-6
+    python -m soil_health.prewarm --archive soil_archive.sqlite3 --since 2025-01-01
+    python -m soil_health.prewarm --jsonl samples.jsonl
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+
+from soil_health.ai import COMPACT_PROMPT, MODEL, build_ai_context, build_messages
+from soil_health.batch import BatchRecommender
+from soil_health.cache import DEFAULT_CACHE_PATH, PersistentCache
+from soil_health.metrics import estimate_cost
+from soil_health.rules import constraint_flags, rule_based_recommendations, score_band, signature
+from soil_health.schema import invalid_entries, merge_entries
+from soil_health.scoring import compute_score_card
+
+# Completion size used for the spend estimate (seven bilingual sections).
+EXPECTED_COMPLETION_TOKENS = 1200
+
+
+def prewarm_key(raw_data: dict, overall_score: float | None, model: str = MODEL) -> str:
+    """Persistent-cache key shared by every sample with the same signature."""
+    return f"{model}|{signature(score_band(overall_score), constraint_flags(raw_data))}"
+
+
+def load_archive_samples(path: str, since=None) -> list[dict]:
+    """``raw_data`` dicts of the samples saved in a sample archive (received on or after ``since``)."""
+    from soil_health.archive import SampleArchive
+
+    archive = SampleArchive(path)
+    try:
+        return list(archive.iter_raw_data(received_from=since))
+    finally:
+        archive.close()
+
+
+def load_samples(path: str) -> list[dict]:
+    """``raw_data`` dicts from a JSON-lines file (``{"raw_data": ...}`` or bare dicts)."""
+    samples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                samples.append(item.get("raw_data", item))
+    return samples
+
+
+def mine_signatures(samples: list[dict], model: str = MODEL) -> list[dict]:
+    """Signatures by descending frequency, each with a representative sample.
+
+    The representative is the sample whose score is closest to the median
+    score of its signature.
+    """
+    groups = {}
+    for raw in samples:
+        _, score, _ = compute_score_card(raw)
+        groups.setdefault(prewarm_key(raw, score, model), []).append((score, raw))
+
+    counts = Counter({key: len(members) for key, members in groups.items()})
+    mined = []
+    for key, count in counts.most_common():
+        members = groups[key]
+        scores = [s for s, _ in members if s is not None]
+        median = statistics.median(scores) if scores else None
+        score, raw = min(members, key=lambda m: abs(m[0] - median) if median is not None else 0)
+        mined.append({"key": key, "count": count, "raw_data": raw, "overall_score": score})
+    return mined
+
+
+def estimated_cost(context: str, model: str = MODEL) -> float:
+    prompt_tokens = sum(len(m["content"]) for m in build_messages(context, compact=COMPACT_PROMPT)) // 4
+    return estimate_cost(model, prompt_tokens, EXPECTED_COMPLETION_TOKENS)
+
+
+def plan(mined: list[dict], cache, budget: int, max_cost: float | None, refresh: bool = False) -> list[dict]:
+    """Pick the most frequent uncached signatures that fit the budget."""
+    selected, spend = [], 0.0
+    for item in mined:
+        if len(selected) >= budget:
+            break
+        if not refresh and item["key"] in cache:
+            continue
+        context = build_ai_context(item["raw_data"], item["overall_score"], compact=COMPACT_PROMPT)
+        cost = estimated_cost(context)
+        if max_cost is not None and spend + cost > max_cost:
+            break
+        spend += cost
+        selected.append({**item, "context": context, "estimated_cost": cost})
+    return selected
+
+
+def prewarm(samples: list[dict], cache, budget: int = 40, max_cost: float | None = None,
+            refresh: bool = False, **batch_kwargs) -> dict:
+    """Generate and store recommendations for the top signatures; returns a summary."""
+    mined = mine_signatures(samples)
+    selected = plan(mined, cache, budget, max_cost, refresh)
+
+    results = []
+    if selected:
+        recommender = BatchRecommender(compact=COMPACT_PROMPT, **batch_kwargs)
+        results = asyncio.run(recommender.generate([item["context"] for item in selected]))
+
+    stored, failed = 0, 0
+    for item, outcome in zip(selected, results):
+        if outcome["error"] or not isinstance(outcome["result"], dict):
+            failed += 1
+            continue
+        # gaps the model left are filled from the rule engine, as on the page
+        rule_json = rule_based_recommendations(item["raw_data"], item["overall_score"])
+        result = merge_entries(outcome["result"], rule_json, invalid_entries(outcome["result"]))
+        cache.set(item["key"], result)
+        stored += 1
+
+    covered = sum(item["count"] for item in mined if item["key"] in cache)
+    return {
+        "samples": len(samples),
+        "signatures": len(mined),
+        "selected": len(selected),
+        "stored": stored,
+        "failed": failed,
+        "estimated_cost_usd": round(sum(item["estimated_cost"] for item in selected), 4),
+        "sample_coverage": round(covered / len(samples), 3) if samples else 0.0,
+    }
+
+
+def parse_window(window: str) -> tuple[int, int]:
+    start, _, end = window.partition("-")
+    return int(start) % 24, int(end) % 24
+
+
+def in_window(now: dt.datetime, window: tuple[int, int]) -> bool:
+    start, end = window
+    if start <= end:
+        return start <= now.hour < end
+    return now.hour >= start or now.hour < end  # wraps past midnight
+
+
+def seconds_until(now: dt.datetime, hour: int) -> float:
+    target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += dt.timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate recommendations for frequent signatures.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--archive", default=None, help="Sample archive (default: SOIL_HEALTH_ARCHIVE_DB)")
+    source.add_argument("--jsonl", default=None, help="Mine a JSON-lines file of samples instead")
+    parser.add_argument("--since", default=None, help="Only samples received on or after this date (archive)")
+    parser.add_argument("--db", default=DEFAULT_CACHE_PATH, help="Persistent cache file")
+    parser.add_argument("--budget", type=int, default=40, help="Maximum signatures to generate")
+    parser.add_argument("--max-cost", type=float, default=None, help="Maximum estimated spend in USD")
+    parser.add_argument("--window", default=None, help="Off-peak hours, e.g. 22-6 (local time)")
+    parser.add_argument("--wait", action="store_true", help="Sleep until the window opens instead of exiting")
+    parser.add_argument("--refresh", action="store_true", help="Regenerate signatures already cached")
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=float, default=60, help="Kept low so daytime traffic keeps its quota")
+    args = parser.parse_args()
+
+    if args.window:
+        window = parse_window(args.window)
+        now = dt.datetime.now()
+        if not in_window(now, window):
+            if not args.wait:
+                print(f"outside the off-peak window {args.window}; nothing to do", file=sys.stderr)
+                return
+            time.sleep(seconds_until(now, window[0]))
+
+    cache = PersistentCache(args.db)
+    started = time.perf_counter()
+    if args.jsonl:
+        samples = load_samples(args.jsonl)
+    else:
+        from soil_health.archive import DEFAULT_ARCHIVE_PATH
+
+        samples = load_archive_samples(args.archive or DEFAULT_ARCHIVE_PATH, args.since)
+    summary = prewarm(
+        samples,
+        cache,
+        budget=args.budget,
+        max_cost=args.max_cost,
+        refresh=args.refresh,
+        base_url=args.base_url,
+        max_concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+    )
+    summary["elapsed_s"] = round(time.perf_counter() - started, 2)
+    summary["cached_signatures"] = len(cache)
+    cache.close()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""Downloadable HTML report artifacts.
+
+The pages pass a plain payload (records, scores, pre-rendered fragments) to
+``score_card_report`` / ``sample_report`` from a ``st.download_button`` data
+callable, so nothing is rendered until a download is requested. Templates are
+parsed once at import and finished documents are memoized by a hash of the
+payload, so repeated downloads of an unchanged report are free. Documents are
+memoized with a ``GENERATED`` marker where the time goes; ``stamp`` fills it
+in after the lookup, so a cached report still shows when it was downloaded.
+"""
+
+import hashlib
+import json
+import math
+from datetime import datetime
+from string import Template
+
+from soil_health.ai import html_escape
+from soil_health.cache import TTLCache
+
+# Finished documents keyed by (kind, payload hash); shared by all sessions.
+ARTIFACT_CACHE = TTLCache(ttl=3600, max_entries=128)
+
+# stands for the "generated on" time in memoized HTML; escaped data cannot contain it
+GENERATED = "<!--generated-->"
+
+
+def payload_hash(payload) -> str:
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def cached_artifact(kind: str, payload, render):
+    """Return ``render(payload)``, memoized by ``kind`` and the payload hash."""
+    key = (kind, payload_hash(payload))
+    artifact = ARTIFACT_CACHE.get(key)
+    if artifact is None:
+        artifact = render(payload)
+        ARTIFACT_CACHE.set(key, artifact)
+    return artifact
+
+
+def generated_now() -> str:
+    return f"{datetime.now():%Y-%m-%d %H:%M}"
+
+
+def stamp(document: str) -> str:
+    """A memoized HTML document with the current time in place of ``GENERATED``."""
+    return document.replace(GENERATED, generated_now())
+
+
+def plain_cell(value) -> str:
+    """Cell text, unescaped (PDF / DOCX cells): blank for missing, ``%g`` for floats."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+def format_cell(value) -> str:
+    """Cell text for HTML."""
+    return html_escape(plain_cell(value))
+
+
+def records_table_html(records: list[dict], columns: list[str] | None = None, row_classes=None) -> str:
+    """HTML table for a list of row dicts (the ``DataFrame.to_html`` layout without pandas)."""
+    if not records:
+        return "<p>No data.</p>"
+    columns = columns or list(records[0])
+    head = "".join(f"<th>{html_escape(c)}</th>" for c in columns)
+    body = []
+    for i, rec in enumerate(records):
+        cls = f' class="{row_classes[i]}"' if row_classes and row_classes[i] else ""
+        cells = "".join(f"<td>{format_cell(rec.get(c))}</td>" for c in columns)
+        body.append(f"<tr{cls}>{cells}</tr>")
+    return (
+        '<table border="1" class="dataframe">\n<thead><tr>' + head + "</tr></thead>\n<tbody>\n"
+        + "\n".join(body)
+        + "\n</tbody>\n</table>"
+    )
+
+
+# =====================================================
+#  Score card report (pages/soil_score_card.py)
+# =====================================================
+
+SCORE_BAR_TEMPLATE = Template("""
+    <div style="margin-top:5px; margin-bottom:10px;">
+      <div style="
+            width:100%;
+            height:22px;
+            border-radius:999px;
+            background:linear-gradient(90deg,#2e7d32,#f9a825,#c62828);
+            position:relative;
+            overflow:hidden;
+        ">
+        <div style="
+              position:absolute;
+              top:0;
+              right:0;
+              height:100%;
+              width:$remaining%;
+              background:rgba(255,255,255,0.7);
+        "></div>
+      </div>
+      <div style="
+            margin-top:3px;
+            font-size:0.8rem;
+            color:#555;
+            display:flex;
+            justify-content:space-between;
+        ">
+        <span>0 (Poor)</span>
+        <span>$score</span>
+        <span>100 (Excellent)</span>
+      </div>
+    </div>
+""")
+
+SCORE_CARD_TEMPLATE = Template("""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Silal Soil Health Report</title>
+  <style>
+    body {
+      font-family: Arial, sans-serif;
+      font-size: 12px;
+      margin: 20px;
+      color: #222;
+    }
+    h1 {
+      color:#006400;
+      font-size:22px;
+      text-align:center;
+      margin-bottom:4px;
+    }
+    h2 {
+      color:#006400;
+      margin-top:18px;
+      margin-bottom:6px;
+      font-size:16px;
+    }
+    .score-center {
+      text-align:center;
+      margin-top:10px;
+      margin-bottom:5px;
+    }
+    .score-center .main {
+      font-size:40px;
+      font-weight:bold;
+      color:#006400;
+    }
+    .score-center .sub {
+      font-size:20px;
+      color:#555;
+    }
+    table {
+      border-collapse: collapse;
+      width: 100%;
+      margin-bottom: 12px;
+    }
+    table, th, td {
+      border: 1px solid #ccc;
+    }
+    th, td {
+      padding: 4px 6px;
+      font-size: 11px;
+    }
+  </style>
+</head>
+<body>
+
+  <h1>Silal Soil Health Report</h1>
+
+  <h2>Soil Health Score</h2>
+  <div class="score-center">
+    <span class="main">$score</span>
+    <span class="sub"> / 100</span>
+  </div>
+  $score_bar
+
+  <h2>Analysis Results</h2>
+  $score_table
+
+  <h2>AI Soil Management Recommendations / التوصيات الذكية لإدارة التربة</h2>
+  $reco_table
+
+  <h2>Fertilizer Requirements (kg/ha of nutrient)</h2>
+  $fert_table
+
+  <h2>Fertilizer Products (kg/ha)</h2>
+  $products_table
+
+</body>
+</html>
+""")
+
+
+def score_bar_html(overall_score: float | None) -> str:
+    if overall_score is None:
+        return "<p>No soil health score calculated.</p>"
+    return SCORE_BAR_TEMPLATE.substitute(
+        remaining=f"{100 - overall_score:.1f}", score=f"{overall_score:.1f}"
+    )
+
+
+def render_score_card_report(payload: dict) -> str:
+    score = payload.get("overall_score")
+    return SCORE_CARD_TEMPLATE.substitute(
+        score="N/A" if score is None else f"{score:.1f}",
+        score_bar=score_bar_html(score),
+        score_table=records_table_html(payload.get("score_rows", [])),
+        reco_table=payload.get("reco_html", ""),
+        fert_table=records_table_html(payload.get("fert_rows", [])),
+        products_table=records_table_html(payload.get("product_rows", [])),
+    )
+
+
+def score_card_report(payload: dict) -> str:
+    """Full score card HTML (``overall_score``, ``score_rows``, ``reco_html``, ``fert_rows``, ``product_rows``)."""
+    return cached_artifact("score_card", payload, render_score_card_report)
+
+
+# =====================================================
+#  Sample report (pages/report_page.py)
+# =====================================================
+
+SAMPLE_REPORT_TEMPLATE = Template("""
+<html>
+<head>
+  <meta charset="UTF-8">
+  <title>Silal Soil Health Report</title>
+</head>
+<body style="font-family:Arial, sans-serif; margin:40px">
+  <h1 style="color:#006400; text-align:center;">Silal Soil Health Report</h1>
+  <p style="text-align:center;">Generated on $generated</p>
+  <hr>
+  <h2>Sample Information</h2>
+  <table border="1" cellspacing="0" cellpadding="4">
+    $sample_rows
+  </table>
+  <hr>
+  <h2>Analytical Indicators</h2>
+  $table
+</body>
+</html>
+""")
+
+
+def render_sample_report(payload: dict, render_table=None, generated: str | None = None) -> str:
+    sample_rows = "".join(
+        f"<tr><th align='left'>{html_escape(str(k))}</th><td>{html_escape(str(v))}</td></tr>"
+        for k, v in payload.get("sample_info", {}).items()
+    )
+    if not payload.get("rows"):
+        table = "<p>No analytical indicators found.</p>"
+    elif render_table is not None:
+        table = render_table()
+    else:
+        table = records_table_html(payload["rows"])
+    return SAMPLE_REPORT_TEMPLATE.substitute(
+        generated=generated or generated_now(),
+        sample_rows=sample_rows,
+        table=table,
+    )
+
+
+def sample_report(sample_info: dict, rows: list[dict], render_table=None) -> str:
+    """Sample report HTML; ``render_table()`` (e.g. ``status_table_html``) runs only on a cache miss."""
+    payload = {"sample_info": sample_info, "rows": rows}
+    return stamp(cached_artifact("sample", payload, lambda p: render_sample_report(p, render_table, GENERATED)))
@@ -0,0 +1,422 @@
+"""Offline, rule-based bilingual recommendations.
+
+A deterministic fallback for the OpenAI recommendations: the sample is reduced
+to a *signature* (score band + constraint flags) and each of the seven
+sections is assembled from a curated phrase library. Results are memoized per
+signature, so a lookup costs microseconds. ``evaluate_batch`` computes the same
+flags for a whole DataFrame of samples with vectorized masks.
+"""
+
+from functools import lru_cache
+
+from soil_health.ai import components_list
+from soil_health.sample import number_of
+
+# Score bands: (lower bound, en, ar)
+BANDS = [
+    (80.0, "Very good", "جيدة جداً"),
+    (60.0, "Good", "جيدة"),
+    (40.0, "Moderate", "متوسطة"),
+    (0.0, "Poor", "ضعيفة"),
+]
+NOT_SCORED = "Not scored"
+
+FLAGS = ["salinity", "sodicity", "low_om", "high_ph", "low_fe", "low_zn", "low_cu", "low_mn", "low_b"]
+MICRO_FLAGS = ["low_fe", "low_zn", "low_cu", "low_mn", "low_b"]
+
+# Decision table: (flag, report label, operator, threshold)
+RULE_THRESHOLDS = [
+    ("salinity", "ECe",                ">", 4.0),
+    ("sodicity", "SAR",                ">", 13.0),
+    ("sodicity", "ESP",                ">", 15.0),
+    ("low_om",   "Organic Matter",     "<", 1.0),
+    ("high_ph",  "pH (paste extract)", ">", 8.0),
+    ("low_fe",   "Iron (Fe)",          "<", 4.5),
+    ("low_zn",   "Zinc (Zn)",          "<", 1.0),
+    ("low_cu",   "Copper (Cu)",        "<", 0.5),
+    ("low_mn",   "Manganese (Mn)",     "<", 5.0),
+    ("low_b",    "Boron (B)",          "<", 0.5),
+]
+
+MICRO_NAMES = {
+    "low_fe": ("Fe", "الحديد"),
+    "low_zn": ("Zn", "الزنك"),
+    "low_cu": ("Cu", "النحاس"),
+    "low_mn": ("Mn", "المنجنيز"),
+    "low_b":  ("B", "البورون"),
+}
+
+CONSTRAINT_NAMES = {
+    "salinity": ("salinity (high ECe)", "الملوحة (ارتفاع التوصيل الكهربائي)"),
+    "sodicity": ("sodicity (high SAR/ESP)", "الصودية (ارتفاع الصوديوم)"),
+    "low_om":   ("low organic matter", "انخفاض المادة العضوية"),
+    "high_ph":  ("high pH", "ارتفاع درجة الحموضة (القلوية)"),
+    "micro":    ("micronutrient deficiency ({en})", "نقص العناصر الصغرى ({ar})"),
+}
+
+BAND_PHRASES = {
+    "Very good": (
+        "The soil health score falls in the very good band; the soil can support high-value crops with routine maintenance.",
+        "يقع مؤشر صحة التربة ضمن الفئة الجيدة جداً، ويمكن للتربة دعم المحاصيل عالية القيمة مع الصيانة الاعتيادية.",
+    ),
+    "Good": (
+        "The soil health score falls in the good band; a few targeted corrections will lift productivity.",
+        "يقع مؤشر صحة التربة ضمن الفئة الجيدة، وبعض التصحيحات الموجهة سترفع الإنتاجية.",
+    ),
+    "Moderate": (
+        "The soil health score falls in the moderate band; several properties limit crop performance and need management.",
+        "يقع مؤشر صحة التربة ضمن الفئة المتوسطة، وهناك عدة خصائص تحد من أداء المحاصيل وتحتاج إلى إدارة.",
+    ),
+    "Poor": (
+        "The soil health score falls in the poor band; the soil needs rehabilitation before intensive cropping.",
+        "يقع مؤشر صحة التربة ضمن الفئة الضعيفة، وتحتاج التربة إلى إعادة تأهيل قبل الزراعة المكثفة.",
+    ),
+    NOT_SCORED: (
+        "The soil health score could not be calculated; interpretation relies on the available parameters only.",
+        "تعذر حساب مؤشر صحة التربة، ويعتمد التفسير على المعايير المتاحة فقط.",
+    ),
+}
+
+# Phrase library: section -> {"base": ..., "<flag>": ..., "none": ...}
+# "micro" phrases take {en}/{ar} = list of deficient elements.
+PHRASES = {
+    "Key soil constraints": {
+        "base": (
+            "Sandy texture and low CEC mean nutrients leach easily under irrigation.",
+            "القوام الرملي وانخفاض السعة التبادلية الكاتيونية يعنيان سهولة فقد العناصر بالغسيل مع الري.",
+        ),
+        "salinity": (
+            "Soil salinity (ECe above 4 dS/m) reduces water uptake and the yield of sensitive crops.",
+            "ملوحة التربة (توصيل كهربائي أعلى من 4 ديسيسيمنز/م) تقلل امتصاص الماء وإنتاجية المحاصيل الحساسة.",
+        ),
+        "sodicity": (
+            "High sodium (SAR/ESP) degrades soil structure and slows infiltration.",
+            "ارتفاع الصوديوم يضعف بناء التربة ويبطئ نفاذ الماء فيها.",
+        ),
+        "low_om": (
+            "Very low organic matter limits nutrient retention, microbial activity and water holding.",
+            "الانخفاض الشديد في المادة العضوية يحد من الاحتفاظ بالعناصر والنشاط الميكروبي والاحتفاظ بالماء.",
+        ),
+        "high_ph": (
+            "High pH in calcareous soil reduces the availability of phosphorus and micronutrients.",
+            "ارتفاع درجة الحموضة في التربة الجيرية يقلل تيسر الفوسفور والعناصر الصغرى.",
+        ),
+        "micro": (
+            "Micronutrient levels are below optimum for {en}.",
+            "مستويات العناصر الصغرى أقل من الحد الأمثل لكل من {ar}.",
+        ),
+        "none": (
+            "No major salinity, sodicity, pH or micronutrient constraint was detected.",
+            "لم يُرصد قيد رئيسي يتعلق بالملوحة أو الصودية أو درجة الحموضة أو العناصر الصغرى.",
+        ),
+    },
+    "Vegetables": {
+        "base": (
+            "Grow vegetables on raised beds with drip irrigation and frequent, light fertigation.",
+            "تُزرع الخضروات على مصاطب بالري بالتنقيط مع تسميد خفيف ومتكرر عبر مياه الري.",
+        ),
+        "salinity": (
+            "Favour salt-tolerant vegetables such as tomato, cabbage and beet, and keep the root zone leached.",
+            "يُفضل اختيار خضروات متحملة للملوحة مثل الطماطم والملفوف والشمندر مع غسيل منطقة الجذور باستمرار.",
+        ),
+        "sodicity": (
+            "Apply gypsum before planting to protect seedling emergence and root growth.",
+            "يُضاف الجبس قبل الزراعة لحماية إنبات البادرات ونمو الجذور.",
+        ),
+        "low_om": (
+            "Incorporate well-matured compost into the beds before each season.",
+            "يُخلط سماد عضوي (كمبوست) تام التحلل في المصاطب قبل كل موسم.",
+        ),
+        "high_ph": (
+            "Use acid-forming fertilizers such as ammonium sulfate and phosphoric acid in fertigation.",
+            "تُستخدم أسمدة حامضية الأثر مثل كبريتات الأمونيوم وحمض الفوسفوريك في التسميد مع الري.",
+        ),
+        "micro": (
+            "Apply foliar sprays of chelated {en} during early vegetative growth.",
+            "يُرش المجموع الخضري بمخلبيات {ar} خلال مرحلة النمو الخضري المبكر.",
+        ),
+        "none": (
+            "Maintain current fertility with balanced fertigation and regular compost additions.",
+            "يُحافظ على الخصوبة الحالية بتسميد متوازن مع الري وإضافة الكمبوست بانتظام.",
+        ),
+    },
+    "Field crops": {
+        "base": (
+            "Split nitrogen into several small doses to limit leaching in sandy soil.",
+            "تُقسم جرعات النيتروجين إلى دفعات صغيرة متعددة للحد من الفقد بالغسيل في التربة الرملية.",
+        ),
+        "salinity": (
+            "Choose tolerant field crops such as barley, sorghum or Rhodes grass.",
+            "يُنصح باختيار محاصيل حقلية متحملة مثل الشعير والذرة الرفيعة وحشيشة الرودس.",
+        ),
+        "sodicity": (
+            "Broadcast gypsum and irrigate to move sodium below the root zone.",
+            "يُنثر الجبس ثم يُروى لدفع الصوديوم إلى ما دون منطقة الجذور.",
+        ),
+        "low_om": (
+            "Return crop residues and apply manure or green waste compost between seasons.",
+            "تُعاد مخلفات المحاصيل إلى التربة ويُضاف السماد البلدي أو كمبوست المخلفات الخضراء بين المواسم.",
+        ),
+        "high_ph": (
+            "Place phosphorus in bands near the seed rather than broadcasting it.",
+            "يُوضع الفوسفور في شرائط قرب البذور بدلاً من نثره.",
+        ),
+        "micro": (
+            "Correct {en} deficiency with soil-applied sulfates or foliar sprays at early growth stages.",
+            "يُعالج نقص {ar} بإضافة الكبريتات إلى التربة أو بالرش الورقي في مراحل النمو المبكرة.",
+        ),
+        "none": (
+            "Keep a balanced fertilizer programme guided by regular soil tests.",
+            "يُحافظ على برنامج تسميد متوازن يسترشد بتحاليل التربة الدورية.",
+        ),
+    },
+    "Fruit trees": {
+        "base": (
+            "Mulch the tree basin and irrigate by drip or bubblers to keep the root zone moist.",
+            "تُغطى أحواض الأشجار بالمهاد ويُروى بالتنقيط أو بالنافورات للحفاظ على رطوبة منطقة الجذور.",
+        ),
+        "salinity": (
+            "Date palm tolerates salinity well; citrus and mango need leaching and better-quality water.",
+            "نخيل التمر يتحمل الملوحة جيداً، أما الحمضيات والمانجو فتحتاج إلى غسيل التربة ومياه أفضل نوعية.",
+        ),
+        "sodicity": (
+            "Apply gypsum in the tree basin and avoid waterlogging.",
+            "يُضاف الجبس في حوض الشجرة مع تجنب تشبع التربة بالماء.",
+        ),
+        "low_om": (
+            "Apply compost every year under the canopy of each tree.",
+            "يُضاف الكمبوست سنوياً تحت مظلة كل شجرة.",
+        ),
+        "high_ph": (
+            "Apply elemental sulfur in the basin to lower pH locally around the roots.",
+            "يُضاف الكبريت الزراعي في الحوض لخفض درجة الحموضة موضعياً حول الجذور.",
+        ),
+        "micro": (
+            "Use chelated {en} through fertigation or foliar sprays to prevent chlorosis.",
+            "تُستخدم مخلبيات {ar} عبر التسميد مع الري أو بالرش الورقي لمنع الاصفرار.",
+        ),
+        "none": (
+            "Continue balanced fertigation timed to flowering and fruit set.",
+            "يُستمر التسميد المتوازن مع الري بالتزامن مع مرحلتي التزهير وعقد الثمار.",
+        ),
+    },
+    "Short-term actions": {
+        "base": (
+            "Calibrate fertigation to small, frequent doses matched to crop stage.",
+            "يُضبط التسميد مع الري على جرعات صغيرة متكررة تناسب مرحلة نمو المحصول.",
+        ),
+        "salinity": (
+            "Apply a leaching irrigation before planting to push salts below the root zone.",
+            "تُجرى رية غسيل قبل الزراعة لدفع الأملاح إلى ما دون منطقة الجذور.",
+        ),
+        "sodicity": (
+            "Apply gypsum and follow with irrigation so calcium replaces exchangeable sodium.",
+            "يُضاف الجبس ويُتبع بالري ليحل الكالسيوم محل الصوديوم المتبادل.",
+        ),
+        "low_om": (
+            "Incorporate mature compost or well-rotted manure before the next crop.",
+            "يُخلط كمبوست ناضج أو سماد بلدي متحلل قبل المحصول القادم.",
+        ),
+        "high_ph": (
+            "Switch to acid-forming fertilizers and acidify irrigation water if bicarbonate is high.",
+            "يُتحول إلى أسمدة حامضية الأثر وتُحمّض مياه الري إذا كانت البيكربونات مرتفعة.",
+        ),
+        "micro": (
+            "Start foliar sprays of {en} and repeat every two to three weeks.",
+            "يُبدأ الرش الورقي بعناصر {ar} ويُكرر كل أسبوعين إلى ثلاثة أسابيع.",
+        ),
+        "none": (
+            "Keep the current programme and watch crop vigour during the season.",
+            "يُستمر البرنامج الحالي مع متابعة قوة نمو المحصول خلال الموسم.",
+        ),
+    },
+    "Long-term actions": {
+        "base": (
+            "Re-test the soil each season to track the score and adjust the programme.",
+            "يُعاد تحليل التربة كل موسم لمتابعة المؤشر وتعديل البرنامج.",
+        ),
+        "salinity": (
+            "Monitor irrigation water quality and soil ECe, and improve drainage where needed.",
+            "تُراقب نوعية مياه الري والتوصيل الكهربائي للتربة مع تحسين الصرف عند الحاجة.",
+        ),
+        "sodicity": (
+            "Maintain a gypsum programme until SAR and ESP return to the safe range.",
+            "يُستمر برنامج الجبس حتى تعود نسبة امتزاز الصوديوم ونسبة الصوديوم المتبادل إلى المدى الآمن.",
+        ),
+        "low_om": (
+            "Build organic matter every year with compost, manures and cover crops.",
+            "تُرفع المادة العضوية سنوياً باستخدام الكمبوست والأسمدة العضوية ومحاصيل التغطية.",
+        ),
+        "high_ph": (
+            "Apply elemental sulfur gradually over several seasons in the root zone.",
+            "يُضاف الكبريت الزراعي تدريجياً على مدى عدة مواسم في منطقة الجذور.",
+        ),
+        "micro": (
+            "Include {en} in the routine fertigation programme and confirm with leaf analysis.",
+            "تُدرج عناصر {ar} ضمن برنامج التسميد الاعتيادي مع التأكد بتحليل الأوراق.",
+        ),
+        "none": (
+            "Keep building organic matter to protect the soil against future degradation.",
+            "يُستمر رفع المادة العضوية لحماية التربة من التدهور مستقبلاً.",
+        ),
+    },
+}
+
+SECTION_FLAGS = ["salinity", "sodicity", "low_om", "high_ph", "micro"]
+
+
+def score_band(overall_score: float | None) -> str:
+    if overall_score is None:
+        return NOT_SCORED
+    for lower, name, _ in BANDS:
+        if overall_score >= lower:
+            return name
+    return BANDS[-1][1]
+
+
+def _compare(value: float, op: str, threshold: float) -> bool:
+    return value > threshold if op == ">" else value < threshold
+
+
+def constraint_flags(raw_data: dict) -> tuple[str, ...]:
+    """Constraint flags raised by one sample, in ``FLAGS`` order."""
+    raised = set()
+    for flag, label, op, threshold in RULE_THRESHOLDS:
+        value = number_of(raw_data, label)
+        if value is not None and _compare(value, op, threshold):
+            raised.add(flag)
+    return tuple(f for f in FLAGS if f in raised)
+
+
+def signature(band: str, flags: tuple[str, ...]) -> str:
+    return f"{band}:{'+'.join(flags) or 'none'}"
+
+
+def parse_signature(sig: str) -> tuple[str, tuple[str, ...]]:
+    band, _, flag_str = sig.partition(":")
+    flags = () if flag_str in ("", "none") else tuple(flag_str.split("+"))
+    return band, flags
+
+
+@lru_cache(maxsize=4096)
+def _recommendations_for_signature(band: str, flags: tuple[str, ...]) -> dict:
+    micro = [f for f in flags if f in MICRO_FLAGS]
+    micro_en = ", ".join(MICRO_NAMES[f][0] for f in micro)
+    micro_ar = "، ".join(MICRO_NAMES[f][1] for f in micro)
+    active = [f for f in SECTION_FLAGS if f in flags or (f == "micro" and micro)]
+
+    sections = {}
+
+    # Overall interpretation: band + main limiting factors
+    en_lines = [BAND_PHRASES[band][0]]
+    ar_lines = [BAND_PHRASES[band][1]]
+    if active:
+        names = [CONSTRAINT_NAMES[f] for f in active]
+        en_lines.append(
+            "The main limiting factors are: "
+            + ", ".join(n[0] for n in names).format(en=micro_en)
+            + "."
+        )
+        ar_lines.append(
+            "أهم العوامل المحددة هي: "
+            + "، ".join(n[1] for n in names).format(ar=micro_ar)
+            + "."
+        )
+    else:
+        en_lines.append("No major chemical constraint was detected in the analysed parameters.")
+        ar_lines.append("لم يُرصد أي قيد كيميائي رئيسي في المعايير التي تم تحليلها.")
+    en_lines.append("Like most UAE sandy soils, the soil has a low capacity to hold water and nutrients.")
+    ar_lines.append("كما هو الحال في معظم الترب الرملية في الإمارات، فإن قدرة التربة على الاحتفاظ بالماء والعناصر الغذائية منخفضة.")
+    sections["Overall interpretation"] = {"en": "\n".join(en_lines), "ar": "\n".join(ar_lines)}
+
+    for section, phrases in PHRASES.items():
+        keys = ["base"] + (active or ["none"])
+        en_lines = []
+        ar_lines = []
+        for key in keys:
+            en, ar = phrases[key]
+            en_lines.append(en.format(en=micro_en))
+            ar_lines.append(ar.format(ar=micro_ar))
+        sections[section] = {"en": "\n".join(en_lines), "ar": "\n".join(ar_lines)}
+
+    return {comp: sections[comp] for comp in components_list}
+
+
+def recommendations_for_signature(band: str, flags: tuple[str, ...]) -> dict:
+    """Seven bilingual sections for a (band, flags) signature.
+
+    The text is built once per signature and cached; every call returns a
+    fresh copy, so a caller editing its sections cannot change what later
+    callers get.
+    """
+    cached = _recommendations_for_signature(band, flags)
+    return {comp: dict(text) for comp, text in cached.items()}
+
+
+def rule_based_recommendations(raw_data: dict, overall_score: float | None) -> dict:
+    """Seven bilingual sections for one sample, same shape as the AI JSON."""
+    return recommendations_for_signature(score_band(overall_score), constraint_flags(raw_data))
+
+
+# =====================================================
+#  Vectorized evaluation for many samples
+# =====================================================
+
+def numeric_column(series):
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=float)
+    extracted = series.astype(str).str.extract(r"([-+]?\d*\.?\d+)", expand=False)
+    return pd.to_numeric(extracted, errors="coerce").to_numpy(dtype=float)
+
+
+def evaluate_batch(samples):
+    """Band, flag masks and signature for every row of ``samples``.
+
+    ``samples`` is a DataFrame with one row per sample, raw_data labels as
+    columns and an optional ``overall_score`` column.
+    """
+    import numpy as np
+    import pandas as pd
+
+    n = len(samples)
+    masks = {flag: np.zeros(n, dtype=bool) for flag in FLAGS}
+    with np.errstate(invalid="ignore"):
+        for flag, label, op, threshold in RULE_THRESHOLDS:
+            if label not in samples.columns:
+                continue
+            values = numeric_column(samples[label])
+            masks[flag] |= values > threshold if op == ">" else values < threshold
+
+        if "overall_score" in samples.columns:
+            score = pd.to_numeric(samples["overall_score"], errors="coerce").to_numpy(dtype=float)
+        else:
+            score = np.full(n, np.nan)
+        band = np.select(
+            [score >= lower for lower, _, _ in BANDS],
+            [name for _, name, _ in BANDS],
+            default=NOT_SCORED,
+        )
+
+    code = np.zeros(n, dtype=np.int64)
+    for bit, flag in enumerate(FLAGS):
+        code |= masks[flag].astype(np.int64) << bit
+
+    out = pd.DataFrame({"band": band, **masks, "code": code}, index=samples.index)
+    # Only a few dozen distinct (band, code) pairs exist; build each signature once.
+    pairs = out[["band", "code"]].drop_duplicates()
+    names = {
+        (b, c): signature(b, tuple(f for bit, f in enumerate(FLAGS) if c >> bit & 1))
+        for b, c in zip(pairs["band"], pairs["code"])
+    }
+    out["signature"] = [names[key] for key in zip(out["band"], out["code"])]
+    return out
+
+
+def recommend_batch(samples) -> list[dict]:
+    """Rule-based recommendations for every row of ``samples`` (see ``evaluate_batch``)."""
+    evaluated = evaluate_batch(samples)
+    by_signature = {sig: _recommendations_for_signature(*parse_signature(sig)) for sig in evaluated["signature"].unique()}
+    # one copy per row: rows sharing a signature must not share mutable sections
+    return [{comp: dict(text) for comp, text in by_signature[sig].items()} for sig in evaluated["signature"]]
@@ -0,0 +1,206 @@
+"""One soil sample as a compact, typed record, parsed once.
+
+``SoilSample`` replaces the ``raw_data`` dict copies that used to travel
+through session state. The parameter layout is fixed by ``PARAMS``, so a
+sample stores its values in parallel slots indexed by parameter: the text
+as entered, the first number (``extract_first_number`` semantics) in a
+``float`` array and a one-byte flag per value (numeric, below LOQ, not
+analyzed, ...). The scorer, rules, fertilizer calculator and report tables
+read the parsed numbers instead of re-running the regex on every rerun.
+
+A sample is also a read-only ``Mapping`` of label -> text, so everything
+that accepts a ``raw_data`` dict accepts a sample unchanged. It iterates in
+``PARAMS`` order (the order the form builds), then any other labels.
+"""
+
+import math
+import re
+from array import array
+from collections.abc import Mapping
+
+# ============== MASTER PARAMETER DEFINITIONS ==============
+
+PARAMS = [
+    # --- Basic soil properties ---
+    {"key": "ph",        "label": "pH (paste extract)",        "unit": "-",        "section": "Basic Soil Properties"},
+    {"key": "ece",       "label": "ECe",                       "unit": "dS/m",     "section": "Basic Soil Properties"},
+    {"key": "om",        "label": "Organic Matter",            "unit": "%",        "section": "Basic Soil Properties"},
+    {"key": "sar",       "label": "SAR",                       "unit": "-",        "section": "Basic Soil Properties"},
+    {"key": "esp",       "label": "ESP",                       "unit": "%",        "section": "Basic Soil Properties"},
+    {"key": "cec",       "label": "CEC",                       "unit": "cmolc/kg", "section": "Basic Soil Properties"},
+    {"key": "caco3",     "label": "CaCO₃",                     "unit": "%",        "section": "Basic Soil Properties"},
+    {"key": "sat_pct",   "label": "Saturation Percentage",     "unit": "%",        "section": "Basic Soil Properties"},
+    {"key": "texture",   "label": "Soil Texture Class",        "unit": "",         "section": "Basic Soil Properties"},
+
+    # --- Soluble ions ---
+    {"key": "sol_ca",    "label": "Soluble Calcium (Ca²⁺)",    "unit": "ppm",      "section": "Soluble Ions"},
+    {"key": "sol_mg",    "label": "Soluble Magnesium (Mg²⁺)",  "unit": "ppm",      "section": "Soluble Ions"},
+    {"key": "sol_na",    "label": "Soluble Sodium (Na⁺)",      "unit": "ppm",      "section": "Soluble Ions"},
+    {"key": "sol_k",     "label": "Soluble Potassium (K⁺)",    "unit": "ppm",      "section": "Soluble Ions"},
+    {"key": "sol_cl",    "label": "Soluble Chloride (Cl⁻)",    "unit": "ppm",      "section": "Soluble Ions"},
+    {"key": "sol_hco3",  "label": "Soluble Bicarbonate (HCO₃⁻)","unit": "ppm",     "section": "Soluble Ions"},
+    {"key": "sol_so4",   "label": "Soluble Sulfate (SO₄²⁻)",   "unit": "ppm",      "section": "Soluble Ions"},
+
+    # --- Exchangeable cations ---
+    {"key": "exch_ca",   "label": "Exchangeable Calcium",      "unit": "ppm",      "section": "Exchangeable Cations"},
+    {"key": "exch_mg",   "label": "Exchangeable Magnesium",    "unit": "ppm",      "section": "Exchangeable Cations"},
+    {"key": "exch_na",   "label": "Exchangeable Sodium",       "unit": "ppm",      "section": "Exchangeable Cations"},
+    {"key": "exch_k",    "label": "Exchangeable Potassium",    "unit": "ppm",      "section": "Exchangeable Cations"},
+
+    # --- Available nutrients & micros ---
+    {"key": "avail_n",   "label": "Available Nitrogen (N)",    "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
+    {"key": "avail_p",   "label": "Available Phosphorus (P)",  "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
+    {"key": "avail_k",   "label": "Available Potassium (K)",   "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
+    {"key": "avail_s",   "label": "Available Sulfur (S)",      "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
+    {"key": "fe",        "label": "Iron (Fe)",                 "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
+    {"key": "zn",        "label": "Zinc (Zn)",                 "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
+    {"key": "cu",        "label": "Copper (Cu)",               "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
+    {"key": "mn",        "label": "Manganese (Mn)",            "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
+    {"key": "b",         "label": "Boron (B)",                 "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
+    {"key": "mo",        "label": "Molybdenum (Mo)",           "unit": "mg/kg",    "section": "Available Nutrients & Micronutrients"},
+
+    # --- Physical ---
+    {"key": "bd",        "label": "Bulk Density",              "unit": "g/cm³",    "section": "Soil Physical Properties"},
+    {"key": "whc",       "label": "Water Holding Capacity",    "unit": "%",        "section": "Soil Physical Properties"},
+    {"key": "infil",     "label": "Infiltration Rate",         "unit": "mm/h",     "section": "Soil Physical Properties"},
+
+    # --- Biological (optional) ---
+    {"key": "mic_c",     "label": "Microbial Biomass Carbon",  "unit": "mg/kg",    "section": "Soil Biological Properties (Optional)"},
+    {"key": "resp",      "label": "Soil Respiration (CO₂)",    "unit": "mg CO₂/kg/day","section": "Soil Biological Properties (Optional)"},
+    {"key": "worms",     "label": "Earthworm Count",           "unit": "per m²",   "section": "Soil Biological Properties (Optional)"},
+]
+
+LABELS = tuple(p["label"] for p in PARAMS)
+UNITS = tuple(p["unit"] for p in PARAMS)
+INDEX = {label: i for i, label in enumerate(LABELS)}
+
+# per-value flags
+NUMBER, BELOW_LOQ, ABOVE_LIMIT, NOT_ANALYZED, TEXT, ABSENT = range(6)
+
+NOT_ANALYZED_MARKERS = ("not analyzed", "not analysed", "na", "n/a")
+NUMBER_RE = re.compile(r"[-+]?\d*\.?\d+")
+
+
+def parse_value(value) -> tuple[float | None, int]:
+    """(first number or None, flag) for one reported value."""
+    if value is None:
+        return None, ABSENT
+    s = str(value)
+    if s.strip() == "" or s.lower() in NOT_ANALYZED_MARKERS:
+        return None, NOT_ANALYZED
+    m = NUMBER_RE.search(s)
+    number = float(m.group(0)) if m else None
+    head = s.lstrip()
+    if head.startswith("<"):
+        return number, BELOW_LOQ
+    if head.startswith(">"):
+        return number, ABOVE_LIMIT
+    return number, NUMBER if number is not None else TEXT
+
+
+class SoilSample(Mapping):
+    """Sample info plus the parsed analytical values of one soil sample."""
+
+    __slots__ = ("info", "_text", "_values", "_flags", "_extra")
+
+    def __init__(self, raw_data: Mapping | None = None, sample_info: dict | None = None):
+        self.info = dict(sample_info or {})
+        self._text = [None] * len(LABELS)
+        self._values = array("d", [math.nan]) * len(LABELS)
+        self._flags = bytearray([ABSENT]) * len(LABELS)
+        self._extra = None  # labels outside PARAMS: label -> (text, number, flag)
+        for label, value in (raw_data or {}).items():
+            number, flag = parse_value(value)
+            i = INDEX.get(label)
+            if i is None:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[label] = (value, number, flag)
+                continue
+            self._text[i] = value
+            self._flags[i] = flag
+            if number is not None:
+                self._values[i] = number
+
+    @classmethod
+    def from_payload(cls, payload) -> "SoilSample":
+        """A sample from a ``{"sample_info", "raw_data"}`` payload (samples pass through)."""
+        if isinstance(payload, cls):
+            return payload
+        return cls(payload.get("raw_data") or {}, payload.get("sample_info") or {})
+
+    def to_payload(self) -> dict:
+        """Plain ``{"sample_info", "raw_data"}`` dict for JSON, hashing and worker processes."""
+        return {"sample_info": dict(self.info), "raw_data": dict(self)}
+
+    # ---- Mapping of label -> text as reported ----
+
+    def __getitem__(self, label):
+        i = INDEX.get(label)
+        if i is not None and self._flags[i] != ABSENT:
+            return self._text[i]
+        if self._extra is not None and label in self._extra:
+            return self._extra[label][0]
+        raise KeyError(label)
+
+    def __iter__(self):
+        for i, flag in enumerate(self._flags):
+            if flag != ABSENT:
+                yield LABELS[i]
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(flag != ABSENT for flag in self._flags) + len(self._extra or ())
+
+    def __contains__(self, label):
+        i = INDEX.get(label)
+        if i is not None:
+            return self._flags[i] != ABSENT
+        return self._extra is not None and label in self._extra
+
+    def __repr__(self):
+        return f"SoilSample(report_no={self.info.get('report_no', '')!r}, values={len(self)})"
+
+    # ---- parsed values ----
+
+    def number(self, label: str) -> float | None:
+        """First number of the value, or None (same result as ``extract_first_number``)."""
+        i = INDEX.get(label)
+        if i is not None:
+            value = self._values[i]
+            return None if math.isnan(value) else value
+        if self._extra is not None and label in self._extra:
+            return self._extra[label][1]
+        return None
+
+    def flag(self, label: str) -> int:
+        i = INDEX.get(label)
+        if i is not None:
+            return self._flags[i]
+        if self._extra is not None and label in self._extra:
+            return self._extra[label][2]
+        return ABSENT
+
+    def below_loq(self, label: str) -> bool:
+        return self.flag(label) == BELOW_LOQ
+
+    def numbers(self, labels) -> list[float]:
+        """Parsed numbers for ``labels`` (NaN where there is none), e.g. for numpy."""
+        out = []
+        for label in labels:
+            number = self.number(label)
+            out.append(math.nan if number is None else number)
+        return out
+
+    @staticmethod
+    def unit(label: str) -> str:
+        i = INDEX.get(label)
+        return UNITS[i] if i is not None else ""
+
+
+def number_of(raw_data, label: str) -> float | None:
+    """Parsed value of ``label`` from a ``SoilSample`` or a plain ``raw_data`` dict."""
+    if isinstance(raw_data, SoilSample):
+        return raw_data.number(label)
+    return parse_value(raw_data.get(label))[0]
@@ -0,0 +1,147 @@
+"""Validation and partial regeneration of the seven-section recommendation JSON.
+
+``RECOMMENDATION_SCHEMA`` is the contract: every section, both languages,
+each a non-empty string in its own script. ``invalid_entries`` checks a
+reply against it entry by entry, so only the failing entries are
+re-requested.
+"""
+
+import json
+import re
+
+from soil_health.ai import COMPACT_PROMPT, MODEL, TEMPERATURE, components_list, system_prompt
+from soil_health.streaming import SectionStreamParser, strip_code_fences
+
+LANGS = ["en", "ar"]
+
+# en: some non-space text and no Arabic letters; ar: at least one Arabic letter
+TEXT_SCHEMAS = {
+    "en": {"type": "string", "minLength": 1, "pattern": "^(?=[\\s\\S]*\\S)[^\u0600-\u06ff]*$"},
+    "ar": {"type": "string", "minLength": 1, "pattern": "[\u0600-\u06ff]"},
+}
+
+RECOMMENDATION_SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "required": list(components_list),
+    "properties": {
+        comp: {"type": "object", "required": LANGS, "properties": {lang: TEXT_SCHEMAS[lang] for lang in LANGS}}
+        for comp in components_list
+    },
+}
+
+JSON_TYPES = {"object": dict, "string": str}
+
+
+def matches(schema: dict, value) -> bool:
+    """``value`` against the subset of JSON Schema used here (type, required, properties, minLength, pattern)."""
+    if "type" in schema and not isinstance(value, JSON_TYPES[schema["type"]]):
+        return False
+    if isinstance(value, str):
+        if len(value) < schema.get("minLength", 0):
+            return False
+        if "pattern" in schema and re.search(schema["pattern"], value) is None:
+            return False
+    if isinstance(value, dict):
+        if any(key not in value for key in schema.get("required", ())):
+            return False
+        return all(matches(sub, value[key]) for key, sub in schema.get("properties", {}).items() if key in value)
+    return True
+
+
+def entry_is_valid(lang: str, text) -> bool:
+    """One ``en``/``ar`` value against ``RECOMMENDATION_SCHEMA``: non-empty string in the right script."""
+    return matches(TEXT_SCHEMAS[lang], text)
+
+
+def invalid_entries(result) -> list[tuple[str, str]]:
+    """``(section, lang)`` pairs of ``RECOMMENDATION_SCHEMA`` that are missing or fail it."""
+    sections = RECOMMENDATION_SCHEMA["properties"]
+    if not isinstance(result, dict):
+        return [(comp, lang) for comp in RECOMMENDATION_SCHEMA["required"] for lang in sections[comp]["required"]]
+    bad = []
+    for comp in RECOMMENDATION_SCHEMA["required"]:
+        block = result.get(comp)
+        for lang in sections[comp]["required"]:
+            text = block.get(lang) if isinstance(block, dict) else None
+            if not matches(sections[comp]["properties"][lang], text):
+                bad.append((comp, lang))
+    return bad
+
+
+def parse_recommendations(content: str) -> dict:
+    """Parse a model reply, keeping every complete section even if the whole JSON is broken."""
+    text = strip_code_fences(content or "")
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, dict):
+            return parsed
+    except json.JSONDecodeError:
+        pass
+    parser = SectionStreamParser()
+    return dict(parser.feed(text))
+
+
+def build_partial_messages(
+    context: str, entries: list[tuple[str, str]], current: dict, compact: bool = COMPACT_PROMPT
+) -> list[dict]:
+    wanted = {}
+    for comp, lang in entries:
+        wanted.setdefault(comp, []).append(lang)
+
+    lines = [
+        context,
+        "",
+        "Regenerate ONLY the entries listed below. Return a JSON object that contains only "
+        "these sections, each with only the listed language keys, following all the rules above.",
+    ]
+    for comp, langs in wanted.items():
+        lines.append(f'- "{comp}": {", ".join(langs)}')
+        block = current.get(comp)
+        existing_en = block.get("en") if isinstance(block, dict) else None
+        if "ar" in langs and "en" not in langs and entry_is_valid("en", existing_en):
+            lines.append(f"  (The Arabic must translate this existing English text: {existing_en!r})")
+
+    return [
+        {"role": "system", "content": system_prompt(compact)},
+        {"role": "user", "content": "\n".join(lines)},
+    ]
+
+
+def merge_entries(result: dict, reply: dict, entries: list[tuple[str, str]]) -> dict:
+    """Copy the valid requested entries from ``reply`` into a copy of ``result``.
+
+    A ``result`` or ``reply`` that is not a JSON object counts as empty.
+    """
+    result = result if isinstance(result, dict) else {}
+    reply = reply if isinstance(reply, dict) else {}
+    merged = {k: dict(v) if isinstance(v, dict) else {} for k, v in result.items()}
+    for comp, lang in entries:
+        block = reply.get(comp)
+        text = block.get(lang) if isinstance(block, dict) else None
+        if entry_is_valid(lang, text):
+            merged.setdefault(comp, {})[lang] = text
+    return merged
+
+
+def repair_recommendations(
+    client, context: str, result: dict, max_rounds: int = 2, compact: bool = COMPACT_PROMPT, **create_kwargs
+) -> dict:
+    """Re-request only the invalid ``(section, lang)`` entries and merge them in.
+
+    Returns the merged object; entries that are still invalid after
+    ``max_rounds`` are left for the caller to fill (e.g. from the rule engine).
+    """
+    create_kwargs.setdefault("model", MODEL)
+    create_kwargs.setdefault("temperature", TEMPERATURE)
+    for _ in range(max_rounds):
+        entries = invalid_entries(result)
+        if not entries:
+            break
+        resp = client.chat.completions.create(
+            messages=build_partial_messages(context, entries, result if isinstance(result, dict) else {}, compact),
+            **create_kwargs,
+        )
+        reply = parse_recommendations(resp.choices[0].message.content)
+        result = merge_entries(result, reply, entries)
+    return result
@@ -0,0 +1,279 @@
+"""Soil health score card: indicator scoring functions and weighted overall score."""
+
+from soil_health.sample import number_of, parse_value
+
+# =====================================================
+#  Helper: extract numeric value from raw string
+# =====================================================
+def extract_first_number(x):
+    return parse_value(x)[0]
+
+# =====================================================
+#  Scoring functions
+# =====================================================
+
+def score_ph(value: float) -> int:
+    if 6.5 <= value <= 7.0:
+        return 5
+    if (6.0 <= value < 6.5) or (7.0 < value <= 7.5):
+        return 4
+    if (5.5 <= value < 6.0) or (7.5 < value <= 8.0):
+        return 3
+    if (5.0 <= value < 5.5) or (8.0 < value <= 8.5):
+        return 2
+    return 1
+
+def score_ece(value: float) -> int:
+    if value <= 2:
+        return 5
+    if value <= 4:
+        return 4
+    if value <= 8:
+        return 3
+    if value <= 16:
+        return 2
+    return 1
+
+def score_om(value: float) -> int:
+    if 3 <= value <= 6:
+        return 5
+    if (2 <= value < 3) or (6 < value <= 8):
+        return 4
+    if 1 <= value < 2:
+        return 3
+    if 0.5 <= value < 1:
+        return 2
+    return 1
+
+def score_sar(value: float) -> int:
+    if value <= 3:
+        return 5
+    if value <= 6:
+        return 4
+    if value <= 13:
+        return 3
+    if value <= 20:
+        return 2
+    return 1
+
+def score_esp(value: float) -> int:
+    if value <= 3:
+        return 5
+    if value <= 6:
+        return 4
+    if value <= 15:
+        return 3
+    if value <= 25:
+        return 2
+    return 1
+
+def score_cec(value: float) -> int:
+    if value >= 15:
+        return 5
+    if value >= 10:
+        return 4
+    if value >= 5:
+        return 3
+    if value >= 3:
+        return 2
+    return 1
+
+def score_p(value: float) -> int:
+    if 15 <= value <= 30:
+        return 5
+    if (10 <= value < 15) or (30 < value <= 40):
+        return 4
+    if 5 <= value < 10:
+        return 3
+    if 3 <= value < 5:
+        return 2
+    return 1
+
+def score_k(value: float) -> int:
+    if 120 <= value <= 200:
+        return 5
+    if (80 <= value < 120) or (200 < value <= 250):
+        return 4
+    if 60 <= value < 80:
+        return 3
+    if 40 <= value < 60:
+        return 2
+    return 1
+
+def score_fe(value: float) -> int:
+    if value > 6:
+        return 5
+    if value >= 4.5:
+        return 4
+    if value >= 3:
+        return 3
+    if value >= 1:
+        return 2
+    return 1
+
+def score_zn(value: float) -> int:
+    if value > 1.5:
+        return 5
+    if value >= 1:
+        return 4
+    if value >= 0.7:
+        return 3
+    if value >= 0.5:
+        return 2
+    return 1
+
+def score_cu(value: float) -> int:
+    if value > 0.8:
+        return 5
+    if value >= 0.5:
+        return 4
+    if value >= 0.3:
+        return 3
+    if value >= 0.1:
+        return 2
+    return 1
+
+def score_mn(value: float) -> int:
+    if value > 8:
+        return 5
+    if value >= 5:
+        return 4
+    if value >= 3:
+        return 3
+    if value >= 1:
+        return 2
+    return 1
+
+def score_b(value: float) -> int:
+    if 0.5 <= value <= 1.0:
+        return 5
+    if (0.3 <= value < 0.5) or (1.0 < value <= 1.5):
+        return 4
+    if 0.2 <= value < 0.3:
+        return 3
+    if 0.1 <= value < 0.2:
+        return 2
+    return 1
+
+def score_ca(value: float) -> int:
+    if 1000 <= value <= 2000:
+        return 5
+    if (800 <= value < 1000) or (2000 < value <= 2500):
+        return 4
+    if 600 <= value < 800:
+        return 3
+    if 400 <= value < 600:
+        return 2
+    return 1
+
+def score_mg(value: float) -> int:
+    if 120 <= value <= 240:
+        return 5
+    if (80 <= value < 120) or (240 < value <= 300):
+        return 4
+    if 60 <= value < 80:
+        return 3
+    if 40 <= value < 60:
+        return 2
+    return 1
+
+def score_s(value: float) -> int:
+    if 10 <= value <= 20:
+        return 5
+    if (7 <= value < 10) or (20 < value <= 30):
+        return 4
+    if 5 <= value < 7:
+        return 3
+    if 3 <= value < 5:
+        return 2
+    return 1
+
+# Mapping between parameter labels from report and scoring
+PARAM_TO_INDICATOR = {
+    "pH (paste extract)":       ("pH",       score_ph, "-",        7.0,  True),
+    "ECe":                      ("ECe",      score_ece,"dS/m",     6.0,  True),
+    "Organic Matter":           ("OM",       score_om, "%",        8.0,  True),
+    "SAR":                      ("SAR",      score_sar,"-",        1.0,  True),
+    "ESP":                      ("ESP",      score_esp,"%",        1.0,  False),
+    "CEC":                      ("CEC",      score_cec,"cmolc/kg", 4.0,  False),
+    "Available Phosphorus (P)": ("Avail P",  score_p,  "mg/kg",    2.0,  True),
+    "Available Potassium (K)":  ("Avail K",  score_k,  "mg/kg",    2.0,  True),
+    "Iron (Fe)":                ("Fe",       score_fe, "mg/kg",    1.0,  False),
+    "Zinc (Zn)":                ("Zn",       score_zn, "mg/kg",    0.5,  False),
+    "Copper (Cu)":              ("Cu",       score_cu, "mg/kg",    0.5,  False),
+    "Manganese (Mn)":           ("Mn",       score_mn, "mg/kg",    0.5,  False),
+    "Boron (B)":                ("B",        score_b,  "mg/kg",    0.5,  False),
+}
+
+# Pilot weighting of the report page: adds Ca, Mg and S and treats ESP,
+# rather than available P and K, as mandatory
+PILOT_PARAM_TO_INDICATOR = {
+    "pH (paste extract)":       ("ph",       score_ph, "-",        7.0,  True),
+    "ECe":                      ("ece",      score_ece,"dS/m",     6.0,  True),
+    "Organic Matter":           ("om",       score_om, "%",        8.0,  True),
+    "SAR":                      ("sar",      score_sar,"-",        1.0,  True),
+    "ESP":                      ("esp",      score_esp,"%",        1.0,  True),
+    "CEC":                      ("cec",      score_cec,"cmolc/kg", 4.0,  False),
+    "Available Phosphorus (P)": ("p_avail",  score_p,  "mg/kg",    2.0,  False),
+    "Available Potassium (K)":  ("k_avail",  score_k,  "mg/kg",    2.0,  False),
+    "Exchangeable Calcium":     ("ca_exch",  score_ca, "ppm",      1.0,  False),
+    "Exchangeable Magnesium":   ("mg_exch",  score_mg, "ppm",      1.0,  False),
+    "Available Sulfur (S)":     ("s_avail",  score_s,  "mg/kg",    1.0,  False),
+    "Iron (Fe)":                ("fe",       score_fe, "mg/kg",    1.0,  False),
+    "Zinc (Zn)":                ("zn",       score_zn, "mg/kg",    0.5,  False),
+    "Copper (Cu)":              ("cu",       score_cu, "mg/kg",    0.5,  False),
+    "Manganese (Mn)":           ("mn",       score_mn, "mg/kg",    0.5,  False),
+    "Boron (B)":                ("b",        score_b,  "mg/kg",    0.5,  False),
+}
+
+# =====================================================
+#  Build scoring table
+# =====================================================
+
+def compute_score_card(raw_data: dict, indicators: dict = PARAM_TO_INDICATOR):
+    """Return ``(rows, overall_score, missing_mandatory)`` for a ``SoilSample`` or raw_data dict."""
+    rows = []
+    weighted_sum = 0.0
+    total_weight_used = 0.0
+    missing_mandatory = []
+
+    for label, meta in indicators.items():
+        ind_name, score_fn, unit, weight, mandatory = meta
+        num_val = number_of(raw_data, label)
+
+        if num_val is None:
+            score = None
+            weighted = None
+            if mandatory:
+                missing_mandatory.append(label)
+        else:
+            try:
+                score = score_fn(float(num_val))
+            except Exception:
+                score = None
+            if score is not None:
+                weighted = (score / 5.0) * weight
+                weighted_sum += weighted
+                total_weight_used += weight
+            else:
+                weighted = None
+
+        rows.append(
+            {
+                "Indicator": ind_name,
+                "Parameter (report label)": label,
+                "Value": num_val,
+                "Unit": unit,
+                "Score (0–5)": score,
+                "Weight": weight,
+                "Weighted score": weighted,
+                "Mandatory": "Yes" if mandatory else "No",
+            }
+        )
+
+    if total_weight_used > 0:
+        overall_score = (weighted_sum / total_weight_used) * 100.0
+    else:
+        overall_score = None
+
+    return rows, overall_score, missing_mandatory
@@ -0,0 +1,44 @@
+"""Optimum ranges used to flag analytical results as within / below / above optimum."""
+
+PARAM_SPECS = {
+    "pH (paste extract)":       {"unit": "-",        "opt_min": 6.0,   "opt_max": 7.5},
+    "ECe":                      {"unit": "dS/m",     "opt_min": 0.0,   "opt_max": 2.0},
+    "Organic Matter":           {"unit": "%",        "opt_min": 3.0,   "opt_max": 6.0},
+    "SAR":                      {"unit": "-",        "opt_min": 0.0,   "opt_max": 6.0},
+    "ESP":                      {"unit": "%",        "opt_min": 0.0,   "opt_max": 6.0},
+    "CEC":                      {"unit": "cmolc/kg", "opt_min": 10.0,  "opt_max": None},
+    "Available Phosphorus (P)": {"unit": "mg/kg",    "opt_min": 15.0,  "opt_max": 30.0},
+    "Available Potassium (K)":  {"unit": "mg/kg",    "opt_min": 100.0, "opt_max": 200.0},
+    "Exchangeable Calcium":     {"unit": "ppm",      "opt_min": 1000.0,"opt_max": 2000.0},
+    "Exchangeable Magnesium":   {"unit": "ppm",      "opt_min": 120.0, "opt_max": 240.0},
+    "Available Sulfur (S)":     {"unit": "mg/kg",    "opt_min": 10.0,  "opt_max": 20.0},
+    "Iron (Fe)":                {"unit": "mg/kg",    "opt_min": 4.5,   "opt_max": None},
+    "Zinc (Zn)":                {"unit": "mg/kg",    "opt_min": 1.0,   "opt_max": None},
+    "Copper (Cu)":              {"unit": "mg/kg",    "opt_min": 0.5,   "opt_max": None},
+    "Manganese (Mn)":           {"unit": "mg/kg",    "opt_min": 5.0,   "opt_max": None},
+    "Boron (B)":                {"unit": "mg/kg",    "opt_min": 0.5,   "opt_max": 1.0},
+}
+
+
+def format_range(opt_min, opt_max):
+    if opt_min is None and opt_max is None:
+        return ""
+    if opt_min is not None and opt_max is not None:
+        return f"{opt_min}–{opt_max}"
+    if opt_min is not None:
+        return f"≥ {opt_min}"
+    return f"≤ {opt_max}"
+
+
+def range_status(num_val: float | None, spec: dict | None) -> str | None:
+    """"low", "high", "ok", or None when there is no value or no range to compare against."""
+    if num_val is None or not spec:
+        return None
+    opt_min, opt_max = spec["opt_min"], spec["opt_max"]
+    if opt_min is not None and num_val < opt_min:
+        return "low"
+    if opt_max is not None and num_val > opt_max:
+        return "high"
+    if opt_min is None and opt_max is None:
+        return None
+    return "ok"
@@ -0,0 +1,94 @@
+"""Incremental parsing of the streamed seven-section recommendation JSON."""
+
+import json
+
+
+class SectionStreamParser:
+    """Emit each top-level ``"Section": {...}`` member as soon as it closes.
+
+    Feed raw text chunks as they arrive from the model; ``feed`` returns the
+    list of ``(section_name, block)`` pairs completed by that chunk. Text
+    before the opening brace (e.g. a stray code fence) is ignored.
+    """
+
+    def __init__(self):
+        self.buf = []
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.member_start = None
+
+    def feed(self, text: str) -> list[tuple[str, dict]]:
+        completed = []
+        for ch in text:
+            self.buf.append(ch)
+            i = self.pos
+            self.pos += 1
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+
+            if ch == '"' and self.depth > 0:
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+                if self.depth == 1:
+                    self.member_start = i + 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 1 and ch == "}":
+                    member = "".join(self.buf[self.member_start:i + 1])
+                    try:
+                        parsed = json.loads("{" + member + "}")
+                    except json.JSONDecodeError:
+                        parsed = {}
+                    completed.extend(parsed.items())
+            elif ch == "," and self.depth == 1:
+                self.member_start = i + 1
+        return completed
+
+    def text(self) -> str:
+        return "".join(self.buf)
+
+
+def strip_code_fences(content: str) -> str:
+    s = content.strip()
+    if s.startswith("```"):
+        s = s.split("\n", 1)[1] if "\n" in s else ""
+        if s.rstrip().endswith("```"):
+            s = s.rstrip()[:-3]
+    return s
+
+
+def stream_chat_json(client, on_section=None, **create_kwargs) -> dict:
+    """Run a streaming chat completion and return the parsed final JSON.
+
+    ``on_section(name, block)`` is called for every section as soon as its
+    object is complete in the stream. If the final text is not a valid JSON
+    object the sections completed so far are returned instead.
+    """
+    parser = SectionStreamParser()
+    sections = {}
+    stream = client.chat.completions.create(stream=True, **create_kwargs)
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        for name, block in parser.feed(delta):
+            sections[name] = block
+            if on_section is not None:
+                on_section(name, block)
+    try:
+        parsed = json.loads(strip_code_fences(parser.text()))
+    except json.JSONDecodeError:
+        return sections
+    return parsed if isinstance(parsed, dict) else sections
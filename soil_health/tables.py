@@ -0,0 +1,161 @@
+"""Analytical results tables with status colouring, without pandas Styler.
+
+Each value's status against its ``PARAM_SPECS`` optimum range is computed
+for the whole table at once with numpy. The HTML carries one ``class`` per
+row (or per cell in matrices) and a single shared stylesheet, instead of a
+Python callback per row and an inline style per cell.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from soil_health.ai import MISSING_MARKERS, html_escape
+from soil_health.sample import SoilSample
+from soil_health.specs import PARAM_SPECS, format_range
+
+ANALYTICAL_COLUMNS = ["Parameter", "Value", "Unit", "Optimum range", "Comment"]
+
+# status code -> (css class, comment)
+OK, OK_MIN, OK_MAX, LOW, HIGH, NO_NUMBER, NOT_ANALYZED, NO_RANGE = range(8)
+STATUS = {
+    OK:           ("st-ok", "Within optimum range"),
+    OK_MIN:       ("st-ok", "Within / above optimum range"),
+    OK_MAX:       ("st-ok", "Within / below optimum range"),
+    LOW:          ("st-low", "Below optimum range"),
+    HIGH:         ("st-high", "Above optimum range"),
+    NO_NUMBER:    ("st-na", "No numeric value"),
+    NOT_ANALYZED: ("st-na", "Not analyzed"),
+    NO_RANGE:     ("", ""),
+}
+STATUS_CLASS = np.array([STATUS[code][0] for code in range(len(STATUS))], dtype=object)
+STATUS_COMMENT = np.array([STATUS[code][1] for code in range(len(STATUS))], dtype=object)
+
+STATUS_TABLE_CSS = """
+<style>
+.soil-status { border-collapse: collapse; width: 100%; font-size: 0.85rem; }
+.soil-status th, .soil-status td { border: 1px solid #ccc; padding: 4px 6px; text-align: left; }
+.soil-status th { background: #f3f7f3; }
+.soil-status .st-ok { background: #d4edda; }
+.soil-status .st-high { background: #f8d7da; }
+.soil-status .st-low { background: #fff3cd; }
+.soil-status .st-na { background: #e2e3e5; }
+</style>
+"""
+
+NUMBER_PATTERN = r"([-+]?\d*\.?\d+)"
+
+
+def parse_numbers(values) -> np.ndarray:
+    """First number in each value (NaN where there is none), one vectorized regex pass."""
+    series = pd.Series(values, dtype=object).astype(str)
+    return pd.to_numeric(series.str.extract(NUMBER_PATTERN, expand=False), errors="coerce").to_numpy(float)
+
+
+def missing_mask(values) -> np.ndarray:
+    series = pd.Series(values, dtype=object)
+    text = series.astype(str).str.strip().str.lower()
+    return (series.isna() | (text == "") | text.isin(MISSING_MARKERS)).to_numpy()
+
+
+@lru_cache(maxsize=256)
+def compiled_specs(labels: tuple) -> tuple:
+    """(opt_min, opt_max, has_spec, units, ranges) for a label layout, built once per process.
+
+    Samples share a handful of layouts (the form's, the PDF's), so reruns and
+    sessions reuse the same read-only arrays.
+    """
+    specs = [PARAM_SPECS.get(label) for label in labels]
+    opt_min = np.array([np.nan if not s or s["opt_min"] is None else s["opt_min"] for s in specs], dtype=float)
+    opt_max = np.array([np.nan if not s or s["opt_max"] is None else s["opt_max"] for s in specs], dtype=float)
+    has_spec = np.array([s is not None for s in specs], dtype=bool)
+    for arr in (opt_min, opt_max, has_spec):
+        arr.flags.writeable = False
+    units = tuple(s["unit"] if s else "" for s in specs)
+    ranges = tuple(format_range(s["opt_min"], s["opt_max"]) if s else "" for s in specs)
+    return opt_min, opt_max, has_spec, units, ranges
+
+
+def spec_bounds(labels) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(opt_min, opt_max, has_spec) arrays for the given parameter labels."""
+    return compiled_specs(tuple(labels))[:3]
+
+
+def status_codes(numbers, missing, opt_min, opt_max, has_spec) -> np.ndarray:
+    """Status code per value; arrays broadcast, so a (params, samples) matrix works too."""
+    numbers = np.asarray(numbers, dtype=float)
+    shape = np.broadcast(numbers, missing, opt_min, opt_max, has_spec).shape
+    codes = np.full(shape, NO_RANGE, dtype=np.int8)
+    has_min, has_max = ~np.isnan(opt_min), ~np.isnan(opt_max)
+    ranged = has_spec & (has_min | has_max)
+    numeric = ~np.isnan(numbers)
+
+    with np.errstate(invalid="ignore"):
+        low = has_min & (numbers < opt_min)
+        high = has_max & (numbers > opt_max)
+    codes = np.where(ranged & numeric, np.where(has_min & has_max, OK, np.where(has_min, OK_MIN, OK_MAX)), codes)
+    codes = np.where(ranged & numeric & low, LOW, codes)
+    codes = np.where(ranged & numeric & high, HIGH, codes)
+    codes = np.where(ranged & ~numeric, NO_NUMBER, codes)
+    return np.where(missing, NOT_ANALYZED, codes).astype(np.int8)
+
+
+def analytical_table(raw_data: dict) -> tuple[pd.DataFrame, np.ndarray]:
+    """The report page's analytical results and the status code of each row."""
+    labels, values = list(raw_data), list(raw_data.values())
+    if isinstance(raw_data, SoilSample):
+        # already parsed once when the sample was built
+        return analytical_frame(labels, values, np.array(raw_data.numbers(labels), dtype=float))
+    return analytical_frame(labels, values)
+
+
+def analytical_frame(labels: list[str], values: list, numbers=None) -> tuple[pd.DataFrame, np.ndarray]:
+    """Analytical rows for parallel label/value lists (several samples can be stacked)."""
+    opt_min, opt_max, has_spec, units, ranges = compiled_specs(tuple(labels))
+    numbers = parse_numbers(values) if numbers is None else numbers
+    codes = status_codes(numbers, missing_mask(values), opt_min, opt_max, has_spec)
+    df = pd.DataFrame(
+        {
+            "Parameter": labels,
+            "Value": values,
+            "Unit": list(units),
+            "Optimum range": list(ranges),
+            "Comment": STATUS_COMMENT[codes] if len(labels) else [],
+        },
+        columns=ANALYTICAL_COLUMNS,
+    )
+    return df, codes
+
+
+def _cell(value) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return html_escape(str(value))
+
+
+def status_table_html(df: pd.DataFrame, codes, include_css: bool = True) -> str:
+    """Class-per-row HTML table; ``codes`` from ``status_codes`` (one per row)."""
+    classes = STATUS_CLASS[np.asarray(codes, dtype=np.int8)] if len(df) else []
+    head = "".join(f"<th>{html_escape(str(c))}</th>" for c in df.columns)
+    body = []
+    for cls, row in zip(classes, df.itertuples(index=False, name=None)):
+        attr = f' class="{cls}"' if cls else ""
+        body.append(f"<tr{attr}>" + "".join(f"<td>{_cell(v)}</td>" for v in row) + "</tr>")
+    table = f'<table class="soil-status"><thead><tr>{head}</tr></thead><tbody>{"".join(body)}</tbody></table>'
+    return (STATUS_TABLE_CSS + table) if include_css else table
+
+
+def status_matrix_html(index, columns, values, codes, include_css: bool = True, index_header: str = "") -> str:
+    """Class-per-cell HTML for a matrix (e.g. parameters x samples)."""
+    classes = STATUS_CLASS[np.asarray(codes, dtype=np.int8)]
+    head = f"<th>{html_escape(index_header)}</th>" + "".join(f"<th>{html_escape(str(c))}</th>" for c in columns)
+    body = []
+    for name, row_values, row_classes in zip(index, values, classes):
+        cells = "".join(
+            (f'<td class="{cls}">' if cls else "<td>") + _cell(v) + "</td>"
+            for v, cls in zip(row_values, row_classes)
+        )
+        body.append(f"<tr><th>{html_escape(str(name))}</th>{cells}</tr>")
+    table = f'<table class="soil-status"><thead><tr>{head}</tr></thead><tbody>{"".join(body)}</tbody></table>'
+    return (STATUS_TABLE_CSS + table) if include_css else table
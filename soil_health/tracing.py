@@ -0,0 +1,153 @@
+"""Per-stage timing of a page's script run.
+
+A page opens a trace at the top of the script (``start_trace("report")``)
+and closes it at the end; the stages in between are wrapped in ``span``:
+
+    with span("pdf.read", pages=3):
+        ...
+
+Spans are aggregated per rerun: each stage's total time is observed in the
+``page_stage_seconds`` histogram and the script run itself in
+``page_rerun_seconds`` (both in ``metrics.REGISTRY``). With
+``SOIL_HEALTH_TRACE_FILE`` set, every finished trace is also appended to
+that file as one JSON line.
+
+Outside a trace (the API, background jobs, benchmarks) ``span`` only checks
+a context variable and returns. Streamlit runs each script run in its own
+thread, so concurrent sessions never see each other's trace.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+
+from soil_health.metrics import REGISTRY
+
+DEFAULT_TRACE_FILE = os.environ.get("SOIL_HEALTH_TRACE_FILE")
+
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "page_stage_seconds", "Time per traced stage in one script run, by page and stage", buckets=STAGE_BUCKETS
+)
+RERUN_LATENCY = REGISTRY.histogram("page_rerun_seconds", "Script run wall time by page", buckets=STAGE_BUCKETS)
+
+_current = contextvars.ContextVar("soil_health_trace", default=None)
+_file_lock = threading.Lock()
+
+
+class Trace:
+    def __init__(self, page: str, trace_file: str | None = None):
+        self.page = page
+        self.trace_file = trace_file
+        self.started = time.time()
+        self.t0 = time.perf_counter()
+        self.spans = []  # (name, start s, duration s, depth, attrs), in the order they end
+        self.depth = 0
+        self.total = None
+
+    @property
+    def total_ms(self) -> float:
+        end = self.total if self.total is not None else time.perf_counter() - self.t0
+        return end * 1000
+
+    def stages(self) -> dict:
+        """stage -> {"calls", "seconds"}, in the order the stages first started."""
+        stages = {}
+        for name, start, seconds, _, _ in sorted(self.spans, key=lambda s: s[1]):
+            stage = stages.setdefault(name, {"calls": 0, "seconds": 0.0})
+            stage["calls"] += 1
+            stage["seconds"] += seconds
+        return stages
+
+    def rows(self) -> list[dict]:
+        """One row per stage plus the untraced rest of the run, for the debug panel."""
+        total_ms = self.total_ms
+        rows = [
+            {
+                "Stage": name,
+                "Calls": stage["calls"],
+                "ms": round(stage["seconds"] * 1000, 1),
+                "% of rerun": round(stage["seconds"] * 100_000 / total_ms, 1) if total_ms else None,
+            }
+            for name, stage in self.stages().items()
+        ]
+        traced = sum(seconds for _, _, seconds, depth, _ in self.spans if depth == 0) * 1000
+        rows.append(
+            {
+                "Stage": "(other)",
+                "Calls": None,
+                "ms": round(total_ms - traced, 1),
+                "% of rerun": round((total_ms - traced) * 100 / total_ms, 1) if total_ms else None,
+            }
+        )
+        return rows
+
+    def to_dict(self) -> dict:
+        return {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "page": self.page,
+            "total_ms": round(self.total_ms, 2),
+            "stages": {
+                name: {"calls": s["calls"], "ms": round(s["seconds"] * 1000, 2)} for name, s in self.stages().items()
+            },
+            "spans": [
+                {"name": name, "start_ms": round(start * 1000, 2), "ms": round(seconds * 1000, 2), "depth": depth, **attrs}
+                for name, start, seconds, depth, attrs in sorted(self.spans, key=lambda s: s[1])
+            ],
+        }
+
+    def finish(self) -> "Trace":
+        """Record the run (once) and detach the trace from the current context."""
+        if self.total is not None:
+            return self
+        self.total = time.perf_counter() - self.t0
+        if _current.get() is self:
+            _current.set(None)
+        for name, stage in self.stages().items():
+            STAGE_LATENCY.observe(stage["seconds"], page=self.page, stage=name)
+        RERUN_LATENCY.observe(self.total, page=self.page)
+        if self.trace_file:
+            line = json.dumps(self.to_dict(), ensure_ascii=False, default=str)
+            with _file_lock, open(self.trace_file, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        return self
+
+
+def start_trace(page: str, trace_file: str | None = DEFAULT_TRACE_FILE) -> Trace:
+    """A new trace for this script run; ``span`` records into it until it is finished."""
+    trace = Trace(page, trace_file)
+    _current.set(trace)
+    return trace
+
+
+def current_trace() -> Trace | None:
+    return _current.get()
+
+
+class span:
+    """Times the ``with`` block as stage ``name`` of the current trace (if any)."""
+
+    __slots__ = ("name", "attrs", "trace", "t0", "depth")
+
+    def __init__(self, name: str, **attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.trace = _current.get()
+        if self.trace is not None:
+            self.depth = self.trace.depth
+            self.trace.depth += 1
+            self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        trace = self.trace
+        if trace is not None:
+            end = time.perf_counter()
+            trace.depth -= 1
+            trace.spans.append((self.name, self.t0 - trace.t0, end - self.t0, self.depth, self.attrs))
+        return False